@@ -1,25 +1,56 @@
+from typing import Optional
+
 from flask import Flask
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine.interfaces import DBAPIConnection
+from sqlalchemy.pool import ConnectionPoolEntry
 
+from app.cli import register_commands
 from app.config import DATABASE_PATH
 from app.exceptions.handlers import register_handlers
+from app.metrics import init_metrics
+from app.password_hashing import init_password_hashing
+from app.read_only_database import init_read_only_database
+from app.request_metrics import init_request_metrics
+from app.search_index import create_missing_search_indexes
+from app.slow_queries import init_slow_query_log
+from app.sqlite_pragmas import DEFAULT_PRAGMAS, create_pragma_listener, verify_pragmas
+from app.write_queue import init_write_queue
 
 database: SQLAlchemy = SQLAlchemy()
 jwt: JWTManager = JWTManager()
 
 
 def init_database(app: Flask) -> None:
-    app.config["SQLALCHEMY_DATABASE_URI"] = (
-        DATABASE_PATH
-    )
+    app.config.setdefault("SQLALCHEMY_DATABASE_URI", DATABASE_PATH)
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    # Applied to every new connection, see app.sqlite_pragmas
+    app.config.setdefault("SQLITE_PRAGMAS", DEFAULT_PRAGMAS)
+    # Listings read through a second engine opened read-only, see app.read_only_database. Database files only.
+    app.config.setdefault("READ_ONLY_CONNECTIONS_ENABLED", True)
     database.init_app(app)
 
+    with app.app_context():
+        # SQLite enforces foreign keys, and with them ON DELETE CASCADE, only when enabled per connection
+        event.listen(database.engine, "connect", _enable_foreign_keys)
+        event.listen(database.engine, "connect", create_pragma_listener(app.config["SQLITE_PRAGMAS"]))
+
+    init_read_only_database(app)
+
 
-def create_app() -> Flask:
+def _enable_foreign_keys(dbapi_connection: DBAPIConnection, _connection_record: ConnectionPoolEntry) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys = ON")
+    cursor.close()
+
+
+# config overrides the defaults below, e.g. to point benchmarks at another database
+def create_app(config: Optional[dict] = None) -> Flask:
     app = Flask(__name__)
+    app.config.update(config or {})
     CORS(app)
 
     from .routes.user_routes import user_blueprint
@@ -27,24 +58,95 @@ def create_app() -> Flask:
     from .routes.habit_task_routes import habit_task_blueprint
     from .routes.execution_history_routes import execution_history_blueprint
     from .routes.auth_route import auth_blueprint
+    from .routes.admin_routes import admin_blueprint
 
     app.register_blueprint(user_blueprint, url_prefix="/users")
     app.register_blueprint(category_blueprint, url_prefix="/categories")
     app.register_blueprint(habit_task_blueprint, url_prefix="/habit_tasks")
     app.register_blueprint(execution_history_blueprint, url_prefix="/execution_histories")
     app.register_blueprint(auth_blueprint, url_prefix="/auth")
+    app.register_blueprint(admin_blueprint, url_prefix="/admin")
 
     init_database(app)
 
     from .models import Category, ExecutionHistory, HabitTask, User
+    from .repositories.execution_history_repository import add_user_id_column_if_missing, backfill_user_ids
+    from .repositories.purge_repository import add_deleted_at_columns_if_missing
 
     with app.app_context():
         database.create_all()
 
-    app.config["JWT_SECRET_KEY"] = "secret-key"
+        # create_all only creates missing tables, columns and search indexes added since are created here
+        with database.engine.begin() as connection:
+            # Rows written since the column exists carry their owner, only an added column needs filling
+            if add_user_id_column_if_missing(connection):
+                backfill_user_ids(connection)
+
+            add_deleted_at_columns_if_missing(connection)
+            create_missing_search_indexes(connection)
+
+    verify_pragmas(app)
+
+    app.config.setdefault("INDEX_CHECK_ON_STARTUP", True)
+
+    if app.config["INDEX_CHECK_ON_STARTUP"]:
+        from .indexes import log_index_report
+
+        log_index_report(app)
+
+    app.config.setdefault("JWT_SECRET_KEY", "secret-key")
+    # Responses are encoded by the pydantic serializers of the DTOs. orjson is not a requirement: when it is installed
+    # this opts in to it, which encodes the field values as they are and skips any custom pydantic serializer.
+    app.config.setdefault("JSON_USE_ORJSON", False)
+
+    # Each extra round doubles hashing time, pick a value with the benchmark-bcrypt command
+    app.config.setdefault("BCRYPT_ROUNDS", 12)
+    # bcrypt work is moved off the request threads, requests beyond pool size + queue limit get a 503
+    app.config.setdefault("PASSWORD_HASHING_POOL_SIZE", 2)
+    app.config.setdefault("PASSWORD_HASHING_QUEUE_LIMIT", 8)
+
+    # Rows deleted per transaction when purging asynchronously deleted users and categories
+    app.config.setdefault("PURGE_BATCH_SIZE", 500)
+
+    init_password_hashing(app)
+
+    # Mutating service calls run on one writer thread, which commits whatever is pending in one transaction.
+    # Needs a database file.
+    app.config.setdefault("WRITE_QUEUE_ENABLED", False)
+    app.config.setdefault("WRITE_QUEUE_MAX_BATCH_SIZE", 64)
+    # Writes waiting for the writer thread, anything above is rejected with a 503
+    app.config.setdefault("WRITE_QUEUE_LIMIT", 256)
+
+    init_write_queue(app)
+
+    # Query count and timings per request, reported in the Server-Timing header and the log
+    app.config.setdefault("REQUEST_METRICS_ENABLED", True)
+    # Executions of one statement within a request from which a possible N+1 pattern is logged
+    app.config.setdefault("N_PLUS_ONE_THRESHOLD", 10)
+
+    init_request_metrics(app)
+
+    # Prometheus metrics per endpoint at /metrics
+    app.config.setdefault("METRICS_ENABLED", True)
+
+    if app.config["METRICS_ENABLED"]:
+        from .routes.metrics_route import metrics_blueprint
+
+        app.register_blueprint(metrics_blueprint)
+
+    init_metrics(app)
+
+    # Statements slower than the threshold are kept with their query plan, see /admin/slow_queries
+    app.config.setdefault("SLOW_QUERY_LOG_ENABLED", True)
+    app.config.setdefault("SLOW_QUERY_THRESHOLD_MS", 100)
+    # Only the latest entries are kept
+    app.config.setdefault("SLOW_QUERY_LOG_SIZE", 100)
+
+    init_slow_query_log(app)
 
     jwt.init_app(app)
 
     register_handlers(app)
+    register_commands(app)
 
     return app
@@ -0,0 +1,31 @@
+import atexit
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from flask import current_app, Flask
+
+from app.write_queue import defer_until_commit
+
+_executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="background")
+
+
+# Runs best-effort work after the response, inside an app context of the calling app.
+# Failures are logged, never raised to the request that scheduled them.
+# Work scheduled from a write queue batch starts once the batch is committed, and no Future is returned for it.
+def run_in_background(function: Callable[..., object], *args) -> Optional[Future]:
+    app: Flask = current_app._get_current_object()
+
+    def run() -> None:
+        with app.app_context():
+            try:
+                function(*args)
+            except Exception:
+                app.logger.exception("Background task %s failed", function.__name__)
+
+    if defer_until_commit(lambda: _executor.submit(run)):
+        return None
+
+    return _executor.submit(run)
+
+
+atexit.register(_executor.shutdown, wait=True)
@@ -0,0 +1,92 @@
+import click
+from flask import Flask
+
+
+def register_commands(app: Flask) -> None:
+    @app.cli.command("backfill-execution-history-owners")
+    def backfill_execution_history_owners() -> None:
+        """Add and fill the denormalized user_id column of execution histories."""
+        from app.services import execution_history_service
+
+        updated: int = execution_history_service.backfill_user_ids()
+
+        click.echo(f"Updated owner of {updated} execution histories")
+
+    @app.cli.command("check-indexes")
+    @click.option("--create-missing", is_flag=True,
+                  help="Create indexes declared on models but absent in the database.")
+    def check_indexes(create_missing: bool) -> None:
+        """Report missing and unused indexes based on the query plans of repository queries."""
+        from app import database
+        from app import indexes
+
+        with database.engine.begin() as connection:
+            if create_missing:
+                for name in indexes.create_missing_indexes(connection):
+                    click.echo(f"Created index {name}")
+
+            report: indexes.IndexReport = indexes.check_indexes(connection)
+
+        for name in report.missing:
+            click.echo(f"Missing index: {name}")
+
+        for name in report.unused:
+            click.echo(f"Unused index: {name}")
+
+        for shape, tables in report.full_scans.items():
+            click.echo(f"Full scan of {', '.join(tables)} in query '{shape}'")
+
+    @app.cli.command("rebuild-streaks")
+    def rebuild_streaks() -> None:
+        """Recompute the streak state of every habit task from its execution history."""
+        from app.services import habit_task_streak_service
+
+        rebuilt: int = habit_task_streak_service.rebuild_streaks()
+
+        click.echo(f"Rebuilt streaks of {rebuilt} habit tasks")
+
+    @app.cli.command("rebuild-daily-execution-counts")
+    def rebuild_daily_execution_counts() -> None:
+        """Recompute the daily execution count rollup from the execution history."""
+        from app.services import daily_execution_count_service
+
+        rebuilt: int = daily_execution_count_service.rebuild_daily_execution_counts()
+
+        click.echo(f"Rebuilt {rebuilt} daily execution counts")
+
+    @app.cli.command("purge-deleted")
+    def purge_deleted() -> None:
+        """Finish purging users and categories that were deleted asynchronously."""
+        from app.services import purge_service
+
+        purged: int = purge_service.purge_deleted()
+
+        click.echo(f"Purged {purged} rows")
+
+    @app.cli.command("rebuild-search-indexes")
+    def rebuild_search_indexes() -> None:
+        """Recreate the full-text search indexes of categories, habit tasks and users from their tables."""
+        from app import database
+        from app import search_index
+
+        with database.engine.begin() as connection:
+            for name in search_index.create_missing_search_indexes(connection):
+                click.echo(f"Created search index {name}")
+
+            for name in search_index.rebuild_search_indexes(connection):
+                click.echo(f"Rebuilt search index {name}")
+
+    @app.cli.command("benchmark-bcrypt")
+    @click.option("--target-ms", default=250, show_default=True,
+                  help="Maximum time a password verification may take.")
+    @click.option("--max-rounds", default=16, show_default=True, help="Highest cost to try.")
+    def benchmark_bcrypt(target_ms: int, max_rounds: int) -> None:
+        """Measure bcrypt verification time per cost and suggest BCRYPT_ROUNDS for this host."""
+        from app import password_hashing
+
+        picked, timings = password_hashing.pick_rounds(target_ms / 1000, max_rounds)
+
+        for rounds, seconds in timings.items():
+            click.echo(f"{rounds:>2} rounds: {seconds * 1000:.1f} ms")
+
+        click.echo(f"Suggested BCRYPT_ROUNDS: {picked} (current: {app.config['BCRYPT_ROUNDS']})")
@@ -1,4 +1,10 @@
 from .category import CategoryCreateDTO, CategoryReadDTO, CategoryUpdateDTO
-from .execution_history import ExecutionHistoryCreateDTO, ExecutionHistoryReadDTO
+from .database_diagnostics import DatabaseDiagnosticsReadDTO
+from .daily_execution_count import DailyExecutionCountReadDTO, ExecutionHeatmapReadDTO
+from .execution_history import ExecutionHistoryCreateDTO, ExecutionHistoryReadDTO, ExecutionHistoryBulkErrorDTO, \
+    ExecutionHistoryBulkCreatedDTO, ExecutionHistoryBulkResultDTO, ExecutionHistoryPageReadDTO
 from .habit_task import HabitTaskCreateDTO, HabitTaskReadDTO, HabitTaskUpdateDTO
+from .habit_task_statistics import HabitTaskStatisticsReadDTO
+from .habit_task_streak import HabitTaskStreakReadDTO
 from .user import UserCreateDTO, UserReadDTO, UserUpdateDTO
+from .slow_query import SlowQueryReadDTO
@@ -1,8 +1,9 @@
-from datetime import datetime
 from typing import Optional
 
 from pydantic import BaseModel, Field
 
+from app.dtos.fields import StoredDatetime
+
 
 class CategoryBaseDTO(BaseModel):
     user_id: int
@@ -20,8 +21,8 @@ class CategoryCreateDTO(CategoryBaseDTO):
 
 class CategoryReadDTO(CategoryBaseDTO):
     id: int
-    created_at: datetime
-    updated_at: datetime
+    created_at: StoredDatetime
+    updated_at: StoredDatetime
 
 
 class CategoryUpdateDTO(BaseModel):
@@ -0,0 +1,18 @@
+from datetime import date
+
+from pydantic import BaseModel
+
+
+class DailyExecutionCountReadDTO(BaseModel):
+    habit_task_id: int
+    day: date
+    count: int
+
+    class Config:
+        from_attributes = True
+
+
+class ExecutionHeatmapReadDTO(BaseModel):
+    year: int
+    # Executions per day of the year, index 0 is January 1st. The last slot stays 0 outside of leap years.
+    counts: list[int]
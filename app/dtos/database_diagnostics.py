@@ -0,0 +1,14 @@
+from typing import Optional, Union
+
+from pydantic import BaseModel
+
+
+class DatabaseDiagnosticsReadDTO(BaseModel):
+    sqlite_version: str
+    # Values read back from a pooled connection, None where SQLite has none (mmap_size of an in-memory database)
+    pragmas: dict[str, Optional[Union[int, str]]]
+    configured_pragmas: dict[str, Union[int, str]]
+    mismatches: list[str]
+    page_size: int
+    page_count: int
+    freelist_count: int
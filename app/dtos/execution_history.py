@@ -1,7 +1,10 @@
 from datetime import datetime
+from typing import Optional
 
 from pydantic import BaseModel
 
+from app.dtos.fields import StoredDatetime
+
 
 class ExecutionHistoryBaseDTO(BaseModel):
     habit_task_id: int
@@ -18,3 +21,24 @@ class ExecutionHistoryCreateDTO(ExecutionHistoryBaseDTO):
 
 class ExecutionHistoryReadDTO(ExecutionHistoryBaseDTO):
     id: int
+    executed_at: StoredDatetime
+
+
+class ExecutionHistoryPageReadDTO(BaseModel):
+    items: list[ExecutionHistoryReadDTO]
+    next_cursor: Optional[str]
+
+
+# index is the position of the item in the request payload, for created items as for errors
+class ExecutionHistoryBulkCreatedDTO(ExecutionHistoryReadDTO):
+    index: int
+
+
+class ExecutionHistoryBulkErrorDTO(BaseModel):
+    index: int
+    error: str
+
+
+class ExecutionHistoryBulkResultDTO(BaseModel):
+    created: list[ExecutionHistoryBulkCreatedDTO]
+    errors: list[ExecutionHistoryBulkErrorDTO]
@@ -0,0 +1,13 @@
+from datetime import datetime
+from typing import Annotated
+
+from pydantic import AfterValidator
+
+
+def _as_stored(value: datetime) -> datetime:
+    return value.replace(tzinfo=None)
+
+
+# SQLite keeps datetimes without their offset and reads them back naive. Entities not reloaded since their flush
+# still hold the aware values they were given (e.g. get_utc_time() defaults), so read DTOs drop the offset too.
+StoredDatetime = Annotated[datetime, AfterValidator(_as_stored)]
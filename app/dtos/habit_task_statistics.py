@@ -0,0 +1,21 @@
+from datetime import date
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class HabitTaskStatisticsReadDTO(BaseModel):
+    habit_task_id: int
+    start_date: date
+    end_date: date
+    total_executions: int
+    # Share of days in the window with at least one execution
+    completion_rate: float
+    mean_gap_hours: Optional[float]
+    max_gap_hours: Optional[float]
+    # Executions per hour of the day (UTC) and per weekday (Monday first)
+    hour_histogram: list[int]
+    weekday_histogram: list[int]
+    # Average executions per day over the trailing 7 and 30 days, one value per day of the window
+    rolling_7_day_frequency: list[float]
+    rolling_30_day_frequency: list[float]
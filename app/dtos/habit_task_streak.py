@@ -0,0 +1,11 @@
+from datetime import date
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class HabitTaskStreakReadDTO(BaseModel):
+    habit_task_id: int
+    current_streak: int
+    longest_streak: int
+    last_execution_day: Optional[date]
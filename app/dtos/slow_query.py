@@ -0,0 +1,16 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class SlowQueryReadDTO(BaseModel):
+    recorded_at: datetime
+    duration_ms: float
+    statement: str
+    parameters: list[str]
+    caller: Optional[str]
+    query_plan: list[str]
+
+    class Config:
+        from_attributes = True
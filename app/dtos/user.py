@@ -1,8 +1,8 @@
-from datetime import datetime
 from typing import Optional
 
 from pydantic import BaseModel, EmailStr, Field
 
+from app.dtos.fields import StoredDatetime
 from app.models.User import UserRole
 
 
@@ -24,8 +24,8 @@ class UserCreateDTO(UserBaseDTO):
 class UserReadDTO(UserBaseDTO):
     id: int
     is_active: bool
-    created_at: datetime
-    updated_at: datetime
+    created_at: StoredDatetime
+    updated_at: StoredDatetime
 
 
 class UserUpdateDTO(BaseModel):
@@ -30,3 +30,9 @@ class MissingPayloadException(AppException):
     def __init__(self):
         self.message = "Missing JSON body"
         super().__init__(self.message)
+
+
+class ServiceUnavailableException(AppException):
+    def __init__(self):
+        self.message = "Server is busy, please try again later"
+        super().__init__(self.message)
@@ -4,7 +4,7 @@ from flask import Flask, Response, jsonify
 from pydantic import ValidationError
 
 from app.exceptions.exceptions import EntityNotFoundException, EntityPersistenceException, MissingAuthDataException, \
-    InvalidCredentialsException, MissingPayloadException
+    InvalidCredentialsException, MissingPayloadException, ServiceUnavailableException
 
 
 def create_error_response(message: str) -> Response:
@@ -43,3 +43,7 @@ def register_handlers(app: Flask) -> None:
     @app.errorhandler(MissingPayloadException)
     def handle_missing_payload_error(e: MissingPayloadException) -> tuple[Response, HTTPStatus]:
         return create_error_response(str(e)), HTTPStatus.BAD_REQUEST
+
+    @app.errorhandler(ServiceUnavailableException)
+    def handle_service_unavailable_error(e: ServiceUnavailableException) -> tuple[Response, HTTPStatus, dict]:
+        return create_error_response(str(e)), HTTPStatus.SERVICE_UNAVAILABLE, {"Retry-After": "1"}
@@ -0,0 +1,156 @@
+import re
+from dataclasses import dataclass, field
+from typing import Callable
+
+from flask import Flask
+from sqlalchemy import Connection, Index, Select, inspect
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import database
+from app.repositories import category_repository, execution_history_repository, habit_task_repository, \
+    purge_repository, user_repository
+from app.repositories.daily_execution_count_repository import get_daily_execution_counts_statement, \
+    get_daily_totals_statement
+
+INDEX_PATTERN: re.Pattern = re.compile(r"USING (?:COVERING )?INDEX (\w+)")
+FULL_SCAN_PATTERN: re.Pattern = re.compile(r"^SCAN (\w+)$")
+
+_EXECUTION_HISTORY_PERIOD: frozenset[str] = frozenset({"start_datetime", "end_datetime"})
+_DAILY_PERIOD: frozenset[str] = frozenset({"start_date", "end_date"})
+_PAGE: frozenset[str] = frozenset({"after_executed_at", "after_id", "limit"})
+
+# Representative filter combinations issued by the repositories. Parameter values do not matter,
+# SQLite chooses the plan from the statement shape alone.
+QUERY_SHAPES: dict[str, Callable[[], Select]] = {
+    "categories by user": lambda: category_repository.get_categories_statement(frozenset({"user_id"})),
+    "categories by user and name": lambda: category_repository.get_categories_statement(
+        frozenset({"user_id", "name"})),
+    "categories by user and search term": lambda: category_repository.get_categories_statement(
+        frozenset({"user_id", "name_match"})),
+    "category by id and user": lambda: category_repository.get_category_by_id_statement(
+        frozenset({"category_id", "user_id"})),
+    "habit tasks by user": lambda: habit_task_repository.get_habit_tasks_statement(frozenset({"user_id"})),
+    "habit tasks by category": lambda: habit_task_repository.get_habit_tasks_statement(frozenset({"category_id"})),
+    "habit tasks by user and category": lambda: habit_task_repository.get_habit_tasks_statement(
+        frozenset({"user_id", "category_id"})),
+    "habit tasks by user and search term": lambda: habit_task_repository.get_habit_tasks_statement(
+        frozenset({"user_id", "name_match"})),
+    "habit task by id and user": lambda: habit_task_repository.get_habit_task_by_id_statement(
+        frozenset({"habit_task_id", "user_id"})),
+    "execution histories by user": lambda: execution_history_repository.get_execution_histories_statement(
+        frozenset({"user_id"})),
+    "execution histories by user and period": lambda: execution_history_repository.get_execution_histories_statement(
+        _EXECUTION_HISTORY_PERIOD | {"user_id"}),
+    "execution histories by category": lambda: execution_history_repository.get_execution_histories_statement(
+        frozenset({"category_id"})),
+    "execution histories by habit task and period":
+        lambda: execution_history_repository.get_execution_histories_statement(
+            _EXECUTION_HISTORY_PERIOD | {"habit_task_id"}),
+    "execution histories page": lambda: execution_history_repository.get_execution_histories_page_statement(_PAGE),
+    "execution histories page by user": lambda: execution_history_repository.get_execution_histories_page_statement(
+        _PAGE | {"user_id"}),
+    "execution history by id and user": lambda: execution_history_repository.get_execution_history_by_id_statement(
+        frozenset({"execution_history_id", "user_id"})),
+    "users by name search terms": lambda: user_repository.get_users_statement(
+        frozenset({"first_name_match", "last_name_match"})),
+    "user by email": user_repository.get_user_by_email_statement,
+    "users pending purge": purge_repository.get_pending_user_ids_statement,
+    "categories pending purge": purge_repository.get_pending_category_ids_statement,
+    "daily execution counts by user and period": lambda: get_daily_execution_counts_statement(
+        _DAILY_PERIOD | {"user_id"}),
+    "daily execution counts by category": lambda: get_daily_execution_counts_statement(frozenset({"category_id"})),
+    "daily execution counts by habit task and period": lambda: get_daily_execution_counts_statement(
+        _DAILY_PERIOD | {"habit_task_id"}),
+    "daily totals by user": lambda: get_daily_totals_statement(_DAILY_PERIOD | {"user_id"}),
+    "daily totals by user and category": lambda: get_daily_totals_statement(_DAILY_PERIOD | {"user_id", "category_id"}),
+}
+
+
+@dataclass
+class IndexReport:
+    missing: list[str] = field(default_factory=list)
+    unused: list[str] = field(default_factory=list)
+    full_scans: dict[str, list[str]] = field(default_factory=dict)
+
+
+def explain_query_plan(connection: Connection, statement: Select) -> list[str]:
+    compiled = statement.compile(dialect=connection.dialect, compile_kwargs={"render_postcompile": True})
+    parameters: tuple = (None,) * len(compiled.positiontup or ())
+
+    result = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled.string}", parameters)
+
+    return [row[3] for row in result]
+
+
+def get_declared_indexes() -> dict[str, Index]:
+    return {
+        index.name: index
+        for table in database.metadata.sorted_tables
+        for index in table.indexes
+    }
+
+
+def get_existing_indexes(connection: Connection) -> set[str]:
+    inspector = inspect(connection)
+
+    return {
+        index["name"]
+        for table_name in inspector.get_table_names()
+        for index in inspector.get_indexes(table_name)
+    }
+
+
+def check_indexes(connection: Connection) -> IndexReport:
+    report: IndexReport = IndexReport()
+    existing_indexes: set[str] = get_existing_indexes(connection)
+    used_indexes: set[str] = set()
+
+    report.missing = sorted(set(get_declared_indexes()) - existing_indexes)
+
+    for shape, build_statement in QUERY_SHAPES.items():
+        plan: list[str] = explain_query_plan(connection, build_statement())
+
+        for detail in plan:
+            used_indexes.update(INDEX_PATTERN.findall(detail))
+
+        scanned_tables: list[str] = [match.group(1) for detail in plan
+                                     if (match := FULL_SCAN_PATTERN.match(detail)) is not None]
+
+        if scanned_tables:
+            report.full_scans[shape] = scanned_tables
+
+    report.unused = sorted(existing_indexes - used_indexes)
+
+    return report
+
+
+def create_missing_indexes(connection: Connection) -> list[str]:
+    existing_indexes: set[str] = get_existing_indexes(connection)
+    created: list[str] = []
+
+    for name, index in get_declared_indexes().items():
+        if name not in existing_indexes:
+            index.create(connection)
+            created.append(name)
+
+    return created
+
+
+def log_index_report(app: Flask) -> None:
+    try:
+        with app.app_context():
+            with database.engine.connect() as connection:
+                report: IndexReport = check_indexes(connection)
+    except SQLAlchemyError as e:
+        # An outdated schema must not prevent the app (and its migration commands) from starting
+        app.logger.warning("Index check skipped: %s", e)
+        return
+
+    for name in report.missing:
+        app.logger.warning("Index %s is declared on a model but missing in the database", name)
+
+    for name in report.unused:
+        app.logger.warning("Index %s is not used by any repository query", name)
+
+    for shape, tables in report.full_scans.items():
+        app.logger.warning("Query '%s' scans the whole %s table(s)", shape, ", ".join(tables))
@@ -0,0 +1,233 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Callable, Iterator, Optional
+
+from flask import Flask, Response, g, request
+from sqlalchemy import Engine
+from sqlalchemy.pool import PoolProxiedConnection
+
+from app import password_hashing
+from app.read_only_database import get_engines
+
+LATENCY_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS: tuple[float, ...] = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+# Shards of finished threads are folded into the totals once this many shards exist
+MAX_SHARDS: int = 64
+
+EXPOSITION_MIMETYPE: str = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets: tuple[float, ...] = buckets
+        # One count per bucket plus the +Inf bucket, not cumulative
+        self.counts: list[int] = [0] * (len(buckets) + 1)
+        self.sum: float = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def merge(self, other: "Histogram") -> None:
+        for index, count in enumerate(list(other.counts)):
+            self.counts[index] += count
+
+        self.sum += other.sum
+
+
+# Metrics of a single thread. Only that thread writes to it, so updates need no lock. Readers copy the
+# dicts before iterating (dict.copy is atomic under the GIL) and tolerate values that are a few updates old.
+class Shard:
+    def __init__(self) -> None:
+        self.thread: threading.Thread = threading.current_thread()
+        self.requests: defaultdict[tuple[str, str, int], int] = defaultdict(int)
+        self.latencies: dict[tuple[str, str], Histogram] = {}
+        self.in_flight: defaultdict[str, int] = defaultdict(int)
+        self.pool_wait: Histogram = Histogram(POOL_WAIT_BUCKETS)
+
+    def observe_latency(self, endpoint: str, method: str, seconds: float) -> None:
+        histogram: Optional[Histogram] = self.latencies.get((endpoint, method))
+
+        if histogram is None:
+            histogram = self.latencies[(endpoint, method)] = Histogram(LATENCY_BUCKETS)
+
+        histogram.observe(seconds)
+
+    def merge(self, other: "Shard") -> None:
+        for key, count in other.requests.copy().items():
+            self.requests[key] += count
+
+        for key, histogram in other.latencies.copy().items():
+            if key not in self.latencies:
+                self.latencies[key] = Histogram(LATENCY_BUCKETS)
+
+            self.latencies[key].merge(histogram)
+
+        for endpoint, count in other.in_flight.copy().items():
+            self.in_flight[endpoint] += count
+
+        self.pool_wait.merge(other.pool_wait)
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._local: threading.local = threading.local()
+        self._lock: threading.Lock = threading.Lock()
+        self._shards: list[Shard] = []
+        # Totals of threads that have finished
+        self._retired: Shard = Shard()
+
+    def shard(self) -> Shard:
+        shard: Optional[Shard] = getattr(self._local, "shard", None)
+
+        if shard is None:
+            # Once per thread, the only place the hot path takes the lock
+            shard = self._local.shard = Shard()
+
+            with self._lock:
+                self._shards.append(shard)
+
+                if len(self._shards) > MAX_SHARDS:
+                    self._retire_finished_shards()
+
+        return shard
+
+    def collect(self) -> Shard:
+        total: Shard = Shard()
+
+        with self._lock:
+            self._retire_finished_shards()
+            total.merge(self._retired)
+
+            for shard in self._shards:
+                total.merge(shard)
+
+        return total
+
+    def _retire_finished_shards(self) -> None:
+        for shard in [shard for shard in self._shards if not shard.thread.is_alive()]:
+            self._retired.merge(shard)
+            self._shards.remove(shard)
+
+
+registry: Registry = Registry()
+
+
+def init_metrics(app: Flask) -> None:
+    if not app.config["METRICS_ENABLED"]:
+        return
+
+    with app.app_context():
+        for engine in get_engines():
+            _instrument_pool(engine)
+
+    app.before_request(_start_request)
+    app.after_request(_record_status)
+    app.teardown_request(_finish_request)
+
+
+def render_metrics(engine: Engine) -> str:
+    total: Shard = registry.collect()
+    lines: list[str] = []
+
+    lines += _header("http_requests_total", "counter", "Requests handled, by endpoint, method and status code.")
+    lines += [f"http_requests_total{_labels(endpoint=endpoint, method=method, status=status)} {count}"
+              for (endpoint, method, status), count in sorted(total.requests.items())]
+
+    lines += _header("http_request_duration_seconds", "histogram", "Request latency, by endpoint and method.")
+
+    for (endpoint, method), histogram in sorted(total.latencies.items()):
+        lines += _histogram_lines("http_request_duration_seconds", histogram, endpoint=endpoint, method=method)
+
+    lines += _header("http_requests_in_flight", "gauge", "Requests being handled, by endpoint.")
+    lines += [f"http_requests_in_flight{_labels(endpoint=endpoint)} {count}"
+              for endpoint, count in sorted(total.in_flight.items())]
+
+    lines += _header("db_pool_checkout_wait_seconds", "histogram", "Time spent waiting for a database connection.")
+    lines += _histogram_lines("db_pool_checkout_wait_seconds", total.pool_wait)
+
+    checked_out: Optional[Callable[[], int]] = getattr(engine.pool, "checkedout", None)
+
+    if checked_out is not None:
+        lines += _header("db_pool_checked_out_connections", "gauge", "Database connections in use.")
+        lines.append(f"db_pool_checked_out_connections {checked_out()}")
+
+    running_jobs, queued_jobs = password_hashing.get_job_counts()
+
+    lines += _header("password_hashing_jobs", "gauge", "bcrypt jobs on the password hashing pool, by state.")
+    lines.append(f'password_hashing_jobs{{state="running"}} {running_jobs}')
+    lines.append(f'password_hashing_jobs{{state="queued"}} {queued_jobs}')
+
+    return "\n".join(lines) + "\n"
+
+
+def _start_request() -> None:
+    g.metrics_started_at = time.perf_counter()
+    g.metrics_endpoint = request.endpoint or "unmatched"
+
+    registry.shard().in_flight[g.metrics_endpoint] += 1
+
+
+def _record_status(response: Response) -> Response:
+    g.metrics_status = response.status_code
+
+    return response
+
+
+# Teardown also runs after unhandled exceptions, which never reach after_request
+def _finish_request(_exception: Optional[BaseException]) -> None:
+    started_at: Optional[float] = g.pop("metrics_started_at", None)
+
+    if started_at is None:
+        return
+
+    shard: Shard = registry.shard()
+    endpoint: str = g.pop("metrics_endpoint")
+
+    shard.in_flight[endpoint] -= 1
+    shard.requests[(endpoint, request.method, g.pop("metrics_status", 500))] += 1
+    shard.observe_latency(endpoint, request.method, time.perf_counter() - started_at)
+
+
+# The pool has no event before a checkout starts, so the wait is measured around Engine.raw_connection, through
+# which every Connection checks out. Not around Pool.connect: engine.dispose() replaces the pool, not the engine.
+def _instrument_pool(engine: Engine) -> None:
+    raw_connection: Callable[[], PoolProxiedConnection] = engine.raw_connection
+
+    def timed_raw_connection() -> PoolProxiedConnection:
+        started_at: float = time.perf_counter()
+
+        try:
+            return raw_connection()
+        finally:
+            registry.shard().pool_wait.observe(time.perf_counter() - started_at)
+
+    engine.raw_connection = timed_raw_connection
+
+
+def _header(name: str, metric_type: str, description: str) -> list[str]:
+    return [f"# HELP {name} {description}", f"# TYPE {name} {metric_type}"]
+
+
+def _histogram_lines(name: str, histogram: Histogram, **labels: str) -> Iterator[str]:
+    cumulative: int = 0
+
+    for bound, count in zip([*map(str, histogram.buckets), "+Inf"], histogram.counts):
+        cumulative += count
+        yield f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}"
+
+    yield f"{name}_sum{_labels(**labels)} {histogram.sum}"
+    yield f"{name}_count{_labels(**labels)} {cumulative}"
+
+
+def _labels(**labels: object) -> str:
+    if not labels:
+        return ""
+
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
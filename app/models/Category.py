@@ -1,12 +1,17 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, DateTime
+from sqlalchemy import Column, ForeignKey, Integer, String, DateTime, Index, text
 from sqlalchemy.orm import relationship
 
 from app import database
+from ..search_index import SearchIndex, register_search_index
 from ..utils import get_utc_time
 
 
 class Category(database.Model):
     __tablename__ = "categories"
+    __table_args__ = (
+        Index("ix_categories_user_id", "user_id"),
+        Index("ix_categories_deleted_at", "deleted_at", sqlite_where=text("deleted_at IS NOT NULL")),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -14,6 +19,8 @@ class Category(database.Model):
     description = Column(String(250), nullable=True)
     created_at = Column(DateTime, default=get_utc_time, nullable=False)
     updated_at = Column(DateTime, default=get_utc_time, onupdate=get_utc_time, nullable=False)
+    # Pending purge, like User.deleted_at
+    deleted_at = Column(DateTime, nullable=True)
 
     user = relationship(
         "User",
@@ -23,5 +30,9 @@ class Category(database.Model):
     habit_tasks = relationship(
         "HabitTask",
         back_populates="category",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
+
+
+category_search_index: SearchIndex = register_search_index(Category.__table__, {"name": 10.0, "description": 1.0})
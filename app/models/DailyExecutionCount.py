@@ -0,0 +1,16 @@
+from sqlalchemy import Column, ForeignKey, Integer, Date, Index
+
+from app import database
+
+
+class DailyExecutionCount(database.Model):
+    __tablename__ = "daily_execution_counts"
+    __table_args__ = (
+        Index("ix_daily_execution_counts_user_id_day", "user_id", "day"),
+    )
+
+    habit_task_id = Column(Integer, ForeignKey("habit_tasks.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    # Owner of the habit task, denormalized like ExecutionHistory.user_id
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    count = Column(Integer, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, DateTime
+from sqlalchemy import Column, ForeignKey, Integer, DateTime, Index
 from sqlalchemy.orm import relationship
 
 from app import database
@@ -7,9 +7,17 @@ from ..utils import get_utc_time
 
 class ExecutionHistory(database.Model):
     __tablename__ = "execution_histories"
+    __table_args__ = (
+        # SQLite appends the rowid (id) to every index, so these also serve ORDER BY executed_at, id
+        Index("ix_execution_histories_user_id_executed_at", "user_id", "executed_at"),
+        Index("ix_execution_histories_habit_task_id_executed_at", "habit_task_id", "executed_at"),
+        Index("ix_execution_histories_executed_at", "executed_at"),
+    )
 
     id = Column(Integer, primary_key=True)
     habit_task_id = Column(Integer, ForeignKey("habit_tasks.id", ondelete="CASCADE"), nullable=False)
+    # Denormalized owner (habit_task.category.user_id), so user-scoped queries avoid joining through two tables
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     executed_at = Column(DateTime, default=get_utc_time, nullable=False)
 
     habit_task = relationship(
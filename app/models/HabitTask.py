@@ -1,12 +1,16 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, DateTime
+from sqlalchemy import Column, ForeignKey, Integer, String, DateTime, Index
 from sqlalchemy.orm import relationship
 
 from app import database
+from ..search_index import SearchIndex, register_search_index
 from ..utils import get_utc_time
 
 
 class HabitTask(database.Model):
     __tablename__ = "habit_tasks"
+    __table_args__ = (
+        Index("ix_habit_tasks_category_id", "category_id"),
+    )
 
     id = Column(Integer, primary_key=True)
     category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), nullable=False)
@@ -23,5 +27,22 @@ class HabitTask(database.Model):
     execution_histories = relationship(
         "ExecutionHistory",
         back_populates="habit_task",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
+
+    daily_execution_counts = relationship(
+        "DailyExecutionCount",
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
+
+    streak = relationship(
+        "HabitTaskStreak",
+        uselist=False,
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
+
+
+habit_task_search_index: SearchIndex = register_search_index(HabitTask.__table__, {"name": 10.0, "description": 1.0})
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, ForeignKey, Integer, Date, DateTime
+
+from app import database
+from ..utils import get_utc_time
+
+
+class HabitTaskStreak(database.Model):
+    __tablename__ = "habit_task_streaks"
+
+    habit_task_id = Column(Integer, ForeignKey("habit_tasks.id", ondelete="CASCADE"), primary_key=True)
+    current_streak = Column(Integer, nullable=False, default=0)
+    longest_streak = Column(Integer, nullable=False, default=0)
+    # Last day with an execution, current_streak is the run of consecutive days ending on it
+    last_execution_day = Column(Date, nullable=True)
+    updated_at = Column(DateTime, default=get_utc_time, onupdate=get_utc_time, nullable=False)
@@ -1,10 +1,11 @@
 import enum
 
-import bcrypt
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum, Index, text
 from sqlalchemy.orm import relationship
 
 from app import database
+from ..password_hashing import hash_password, check_password
+from ..search_index import SearchIndex, register_search_index
 from ..utils import get_utc_time
 
 
@@ -15,6 +16,10 @@ class UserRole(enum.Enum):
 
 class User(database.Model):
     __tablename__ = "users"
+    __table_args__ = (
+        # Only rows waiting to be purged are indexed
+        Index("ix_users_deleted_at", "deleted_at", sqlite_where=text("deleted_at IS NOT NULL")),
+    )
 
     id = Column(Integer, primary_key=True)
     first_name = Column(String(50), nullable=False)
@@ -25,16 +30,22 @@ class User(database.Model):
     role = Column(Enum(UserRole), nullable=False, default=UserRole.USER)
     created_at = Column(DateTime, nullable=False, default=get_utc_time)
     updated_at = Column(DateTime, nullable=False, default=get_utc_time, onupdate=get_utc_time)
+    # Set when the user is deleted asynchronously, the row is removed once its data has been purged
+    deleted_at = Column(DateTime, nullable=True)
 
     categories = relationship(
         "Category",
         back_populates="user",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
 
+    # bcrypt runs on the password hashing pool when one is configured
     def set_password(self, plain_password: str) -> None:
-        salt = bcrypt.gensalt()
-        self.hashed_password = bcrypt.hashpw(plain_password.encode("utf-8"), salt).decode("utf-8")
+        self.hashed_password = hash_password(plain_password)
 
     def check_password(self, plain_password: str) -> bool:
-        return bcrypt.checkpw(plain_password.encode("utf-8"), self.hashed_password.encode("utf-8"))
+        return check_password(plain_password, self.hashed_password)
+
+
+user_search_index: SearchIndex = register_search_index(User.__table__, {"first_name": 1.0, "last_name": 1.0})
@@ -1,4 +1,6 @@
 from .Category import Category
+from .DailyExecutionCount import DailyExecutionCount
 from .ExecutionHistory import ExecutionHistory
 from .HabitTask import HabitTask
+from .HabitTaskStreak import HabitTaskStreak
 from .User import User
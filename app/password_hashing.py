@@ -0,0 +1,193 @@
+import atexit
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional, TypeVar
+
+import bcrypt
+from flask import Flask
+
+from app.exceptions.exceptions import ServiceUnavailableException
+
+T = TypeVar("T")
+
+DEFAULT_ROUNDS: int = 12
+MIN_ROUNDS: int = 4
+MAX_ROUNDS: int = 31
+
+_executor: Optional[ProcessPoolExecutor] = None
+# Held while a broken pool is replaced
+_executor_lock: threading.Lock = threading.Lock()
+_slots: Optional[threading.BoundedSemaphore] = None
+_rounds: int = DEFAULT_ROUNDS
+_pool_size: int = 0
+# Jobs submitted to the pool and not finished yet, read by the metrics endpoint
+_pending_jobs: int = 0
+_pending_jobs_lock: threading.Lock = threading.Lock()
+
+
+def init_password_hashing(app: Flask) -> None:
+    global _executor, _slots, _rounds, _pool_size
+
+    shutdown_password_hashing()
+
+    rounds: int = app.config["BCRYPT_ROUNDS"]
+
+    if not MIN_ROUNDS <= rounds <= MAX_ROUNDS:
+        raise ValueError(f"BCRYPT_ROUNDS must be between {MIN_ROUNDS} and {MAX_ROUNDS}")
+
+    _rounds = rounds
+
+    pool_size: int = app.config["PASSWORD_HASHING_POOL_SIZE"]
+
+    # Without a pool, hashing runs inline on the calling thread (CLI commands, seeding, tests)
+    if pool_size <= 0:
+        return
+
+    _pool_size = pool_size
+    _executor = _create_executor(pool_size)
+    # Running and queued jobs together, anything above is rejected instead of waiting
+    _slots = threading.BoundedSemaphore(pool_size + app.config["PASSWORD_HASHING_QUEUE_LIMIT"])
+
+
+def shutdown_password_hashing() -> None:
+    global _executor, _slots, _pool_size
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+
+        _executor = None
+        _slots = None
+        _pool_size = 0
+
+
+# Jobs currently hashing on a worker and jobs waiting for one
+def get_job_counts() -> tuple[int, int]:
+    pending_jobs: int = _pending_jobs
+
+    return min(pending_jobs, _pool_size), max(pending_jobs - _pool_size, 0)
+
+
+def hash_password(plain_password: str) -> str:
+    return _run(_hash_password, plain_password, _rounds)
+
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    return _run(_check_password, plain_password, hashed_password)
+
+
+# Hashes look like $2b$12$<salt and digest>, the second field is the cost they were created with
+def needs_rehash(hashed_password: str) -> bool:
+    return get_rounds(hashed_password) != _rounds
+
+
+def get_rounds(hashed_password: str) -> int:
+    return int(hashed_password.split("$")[2])
+
+
+def measure_check_time(rounds: int, samples: int = 3) -> float:
+    hashed_password: str = _hash_password("benchmark", rounds)
+    durations: list[float] = []
+
+    for _ in range(samples):
+        start: float = time.perf_counter()
+        _check_password("benchmark", hashed_password)
+        durations.append(time.perf_counter() - start)
+
+    return min(durations)
+
+
+# Highest cost whose verification stays within the target on this host. Each round doubles the work,
+# so the search stops at the first cost that is too slow.
+def pick_rounds(target_seconds: float,
+                max_rounds: int = 16,
+                measure: Callable[[int], float] = measure_check_time) -> tuple[int, dict[int, float]]:
+    timings: dict[int, float] = {}
+    picked: int = MIN_ROUNDS
+
+    for rounds in range(MIN_ROUNDS, max_rounds + 1):
+        timings[rounds] = measure(rounds)
+
+        if timings[rounds] > target_seconds:
+            break
+
+        picked = rounds
+
+    return picked, timings
+
+
+def _run(function: Callable[..., T], *args) -> T:
+    executor: Optional[ProcessPoolExecutor] = _executor
+    slots: Optional[threading.BoundedSemaphore] = _slots
+
+    if executor is None or slots is None:
+        return function(*args)
+
+    if not slots.acquire(blocking=False):
+        raise ServiceUnavailableException()
+
+    _add_pending_jobs(1)
+
+    try:
+        try:
+            return _submit(executor, function, *args)
+        except BrokenProcessPool:
+            # One worker that died (OOM kill, crash) breaks the whole pool. Hashing has no side effects, so the job
+            # is retried once on a new pool.
+            executor = _replace_broken_executor(executor)
+
+            try:
+                return _submit(executor, function, *args)
+            except BrokenProcessPool:
+                raise ServiceUnavailableException()
+    finally:
+        _add_pending_jobs(-1)
+        slots.release()
+
+
+def _submit(executor: ProcessPoolExecutor, function: Callable[..., T], *args) -> T:
+    future: Future = executor.submit(function, *args)
+
+    return future.result()
+
+
+def _create_executor(pool_size: int) -> ProcessPoolExecutor:
+    # Spawned workers do not inherit the locks of a threaded server like forked ones would
+    return ProcessPoolExecutor(max_workers=pool_size, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _replace_broken_executor(broken_executor: ProcessPoolExecutor) -> ProcessPoolExecutor:
+    global _executor
+
+    with _executor_lock:
+        # Shut down meanwhile
+        if _executor is None:
+            raise ServiceUnavailableException()
+
+        # Every job running on the broken pool fails, the first one to get here replaces it for all of them
+        if _executor is broken_executor:
+            broken_executor.shutdown(wait=False, cancel_futures=True)
+            _executor = _create_executor(_pool_size)
+
+        return _executor
+
+
+def _add_pending_jobs(delta: int) -> None:
+    global _pending_jobs
+
+    with _pending_jobs_lock:
+        _pending_jobs += delta
+
+
+def _hash_password(plain_password: str, rounds: int) -> str:
+    return bcrypt.hashpw(plain_password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def _check_password(plain_password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+
+atexit.register(shutdown_password_hashing)
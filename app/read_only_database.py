@@ -0,0 +1,78 @@
+from typing import Optional
+
+from flask import Flask, current_app, g
+from sqlalchemy import Connection, Engine, create_engine, event
+from sqlalchemy.engine import URL
+
+from app.sqlite_pragmas import PragmaValue, create_pragma_listener
+
+# Stored in the database file and set by the read-write connections
+WRITER_ONLY_PRAGMAS: frozenset[str] = frozenset({"journal_mode"})
+
+
+# The same database file opened with mode=ro. An in-memory database is only reachable through the connection
+# that created it, so it gets none.
+def get_read_only_url(url: URL) -> Optional[URL]:
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:") or "uri" in url.query:
+        return None
+
+    return url.set(database=f"file:{url.database}", query={**url.query, "mode": "ro", "uri": "true"})
+
+
+def init_read_only_database(app: Flask) -> None:
+    from app import database
+
+    if not app.config["READ_ONLY_CONNECTIONS_ENABLED"]:
+        return
+
+    with app.app_context():
+        # Flask-SQLAlchemy has already resolved relative paths against the instance folder
+        url: Optional[URL] = get_read_only_url(database.engine.url)
+
+    if url is None:
+        return
+
+    engine: Engine = create_engine(url)
+    pragmas: dict[str, PragmaValue] = {name: value for name, value in app.config["SQLITE_PRAGMAS"].items()
+                                       if name not in WRITER_ONLY_PRAGMAS}
+    event.listen(engine, "connect", create_pragma_listener(pragmas))
+
+    app.extensions["read_only_database"] = engine
+    app.teardown_appcontext(_close_read_connection)
+
+
+def get_read_only_engine() -> Optional[Engine]:
+    return current_app.extensions.get("read_only_database")
+
+
+# For instrumenting every engine of the current app
+def get_engines() -> list[Engine]:
+    from app import database
+
+    read_only_engine: Optional[Engine] = get_read_only_engine()
+
+    return [database.engine] if read_only_engine is None else [database.engine, read_only_engine]
+
+
+# Connection for listings that are mapped straight into DTOs: Core rows, no session, so no autoflush and no
+# identity map. One per app context, returned to the pool on teardown (after a streamed response is written).
+# Without a read-only engine it is the connection of the session.
+def get_read_connection() -> Connection:
+    from app import database
+
+    engine: Optional[Engine] = get_read_only_engine()
+
+    if engine is None:
+        return database.session.connection()
+
+    if "read_connection" not in g:
+        g.read_connection = engine.connect()
+
+    return g.read_connection
+
+
+def _close_read_connection(_exception: Optional[BaseException]) -> None:
+    connection: Optional[Connection] = g.pop("read_connection", None)
+
+    if connection is not None:
+        connection.close()
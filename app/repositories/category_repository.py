@@ -1,30 +1,80 @@
-from typing import Optional
+from functools import lru_cache
+from typing import Iterator, Optional
 
+from sqlalchemy import Row, Select, bindparam, or_, select
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import TableClause
 
+from app import database
 from app.models import Category
+from app.models.Category import category_search_index
+from app.read_only_database import get_read_connection
+from app.repositories.purge_repository import get_pending_user_ids_statement
+from app.repositories.statements import get_filter_parameters, like_pattern, select_rows
+from app.search_index import get_match_expression, get_short_term
+from app.utils import get_utc_time
 
 
 def get_categories(user_id: Optional[int],
-                   name: Optional[str]) -> list[Category]:
-    query = Category.query
+                   name: Optional[str]) -> list[Row]:
+    parameters: dict = _get_categories_parameters(user_id, name)
 
-    if user_id is not None:
-        query = query.filter(Category.user_id == user_id)
+    return list(get_read_connection().execute(get_categories_statement(frozenset(parameters)), parameters))
 
-    if name is not None:
-        query = query.filter(Category.name.ilike(f"%{name}%"))
 
-    return query.all()
+def iter_categories(user_id: Optional[int],
+                    name: Optional[str],
+                    batch_size: int = 1000) -> Iterator[Row]:
+    parameters: dict = _get_categories_parameters(user_id, name)
+
+    yield from get_read_connection().execute(get_categories_statement(frozenset(parameters)), parameters,
+                                             execution_options={"yield_per": batch_size})
+
+
+@lru_cache
+def get_categories_statement(filters: frozenset[str]) -> Select:
+    statement = select_rows(Category).where(Category.deleted_at.is_(None),
+                                            Category.user_id.not_in(get_pending_user_ids_statement()))
+
+    if "user_id" in filters:
+        statement = statement.where(Category.user_id == bindparam("user_id"))
+
+    if "name_match" in filters:
+        search_table: TableClause = category_search_index.table
+        statement = (statement.join(search_table, search_table.c.rowid == Category.id)
+                     .where(category_search_index.match(None, bindparam("name_match")))
+                     .order_by(category_search_index.rank()))
+
+    if "name" in filters:
+        statement = statement.where(or_(Category.name.ilike(bindparam("name")),
+                                        Category.description.ilike(bindparam("name"))))
+
+    return statement
+
+
+# Searches name and description. Terms long enough for the trigram index go through it, shorter ones fall back
+# to a LIKE scan.
+def _get_categories_parameters(user_id: Optional[int],
+                               name: Optional[str]) -> dict:
+    return get_filter_parameters(user_id=user_id, name_match=get_match_expression(name),
+                                 name=like_pattern(get_short_term(name)))
 
 
 def get_category_by_id(category_id: int, user_id: Optional[int]) -> Optional[Category]:
-    query = Category.query.filter(Category.id == category_id)
+    parameters: dict = get_filter_parameters(category_id=category_id, user_id=user_id)
+
+    return database.session.scalars(get_category_by_id_statement(frozenset(parameters)), parameters).first()
+
+
+@lru_cache
+def get_category_by_id_statement(filters: frozenset[str]) -> Select:
+    statement = select(Category).where(Category.id == bindparam("category_id"), Category.deleted_at.is_(None),
+                                       Category.user_id.not_in(get_pending_user_ids_statement()))
 
-    if user_id is not None:
-        query = query.filter(Category.user_id == user_id)
+    if "user_id" in filters:
+        statement = statement.where(Category.user_id == bindparam("user_id"))
 
-    return query.first()
+    return statement
 
 
 def create_category(session: Session, category: Category) -> Category:
@@ -43,6 +93,11 @@ def create_default_category_for_user(session: Session, user_id: int) -> Category
     return category
 
 
+def mark_category_deleted(session: Session, category: Category) -> Category:
+    category.deleted_at = get_utc_time()
+    return category
+
+
 def delete_category(session: Session, category: Category) -> Category:
     session.delete(category)
     return category
@@ -0,0 +1,115 @@
+from datetime import date
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import select, update, delete, func, insert, Select, bindparam, Row
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models import DailyExecutionCount, ExecutionHistory, HabitTask
+from app.read_only_database import get_read_connection
+from app.repositories.purge_repository import get_hidden_habit_task_ids_statement
+from app.repositories.statements import get_filter_parameters, select_rows
+
+
+def get_daily_execution_counts(user_id: Optional[int],
+                               category_id: Optional[int],
+                               habit_task_id: Optional[int],
+                               start_date: Optional[date],
+                               end_date: Optional[date]) -> list[Row]:
+    parameters: dict = get_filter_parameters(user_id=user_id, category_id=category_id, habit_task_id=habit_task_id,
+                                             start_date=start_date, end_date=end_date)
+
+    return list(get_read_connection().execute(get_daily_execution_counts_statement(frozenset(parameters)),
+                                              parameters))
+
+
+@lru_cache
+def get_daily_execution_counts_statement(filters: frozenset[str]) -> Select:
+    statement = _filter_daily_execution_counts(select_rows(DailyExecutionCount), filters)
+
+    return statement.order_by(DailyExecutionCount.day, DailyExecutionCount.habit_task_id)
+
+
+def get_daily_totals(user_id: Optional[int],
+                     category_id: Optional[int],
+                     start_date: date,
+                     end_date: date) -> list[tuple[date, int]]:
+    parameters: dict = get_filter_parameters(user_id=user_id, category_id=category_id, start_date=start_date,
+                                             end_date=end_date)
+    rows = get_read_connection().execute(get_daily_totals_statement(frozenset(parameters)), parameters)
+
+    return [(day, total) for day, total in rows]
+
+
+@lru_cache
+def get_daily_totals_statement(filters: frozenset[str]) -> Select:
+    statement = select(DailyExecutionCount.day, func.sum(DailyExecutionCount.count))
+
+    return _filter_daily_execution_counts(statement, filters).group_by(DailyExecutionCount.day)
+
+
+def increment_daily_execution_counts(session: Session, rows: list[dict]) -> None:
+    table = DailyExecutionCount.__table__
+    statement = sqlite_insert(table)
+
+    session.execute(
+        statement.on_conflict_do_update(
+            index_elements=[table.c.habit_task_id, table.c.day],
+            set_={"count": table.c.count + statement.excluded.count}
+        ),
+        rows
+    )
+
+
+def decrement_daily_execution_count(session: Session, habit_task_id: int, day: date) -> None:
+    table = DailyExecutionCount.__table__
+    key = (table.c.habit_task_id == habit_task_id) & (table.c.day == day)
+
+    session.execute(update(table).where(key).values(count=table.c.count - 1))
+    session.execute(delete(table).where(key & (table.c.count <= 0)))
+
+
+def update_user_id_for_habit_task(session: Session, habit_task_id: int, user_id: int) -> None:
+    table = DailyExecutionCount.__table__
+
+    session.execute(update(table).where(table.c.habit_task_id == habit_task_id).values(user_id=user_id))
+
+
+def rebuild_daily_execution_counts(session: Session) -> int:
+    table = DailyExecutionCount.__table__
+    execution_day = func.date(ExecutionHistory.executed_at)
+
+    session.execute(delete(table))
+    result = session.execute(
+        insert(table).from_select(
+            ["habit_task_id", "day", "user_id", "count"],
+            select(ExecutionHistory.habit_task_id, execution_day, func.max(ExecutionHistory.user_id), func.count())
+            .group_by(ExecutionHistory.habit_task_id, execution_day)
+        )
+    )
+
+    return result.rowcount
+
+
+def _filter_daily_execution_counts(statement: Select, filters: frozenset[str]) -> Select:
+    statement = statement.where(DailyExecutionCount.habit_task_id.not_in(get_hidden_habit_task_ids_statement()))
+
+    if "user_id" in filters:
+        statement = statement.where(DailyExecutionCount.user_id == bindparam("user_id"))
+
+    if "category_id" in filters:
+        statement = statement.where(DailyExecutionCount.habit_task_id.in_(
+            select(HabitTask.id).where(HabitTask.category_id == bindparam("category_id"))
+        ))
+
+    if "habit_task_id" in filters:
+        statement = statement.where(DailyExecutionCount.habit_task_id == bindparam("habit_task_id"))
+
+    if "start_date" in filters:
+        statement = statement.where(DailyExecutionCount.day >= bindparam("start_date"))
+
+    if "end_date" in filters:
+        statement = statement.where(DailyExecutionCount.day <= bindparam("end_date"))
+
+    return statement
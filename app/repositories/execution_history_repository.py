@@ -1,48 +1,110 @@
 from datetime import datetime
-from typing import Optional
+from functools import lru_cache
+from typing import Iterator, Optional
 
+from sqlalchemy import tuple_, update, inspect, text, select, insert, type_coerce, String, Select, bindparam, \
+    DateTime, Integer, Row, Connection
 from sqlalchemy.orm import Session
 
-from app.models import ExecutionHistory, HabitTask
+from app import database
+from app.models import ExecutionHistory, HabitTask, Category
+from app.read_only_database import get_read_connection
+from app.repositories.purge_repository import get_hidden_habit_task_ids_statement
+from app.repositories.statements import get_filter_parameters, select_rows
 
 
 def get_execution_histories(user_id: Optional[int],
                             category_id: Optional[int],
                             habit_task_id: Optional[int],
                             start_datetime: Optional[datetime],
-                            end_datetime: Optional[datetime]) -> list[ExecutionHistory]:
-    query = ExecutionHistory.query
+                            end_datetime: Optional[datetime]) -> list[Row]:
+    parameters: dict = get_filter_parameters(user_id=user_id, category_id=category_id, habit_task_id=habit_task_id,
+                                             start_datetime=start_datetime, end_datetime=end_datetime)
+
+    return list(get_read_connection().execute(get_execution_histories_statement(frozenset(parameters)), parameters))
+
+
+def iter_execution_histories(user_id: Optional[int],
+                             category_id: Optional[int],
+                             habit_task_id: Optional[int],
+                             start_datetime: Optional[datetime],
+                             end_datetime: Optional[datetime],
+                             batch_size: int = 1000) -> Iterator[Row]:
+    parameters: dict = get_filter_parameters(user_id=user_id, category_id=category_id, habit_task_id=habit_task_id,
+                                             start_datetime=start_datetime, end_datetime=end_datetime)
+
+    # Generator so the query only runs once the streamed response starts consuming it
+    yield from get_read_connection().execute(get_execution_histories_statement(frozenset(parameters)), parameters,
+                                             execution_options={"yield_per": batch_size})
 
-    if user_id is not None:
-        query = query.filter(ExecutionHistory.habit_task.has(
-            HabitTask.category.has(user_id=user_id)
-        )
-        )
 
-    if category_id is not None:
-        query = query.filter(ExecutionHistory.habit_task.has(category_id=category_id))
+@lru_cache
+def get_execution_histories_statement(filters: frozenset[str]) -> Select:
+    return _filter_execution_histories(select_rows(ExecutionHistory), filters)
 
-    if habit_task_id is not None:
-        query = query.filter(ExecutionHistory.habit_task_id == habit_task_id)
 
-    if start_datetime is not None:
-        query = query.filter(start_datetime <= ExecutionHistory.executed_at)
+def get_execution_histories_page(user_id: Optional[int],
+                                 category_id: Optional[int],
+                                 habit_task_id: Optional[int],
+                                 start_datetime: Optional[datetime],
+                                 end_datetime: Optional[datetime],
+                                 after: Optional[tuple[datetime, int]],
+                                 limit: int) -> list[Row]:
+    after_executed_at, after_id = after if after is not None else (None, None)
+    parameters: dict = get_filter_parameters(user_id=user_id, category_id=category_id, habit_task_id=habit_task_id,
+                                             start_datetime=start_datetime, end_datetime=end_datetime,
+                                             after_executed_at=after_executed_at, after_id=after_id, limit=limit)
 
-    if end_datetime is not None:
-        query = query.filter(ExecutionHistory.executed_at <= end_datetime)
+    return list(get_read_connection().execute(get_execution_histories_page_statement(frozenset(parameters)),
+                                              parameters))
 
-    return query.all()
+
+@lru_cache
+def get_execution_histories_page_statement(filters: frozenset[str]) -> Select:
+    statement = _filter_execution_histories(select_rows(ExecutionHistory), filters)
+
+    # Keyset condition: continue strictly after the last (executed_at, id) pair of the previous page
+    if "after_executed_at" in filters:
+        statement = statement.where(
+            tuple_(ExecutionHistory.executed_at, ExecutionHistory.id) >
+            tuple_(bindparam("after_executed_at", type_=DateTime), bindparam("after_id", type_=Integer))
+        )
+
+    return statement.order_by(ExecutionHistory.executed_at, ExecutionHistory.id).limit(bindparam("limit"))
 
 
 def get_execution_history_by_id(execution_history_id: int, user_id: Optional[int]) -> Optional[ExecutionHistory]:
-    query = ExecutionHistory.query.filter(ExecutionHistory.id == execution_history_id)
+    parameters: dict = get_filter_parameters(execution_history_id=execution_history_id, user_id=user_id)
 
-    if user_id is not None:
-        query = query.filter(ExecutionHistory.habit_task.has(
-            HabitTask.category.has(user_id=user_id)
-        ))
+    return database.session.scalars(get_execution_history_by_id_statement(frozenset(parameters)), parameters).first()
 
-    return query.first()
+
+@lru_cache
+def get_execution_history_by_id_statement(filters: frozenset[str]) -> Select:
+    statement = select(ExecutionHistory).where(ExecutionHistory.id == bindparam("execution_history_id"),
+                                               ExecutionHistory.habit_task_id.not_in(
+                                                   get_hidden_habit_task_ids_statement()))
+
+    if "user_id" in filters:
+        statement = statement.where(ExecutionHistory.user_id == bindparam("user_id"))
+
+    return statement
+
+
+def get_executed_at_values(habit_task_id: int, start_datetime: datetime, end_datetime: datetime) -> list[str]:
+    parameters: dict = {"habit_task_id": habit_task_id, "start_datetime": start_datetime, "end_datetime": end_datetime}
+
+    return list(get_read_connection().scalars(get_executed_at_values_statement(), parameters))
+
+
+@lru_cache
+def get_executed_at_values_statement() -> Select:
+    # Raw column text skips building a datetime per row, callers parse the values in bulk
+    return (select(type_coerce(ExecutionHistory.executed_at, String))
+            .where(ExecutionHistory.habit_task_id == bindparam("habit_task_id"),
+                   ExecutionHistory.executed_at >= bindparam("start_datetime"),
+                   ExecutionHistory.executed_at < bindparam("end_datetime"))
+            .order_by(ExecutionHistory.executed_at))
 
 
 def create_execution_history(session: Session, execution_history: ExecutionHistory) -> ExecutionHistory:
@@ -50,6 +112,82 @@ def create_execution_history(session: Session, execution_history: ExecutionHisto
     return execution_history
 
 
+def create_execution_histories(session: Session, rows: list[dict]) -> list[ExecutionHistory]:
+    # ORM bulk INSERT, batched by SQLAlchemy into multi-row statements, RETURNING the created entities in the order
+    # of rows
+    return list(session.scalars(insert(ExecutionHistory).returning(ExecutionHistory, sort_by_parameter_order=True),
+                                rows))
+
+
 def delete_execution_history(session: Session, execution_history: ExecutionHistory) -> ExecutionHistory:
     session.delete(execution_history)
     return execution_history
+
+
+def update_user_id_for_habit_task(session: Session, habit_task_id: int, user_id: int) -> int:
+    result = session.execute(
+        update(ExecutionHistory)
+        .where(ExecutionHistory.habit_task_id == habit_task_id)
+        .values(user_id=user_id)
+    )
+
+    return result.rowcount
+
+
+def add_user_id_column_if_missing(connection: Connection) -> bool:
+    columns: set[str] = {column["name"] for column in inspect(connection).get_columns(ExecutionHistory.__tablename__)}
+
+    if "user_id" in columns:
+        return False
+
+    # SQLite cannot add a NOT NULL column without a default, so pre-existing databases get a nullable one
+    connection.execute(text(
+        "ALTER TABLE execution_histories ADD COLUMN user_id INTEGER REFERENCES users (id) ON DELETE CASCADE"
+    ))
+
+    for index in ExecutionHistory.__table__.indexes:
+        if "user_id" in index.columns:
+            index.create(connection, checkfirst=True)
+
+    return True
+
+
+def backfill_user_ids(connection: Connection) -> int:
+    owner_id = (
+        select(Category.user_id)
+        .join(HabitTask, HabitTask.category_id == Category.id)
+        .where(HabitTask.id == ExecutionHistory.habit_task_id)
+        .scalar_subquery()
+    )
+
+    result = connection.execute(
+        update(ExecutionHistory)
+        .where((ExecutionHistory.user_id.is_(None)) | (ExecutionHistory.user_id != owner_id))
+        .values(user_id=owner_id)
+        .execution_options(synchronize_session=False)
+    )
+
+    return result.rowcount
+
+
+def _filter_execution_histories(statement: Select, filters: frozenset[str]) -> Select:
+    statement = statement.where(ExecutionHistory.habit_task_id.not_in(get_hidden_habit_task_ids_statement()))
+
+    if "user_id" in filters:
+        statement = statement.where(ExecutionHistory.user_id == bindparam("user_id"))
+
+    if "category_id" in filters:
+        statement = statement.where(ExecutionHistory.habit_task_id.in_(
+            select(HabitTask.id).where(HabitTask.category_id == bindparam("category_id"))
+        ))
+
+    if "habit_task_id" in filters:
+        statement = statement.where(ExecutionHistory.habit_task_id == bindparam("habit_task_id"))
+
+    if "start_datetime" in filters:
+        statement = statement.where(ExecutionHistory.executed_at >= bindparam("start_datetime"))
+
+    if "end_datetime" in filters:
+        statement = statement.where(ExecutionHistory.executed_at <= bindparam("end_datetime"))
+
+    return statement
@@ -1,34 +1,105 @@
-from typing import Optional
+from functools import lru_cache
+from typing import Iterator, Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy import Row, Select, bindparam, or_, select
+from sqlalchemy.orm import Session, contains_eager
+from sqlalchemy.sql.expression import TableClause
 
-from app.models import HabitTask
+from app import database
+from app.models import HabitTask, Category
+from app.models.HabitTask import habit_task_search_index
+from app.read_only_database import get_read_connection
+from app.repositories.purge_repository import get_hidden_category_ids_statement
+from app.repositories.statements import get_filter_parameters, like_pattern, select_rows
+from app.search_index import get_match_expression, get_short_term
 
 
 def get_habit_tasks(user_id: Optional[int],
                     category_id: Optional[int],
-                    name: Optional[str]) -> list[HabitTask]:
-    query = HabitTask.query
+                    name: Optional[str]) -> list[Row]:
+    parameters: dict = _get_habit_tasks_parameters(user_id, category_id, name)
 
-    if user_id is not None:
-        query = query.filter(HabitTask.category.has(user_id=user_id))
+    return list(get_read_connection().execute(get_habit_tasks_statement(frozenset(parameters)), parameters))
 
-    if category_id is not None:
-        query = query.filter(HabitTask.category_id == category_id)
 
-    if name is not None:
-        query = query.filter(HabitTask.name.ilike(f"%{name}%"))
+def iter_habit_tasks(user_id: Optional[int],
+                     category_id: Optional[int],
+                     name: Optional[str],
+                     batch_size: int = 1000) -> Iterator[Row]:
+    parameters: dict = _get_habit_tasks_parameters(user_id, category_id, name)
 
-    return query.all()
+    yield from get_read_connection().execute(get_habit_tasks_statement(frozenset(parameters)), parameters,
+                                             execution_options={"yield_per": batch_size})
+
+
+@lru_cache
+def get_habit_tasks_statement(filters: frozenset[str]) -> Select:
+    statement = select_rows(HabitTask).where(HabitTask.category_id.not_in(get_hidden_category_ids_statement()))
+
+    if "user_id" in filters:
+        # IN over the user's categories lets SQLite drive the lookup from both category_id indexes
+        statement = statement.where(HabitTask.category_id.in_(
+            select(Category.id).where(Category.user_id == bindparam("user_id"))
+        ))
+
+    if "category_id" in filters:
+        statement = statement.where(HabitTask.category_id == bindparam("category_id"))
+
+    if "name_match" in filters:
+        search_table: TableClause = habit_task_search_index.table
+        statement = (statement.join(search_table, search_table.c.rowid == HabitTask.id)
+                     .where(habit_task_search_index.match(None, bindparam("name_match")))
+                     .order_by(habit_task_search_index.rank()))
+
+    if "name" in filters:
+        statement = statement.where(or_(HabitTask.name.ilike(bindparam("name")),
+                                        HabitTask.description.ilike(bindparam("name"))))
+
+    return statement
+
+
+# Searches name and description. Terms long enough for the trigram index go through it, shorter ones fall back
+# to a LIKE scan.
+def _get_habit_tasks_parameters(user_id: Optional[int],
+                                category_id: Optional[int],
+                                name: Optional[str]) -> dict:
+    return get_filter_parameters(user_id=user_id, category_id=category_id, name_match=get_match_expression(name),
+                                 name=like_pattern(get_short_term(name)))
 
 
 def get_habit_task_by_id(habit_task_id: int, user_id: Optional[int]) -> Optional[HabitTask]:
-    query = HabitTask.query.filter(HabitTask.id == habit_task_id)
+    parameters: dict = get_filter_parameters(habit_task_id=habit_task_id, user_id=user_id)
+
+    return database.session.scalars(get_habit_task_by_id_statement(frozenset(parameters)), parameters).first()
+
+
+@lru_cache
+def get_habit_task_by_id_statement(filters: frozenset[str]) -> Select:
+    # The category is joined in the same SELECT, callers read its owner without a lazy load
+    statement = (select(HabitTask)
+                 .join(HabitTask.category)
+                 .options(contains_eager(HabitTask.category))
+                 .where(HabitTask.id == bindparam("habit_task_id"),
+                        HabitTask.category_id.not_in(get_hidden_category_ids_statement())))
+
+    if "user_id" in filters:
+        statement = statement.where(Category.user_id == bindparam("user_id"))
+
+    return statement
+
+
+def get_habit_task_owners(habit_task_ids: set[int]) -> dict[int, int]:
+    rows = database.session.execute(get_habit_task_owners_statement(), {"habit_task_ids": list(habit_task_ids)})
+
+    return {habit_task_id: user_id for habit_task_id, user_id in rows}
 
-    if user_id is not None:
-        query = query.filter(HabitTask.category.has(user_id=user_id))
 
-    return query.first()
+@lru_cache
+def get_habit_task_owners_statement() -> Select:
+    return (select(HabitTask.id, Category.user_id)
+            .join(Category, HabitTask.category_id == Category.id)
+            .where(HabitTask.id.in_(bindparam("habit_task_ids", expanding=True)),
+                   HabitTask.category_id.not_in(get_hidden_category_ids_statement())))
 
 
 def create_habit_task(session: Session, habit_task: HabitTask) -> HabitTask:
@@ -0,0 +1,61 @@
+from datetime import date, datetime, time, timedelta
+from typing import Iterator, Optional
+
+from sqlalchemy import select, func, delete
+from sqlalchemy.orm import Session
+
+from app import database
+from app.models import ExecutionHistory, HabitTaskStreak
+
+
+def get_streak(habit_task_id: int) -> Optional[HabitTaskStreak]:
+    return database.session.get(HabitTaskStreak, habit_task_id)
+
+
+def get_execution_days(habit_task_id: int) -> list[date]:
+    execution_day = func.date(ExecutionHistory.executed_at)
+
+    days = database.session.scalars(
+        select(execution_day)
+        .where(ExecutionHistory.habit_task_id == habit_task_id)
+        .group_by(execution_day)
+        .order_by(execution_day)
+    )
+
+    return [date.fromisoformat(day) for day in days]
+
+
+def get_all_execution_days() -> Iterator[tuple[int, date]]:
+    execution_day = func.date(ExecutionHistory.executed_at)
+
+    rows = database.session.execute(
+        select(ExecutionHistory.habit_task_id, execution_day)
+        .group_by(ExecutionHistory.habit_task_id, execution_day)
+        .order_by(ExecutionHistory.habit_task_id, execution_day)
+    )
+
+    return ((habit_task_id, date.fromisoformat(day)) for habit_task_id, day in rows)
+
+
+def has_execution_on_day(habit_task_id: int, day: date) -> bool:
+    day_start: datetime = datetime.combine(day, time.min)
+
+    # Range condition instead of date(executed_at) so the (habit_task_id, executed_at) index is used
+    execution_id: Optional[int] = database.session.scalar(
+        select(ExecutionHistory.id)
+        .where(ExecutionHistory.habit_task_id == habit_task_id,
+               ExecutionHistory.executed_at >= day_start,
+               ExecutionHistory.executed_at < day_start + timedelta(days=1))
+        .limit(1)
+    )
+
+    return execution_id is not None
+
+
+def create_streak(session: Session, streak: HabitTaskStreak) -> HabitTaskStreak:
+    session.add(streak)
+    return streak
+
+
+def delete_all_streaks(session: Session) -> None:
+    session.execute(delete(HabitTaskStreak))
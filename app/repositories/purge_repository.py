@@ -0,0 +1,104 @@
+from functools import lru_cache
+
+from sqlalchemy import ColumnElement, CompoundSelect, Connection, Select, Table, bindparam, delete, inspect, \
+    literal_column, select, text, union_all
+from sqlalchemy.orm import Session
+
+from app.models import Category, DailyExecutionCount, ExecutionHistory, HabitTask, User
+
+ROWID: ColumnElement = literal_column("rowid")
+
+
+def add_deleted_at_columns_if_missing(connection: Connection) -> list[str]:
+    updated_tables: list[str] = []
+
+    for model in (User, Category):
+        columns: set[str] = {column["name"] for column in inspect(connection).get_columns(model.__tablename__)}
+
+        if "deleted_at" in columns:
+            continue
+
+        connection.execute(text(f"ALTER TABLE {model.__tablename__} ADD COLUMN deleted_at DATETIME"))
+
+        for index in model.__table__.indexes:
+            if "deleted_at" in index.columns:
+                index.create(connection, checkfirst=True)
+
+        updated_tables.append(model.__tablename__)
+
+    return updated_tables
+
+
+def get_pending_user_ids(session: Session) -> list[int]:
+    return list(session.scalars(get_pending_user_ids_statement()))
+
+
+@lru_cache
+def get_pending_user_ids_statement() -> Select:
+    return select(User.id).where(User.deleted_at.is_not(None))
+
+
+def get_pending_category_ids(session: Session) -> list[int]:
+    return list(session.scalars(get_pending_category_ids_statement()))
+
+
+@lru_cache
+def get_pending_category_ids_statement() -> Select:
+    return select(Category.id).where(Category.deleted_at.is_not(None))
+
+
+# Everything below a pending user or category is hidden from reads until the purge has removed it. Few rows are
+# pending at a time, so these stay small lookups on the partial deleted_at indexes and the user_id index.
+@lru_cache
+def get_hidden_category_ids_statement() -> CompoundSelect:
+    # A UNION rather than OR, which would keep SQLite from using either index
+    return union_all(get_pending_category_ids_statement(),
+                     select(Category.id).where(Category.user_id.in_(get_pending_user_ids_statement())))
+
+
+@lru_cache
+def get_hidden_habit_task_ids_statement() -> Select:
+    return select(HabitTask.id).where(HabitTask.category_id.in_(get_hidden_category_ids_statement()))
+
+
+# Children are removed leaf tables first, so every batch only cascades into rows that are already gone
+def delete_user_data_batch(session: Session, user_id: int, batch_size: int) -> int:
+    user_category_ids: Select = select(Category.id).where(Category.user_id == bindparam("user_id"))
+
+    return _delete_first_batch(session, [
+        (ExecutionHistory.__table__, ExecutionHistory.user_id == bindparam("user_id")),
+        (DailyExecutionCount.__table__, DailyExecutionCount.user_id == bindparam("user_id")),
+        (HabitTask.__table__, HabitTask.category_id.in_(user_category_ids)),
+        (Category.__table__, Category.user_id == bindparam("user_id")),
+    ], {"user_id": user_id, "batch_size": batch_size})
+
+
+def delete_category_data_batch(session: Session, category_id: int, batch_size: int) -> int:
+    habit_task_ids: Select = select(HabitTask.id).where(HabitTask.category_id == bindparam("category_id"))
+
+    return _delete_first_batch(session, [
+        (ExecutionHistory.__table__, ExecutionHistory.habit_task_id.in_(habit_task_ids)),
+        (DailyExecutionCount.__table__, DailyExecutionCount.habit_task_id.in_(habit_task_ids)),
+        (HabitTask.__table__, HabitTask.category_id == bindparam("category_id")),
+    ], {"category_id": category_id, "batch_size": batch_size})
+
+
+def delete_user_row(session: Session, user_id: int) -> int:
+    return session.execute(delete(User).where(User.id == user_id)).rowcount
+
+
+def delete_category_row(session: Session, category_id: int) -> int:
+    return session.execute(delete(Category).where(Category.id == category_id)).rowcount
+
+
+# Deletes up to batch_size rows from the first table that still has matching rows. SQLite is usually built
+# without DELETE ... LIMIT, so the batch is selected by rowid.
+def _delete_first_batch(session: Session, steps: list[tuple[Table, ColumnElement]], parameters: dict) -> int:
+    for table, condition in steps:
+        batch: Select = select(ROWID).select_from(table).where(condition).limit(bindparam("batch_size"))
+        deleted: int = session.execute(delete(table).where(ROWID.in_(batch)), parameters).rowcount
+
+        if deleted:
+            return deleted
+
+    return 0
@@ -0,0 +1,18 @@
+from typing import Optional
+
+from sqlalchemy import Select, select
+
+
+# Statements are built once per combination of filters (see the lru_cached *_statement functions) and
+# only get new values bound per call, so SQLAlchemy reuses their cache key and compiled SQL.
+def get_filter_parameters(**filters: object) -> dict[str, object]:
+    return {name: value for name, value in filters.items() if value is not None}
+
+
+def like_pattern(value: Optional[str]) -> Optional[str]:
+    return None if value is None else f"%{value}%"
+
+
+# Plain rows instead of entities, for listings that go straight into DTOs, which read them by attribute
+def select_rows(model: type, *excluded: str) -> Select:
+    return select(*[column for column in model.__table__.columns if column.name not in excluded])
@@ -1,33 +1,89 @@
-from typing import Optional
+from functools import lru_cache
+from typing import Iterator, Optional
 
+from sqlalchemy import Row, Select, bindparam, select
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import TableClause
 
+from app import database
 from app.models import User
+from app.models.User import user_search_index
+from app.read_only_database import get_read_connection
+from app.repositories.statements import get_filter_parameters, like_pattern, select_rows
+from app.search_index import get_match_expression, get_short_term
+from app.utils import get_utc_time
 
 
 def get_users(first_name: Optional[str],
               last_name: Optional[str],
-              is_active: Optional[bool]) -> list[User]:
-    query = User.query
+              is_active: Optional[bool]) -> list[Row]:
+    parameters: dict = _get_users_parameters(first_name, last_name, is_active)
 
-    if first_name is not None:
-        query = query.filter(User.first_name.ilike(f"%{first_name}%"))
+    return list(get_read_connection().execute(get_users_statement(frozenset(parameters)), parameters))
 
-    if last_name is not None:
-        query = query.filter(User.last_name.ilike(f"%{last_name}%"))
 
-    if is_active is not None:
-        query = query.filter(User.is_active == is_active)
+def iter_users(first_name: Optional[str],
+               last_name: Optional[str],
+               is_active: Optional[bool],
+               batch_size: int = 1000) -> Iterator[Row]:
+    parameters: dict = _get_users_parameters(first_name, last_name, is_active)
 
-    return query.all()
+    yield from get_read_connection().execute(get_users_statement(frozenset(parameters)), parameters,
+                                             execution_options={"yield_per": batch_size})
+
+
+@lru_cache
+def get_users_statement(filters: frozenset[str]) -> Select:
+    # The password hash is never listed
+    statement = select_rows(User, "hashed_password").where(User.deleted_at.is_(None))
+
+    if "first_name_match" in filters or "last_name_match" in filters:
+        search_table: TableClause = user_search_index.table
+        statement = (statement.join(search_table, search_table.c.rowid == User.id)
+                     .order_by(user_search_index.rank()))
+
+    if "first_name_match" in filters:
+        statement = statement.where(user_search_index.match("first_name", bindparam("first_name_match")))
+
+    if "last_name_match" in filters:
+        statement = statement.where(user_search_index.match("last_name", bindparam("last_name_match")))
+
+    if "first_name" in filters:
+        statement = statement.where(User.first_name.ilike(bindparam("first_name")))
+
+    if "last_name" in filters:
+        statement = statement.where(User.last_name.ilike(bindparam("last_name")))
+
+    if "is_active" in filters:
+        statement = statement.where(User.is_active == bindparam("is_active"))
+
+    return statement
+
+
+# Terms long enough for the trigram index go through it, shorter ones fall back to a LIKE scan
+def _get_users_parameters(first_name: Optional[str],
+                          last_name: Optional[str],
+                          is_active: Optional[bool]) -> dict:
+    return get_filter_parameters(first_name_match=get_match_expression(first_name),
+                                 last_name_match=get_match_expression(last_name),
+                                 first_name=like_pattern(get_short_term(first_name)),
+                                 last_name=like_pattern(get_short_term(last_name)),
+                                 is_active=is_active)
 
 
 def get_user_by_id(user_id: int) -> Optional[User]:
-    return User.query.get(user_id)
+    user: Optional[User] = database.session.get(User, user_id)
+
+    return user if user is not None and user.deleted_at is None else None
 
 
 def get_user_by_email(email: str) -> Optional[User]:
-    return User.query.filter(User.email == email).first()
+    return database.session.scalars(get_user_by_email_statement(), {"email": email}).first()
+
+
+@lru_cache
+def get_user_by_email_statement() -> Select:
+    return select(User).where(User.email == bindparam("email"), User.deleted_at.is_(None))
 
 
 def create_user(session: Session, user: User) -> User:
@@ -35,6 +91,11 @@ def create_user(session: Session, user: User) -> User:
     return user
 
 
+def mark_user_deleted(session: Session, user: User) -> User:
+    user.deleted_at = get_utc_time()
+    return user
+
+
 def delete_user(session: Session, user: User) -> User:
     session.delete(user)
     return user
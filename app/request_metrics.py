@@ -0,0 +1,129 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from flask import Flask, Response, current_app, g, has_request_context, request
+from sqlalchemy import Connection, event
+from sqlalchemy.engine.interfaces import DBAPICursor, ExecutionContext
+
+from app.read_only_database import get_engines
+
+
+@dataclass
+class RequestMetrics:
+    started_at: float = field(default_factory=time.perf_counter)
+    query_count: int = 0
+    database_seconds: float = 0.0
+    serialization_seconds: float = 0.0
+    statement_counts: Counter = field(default_factory=Counter)
+
+    def get_repeated_statement(self) -> Optional[tuple[str, int]]:
+        if not self.statement_counts:
+            return None
+
+        return self.statement_counts.most_common(1)[0]
+
+
+def init_request_metrics(app: Flask) -> None:
+    if not app.config["REQUEST_METRICS_ENABLED"]:
+        return
+
+    with app.app_context():
+        # The read-only engine included
+        for engine in get_engines():
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+
+
+def get_request_metrics() -> Optional[RequestMetrics]:
+    # Statements outside a request (CLI commands, background tasks) are not recorded
+    if not has_request_context():
+        return None
+
+    return g.get("request_metrics")
+
+
+@contextmanager
+def measure_serialization() -> Iterator[None]:
+    started_at: float = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        metrics: Optional[RequestMetrics] = get_request_metrics()
+
+        if metrics is not None:
+            metrics.serialization_seconds += time.perf_counter() - started_at
+
+
+def _start_request() -> None:
+    g.request_metrics = RequestMetrics()
+
+
+def _finish_request(response: Response) -> Response:
+    metrics: Optional[RequestMetrics] = g.pop("request_metrics", None)
+
+    if metrics is None:
+        return response
+
+    total_seconds: float = time.perf_counter() - metrics.started_at
+    # Time spent in the view and its services, without the SQL and JSON encoding measured separately.
+    # Streamed bodies are encoded after this point and are not part of any of the durations.
+    handler_seconds: float = max(total_seconds - metrics.database_seconds - metrics.serialization_seconds, 0.0)
+
+    response.headers.add("Server-Timing", ", ".join([
+        f'db;dur={metrics.database_seconds * 1000:.2f};desc="{metrics.query_count} queries"',
+        f"serialization;dur={metrics.serialization_seconds * 1000:.2f}",
+        f"handler;dur={handler_seconds * 1000:.2f}",
+        f"total;dur={total_seconds * 1000:.2f}",
+    ]))
+
+    current_app.logger.info(
+        "request method=%s path=%s status=%d queries=%d db_ms=%.2f serialization_ms=%.2f handler_ms=%.2f "
+        "total_ms=%.2f", request.method, request.path, response.status_code, metrics.query_count,
+        metrics.database_seconds * 1000, metrics.serialization_seconds * 1000, handler_seconds * 1000,
+        total_seconds * 1000
+    )
+
+    repeated_statement: Optional[tuple[str, int]] = metrics.get_repeated_statement()
+
+    # The same statement over and over within one request usually means lazy loads in a loop
+    if repeated_statement is not None and repeated_statement[1] >= current_app.config["N_PLUS_ONE_THRESHOLD"]:
+        current_app.logger.warning(
+            "possible N+1 method=%s path=%s executions=%d statement=%s", request.method, request.path,
+            repeated_statement[1], " ".join(repeated_statement[0].split())
+        )
+
+    return response
+
+
+def _before_cursor_execute(connection: Connection,
+                           _cursor: DBAPICursor,
+                           _statement: str,
+                           _parameters: object,
+                           _context: Optional[ExecutionContext],
+                           _executemany: bool) -> None:
+    if get_request_metrics() is not None:
+        connection.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(connection: Connection,
+                          _cursor: DBAPICursor,
+                          statement: str,
+                          _parameters: object,
+                          _context: Optional[ExecutionContext],
+                          _executemany: bool) -> None:
+    metrics: Optional[RequestMetrics] = get_request_metrics()
+    started_at: list[float] = connection.info.get("query_started_at", [])
+
+    if metrics is None or not started_at:
+        return
+
+    metrics.query_count += 1
+    metrics.database_seconds += time.perf_counter() - started_at.pop()
+    metrics.statement_counts[statement] += 1
@@ -0,0 +1,41 @@
+from http import HTTPStatus
+
+from flask import Blueprint, jsonify, Response
+from flask_jwt_extended import jwt_required
+
+from ..dtos import DatabaseDiagnosticsReadDTO, SlowQueryReadDTO
+from ..services import admin_service
+from ..services.auth_service import get_jwt_data
+from ..utils import create_json_response
+
+admin_blueprint = Blueprint("admin", __name__)
+
+
+@admin_blueprint.route("/slow_queries", methods=["GET"])
+@jwt_required()
+def get_slow_queries() -> tuple[Response, HTTPStatus]:
+    _jwt_user_id, role = get_jwt_data()
+
+    slow_queries: list[SlowQueryReadDTO] = admin_service.get_slow_queries(role)
+
+    return create_json_response(slow_queries), HTTPStatus.OK
+
+
+@admin_blueprint.route("/slow_queries", methods=["DELETE"])
+@jwt_required()
+def clear_slow_queries() -> tuple[Response, HTTPStatus]:
+    _jwt_user_id, role = get_jwt_data()
+
+    admin_service.clear_slow_queries(role)
+
+    return jsonify({}), HTTPStatus.NO_CONTENT
+
+
+@admin_blueprint.route("/database", methods=["GET"])
+@jwt_required()
+def get_database_diagnostics() -> tuple[Response, HTTPStatus]:
+    _jwt_user_id, role = get_jwt_data()
+
+    diagnostics: DatabaseDiagnosticsReadDTO = admin_service.get_database_diagnostics(role)
+
+    return create_json_response(diagnostics), HTTPStatus.OK
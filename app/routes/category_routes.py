@@ -7,7 +7,8 @@ from flask_jwt_extended import jwt_required
 from ..dtos import CategoryReadDTO, CategoryCreateDTO, CategoryUpdateDTO
 from ..services import category_service
 from ..services.auth_service import get_jwt_data
-from ..utils import get_payload
+from ..utils import get_payload, get_stream_mimetype, create_stream_response, create_json_response, \
+    str_to_bool_or_none
 
 category_blueprint = Blueprint("categories", __name__)
 
@@ -20,10 +21,15 @@ def get_categories() -> tuple[Response, HTTPStatus]:
 
     jwt_user_id, role = get_jwt_data()
 
+    stream_mimetype: Optional[str] = get_stream_mimetype()
+
+    if stream_mimetype is not None:
+        return create_stream_response(category_service.stream_categories(jwt_user_id, role, user_id, name),
+                                      stream_mimetype), HTTPStatus.OK
+
     categories: list[CategoryReadDTO] = category_service.get_categories(jwt_user_id, role, user_id, name)
-    categories_dicts: list[dict] = [category.model_dump() for category in categories]
 
-    return jsonify(categories_dicts), HTTPStatus.OK
+    return create_json_response(categories), HTTPStatus.OK
 
 
 @category_blueprint.route("/<int:category_id>", methods=["GET"])
@@ -33,7 +39,7 @@ def get_category_by_id(category_id: int) -> tuple[Response, HTTPStatus]:
 
     category: CategoryReadDTO = category_service.get_category_by_id(jwt_user_id, role, category_id)
 
-    return jsonify(category.model_dump()), HTTPStatus.OK
+    return create_json_response(category), HTTPStatus.OK
 
 
 @category_blueprint.route("/", methods=["POST"])
@@ -46,7 +52,7 @@ def create_category() -> tuple[Response, HTTPStatus]:
     category_create_dto: CategoryCreateDTO = CategoryCreateDTO(**payload)
     category_read_dto: CategoryReadDTO = category_service.create_category(jwt_user_id, role, category_create_dto)
 
-    return jsonify(category_read_dto.model_dump()), HTTPStatus.CREATED
+    return create_json_response(category_read_dto), HTTPStatus.CREATED
 
 
 @category_blueprint.route("/<int:category_id>", methods=["PUT"])
@@ -60,14 +66,18 @@ def update_category(category_id: int) -> tuple[Response, HTTPStatus]:
     category_read_dto: CategoryReadDTO = category_service.update_category(jwt_user_id, role, category_id,
                                                                           category_update_dto)
 
-    return jsonify(category_read_dto.model_dump()), HTTPStatus.OK
+    return create_json_response(category_read_dto), HTTPStatus.OK
 
 
 @category_blueprint.route("/<int:category_id>", methods=["DELETE"])
 @jwt_required()
 def delete_category(category_id: int) -> tuple[Response, HTTPStatus]:
+    asynchronous: Optional[str] = request.args.get("async")
     jwt_user_id, role = get_jwt_data()
 
-    category: CategoryReadDTO = category_service.delete_category(jwt_user_id, role, category_id)
+    category: CategoryReadDTO = category_service.delete_category(jwt_user_id, role, category_id, asynchronous)
+
+    if str_to_bool_or_none(asynchronous):
+        return jsonify({}), HTTPStatus.ACCEPTED
 
     return jsonify({}), HTTPStatus.NO_CONTENT
@@ -1,13 +1,14 @@
 from http import HTTPStatus
-from typing import Optional
+from typing import Iterator, Optional
 
 from flask import Blueprint, jsonify, request, Response
 from flask_jwt_extended import jwt_required
 
-from ..dtos import ExecutionHistoryReadDTO, ExecutionHistoryCreateDTO
-from ..services import execution_history_service
+from ..dtos import ExecutionHistoryReadDTO, ExecutionHistoryCreateDTO, ExecutionHistoryBulkResultDTO, \
+    DailyExecutionCountReadDTO, ExecutionHeatmapReadDTO, ExecutionHistoryPageReadDTO
+from ..services import execution_history_service, daily_execution_count_service
 from ..services.auth_service import get_jwt_data
-from ..utils import get_payload
+from ..utils import get_payload, get_stream_mimetype, create_stream_response, create_json_response
 
 execution_history_blueprint = Blueprint("execution_histories", __name__)
 
@@ -22,6 +23,25 @@ def get_execution_histories() -> tuple[Response, HTTPStatus]:
     habit_task_id: Optional[str] = request.args.get("habit_task_id")
     start_datetime: Optional[str] = request.args.get("start_datetime")
     end_datetime: Optional[str] = request.args.get("end_datetime")
+    cursor: Optional[str] = request.args.get("cursor")
+    limit: Optional[str] = request.args.get("limit")
+
+    # Keyset pagination is opt-in so that existing clients keep receiving a plain list
+    if cursor is not None or limit is not None:
+        page, next_cursor = execution_history_service.get_execution_histories_page(jwt_user_id, role, user_id,
+                                                                                   category_id, habit_task_id,
+                                                                                   start_datetime, end_datetime,
+                                                                                   cursor, limit)
+
+        return create_json_response(ExecutionHistoryPageReadDTO(items=page, next_cursor=next_cursor)), HTTPStatus.OK
+
+    stream_mimetype: Optional[str] = get_stream_mimetype()
+
+    if stream_mimetype is not None:
+        history_stream: Iterator[ExecutionHistoryReadDTO] = execution_history_service.stream_execution_histories(
+            jwt_user_id, role, user_id, category_id, habit_task_id, start_datetime, end_datetime)
+
+        return create_stream_response(history_stream, stream_mimetype), HTTPStatus.OK
 
     execution_histories: list[ExecutionHistoryReadDTO] = execution_history_service.get_execution_histories(jwt_user_id,
                                                                                                            role,
@@ -30,10 +50,40 @@ def get_execution_histories() -> tuple[Response, HTTPStatus]:
                                                                                                            habit_task_id,
                                                                                                            start_datetime,
                                                                                                            end_datetime)
-    execution_histories_dicts: list[dict] = [execution_history.model_dump() for execution_history in
-                                             execution_histories]
 
-    return jsonify(execution_histories_dicts), HTTPStatus.OK
+    return create_json_response(execution_histories), HTTPStatus.OK
+
+
+@execution_history_blueprint.route("/daily", methods=["GET"])
+@jwt_required()
+def get_daily_execution_counts() -> tuple[Response, HTTPStatus]:
+    jwt_user_id, role = get_jwt_data()
+
+    user_id: Optional[str] = request.args.get("user_id")
+    category_id: Optional[str] = request.args.get("category_id")
+    habit_task_id: Optional[str] = request.args.get("habit_task_id")
+    start_date: Optional[str] = request.args.get("start_date")
+    end_date: Optional[str] = request.args.get("end_date")
+
+    daily_execution_counts: list[DailyExecutionCountReadDTO] = daily_execution_count_service.get_daily_execution_counts(
+        jwt_user_id, role, user_id, category_id, habit_task_id, start_date, end_date)
+
+    return create_json_response(daily_execution_counts), HTTPStatus.OK
+
+
+@execution_history_blueprint.route("/heatmap", methods=["GET"])
+@jwt_required()
+def get_execution_heatmap() -> tuple[Response, HTTPStatus]:
+    jwt_user_id, role = get_jwt_data()
+
+    user_id: Optional[str] = request.args.get("user_id")
+    category_id: Optional[str] = request.args.get("category_id")
+    year: Optional[str] = request.args.get("year")
+
+    heatmap: ExecutionHeatmapReadDTO = daily_execution_count_service.get_execution_heatmap(jwt_user_id, role, user_id,
+                                                                                           category_id, year)
+
+    return create_json_response(heatmap), HTTPStatus.OK
 
 
 @execution_history_blueprint.route("/<int:execution_history_id>", methods=["GET"])
@@ -45,7 +95,7 @@ def get_execution_history_by_id(execution_history_id: int) -> tuple[Response, HT
                                                                                                        role,
                                                                                                        execution_history_id)
 
-    return jsonify(execution_history.model_dump()), HTTPStatus.OK
+    return create_json_response(execution_history), HTTPStatus.OK
 
 
 @execution_history_blueprint.route("/", methods=["POST"])
@@ -59,7 +109,30 @@ def create_execution_history() -> tuple[Response, HTTPStatus]:
     execution_history_read_dto: ExecutionHistoryReadDTO = execution_history_service.create_execution_history(
         jwt_user_id, role, execution_history_dto)
 
-    return jsonify(execution_history_read_dto.model_dump()), HTTPStatus.CREATED
+    return create_json_response(execution_history_read_dto), HTTPStatus.CREATED
+
+
+@execution_history_blueprint.route("/bulk", methods=["POST"])
+@jwt_required()
+def create_execution_histories() -> tuple[Response, HTTPStatus]:
+    jwt_user_id, role = get_jwt_data()
+
+    payload: dict = get_payload()
+
+    # Any JSON value is a payload, a top-level array has no execution_histories key to read
+    if not isinstance(payload, dict):
+        raise ValueError("payload must be an object")
+
+    execution_histories: list = payload.get("execution_histories")
+
+    if not isinstance(execution_histories, list):
+        raise ValueError("execution_histories must be a list")
+
+    result: ExecutionHistoryBulkResultDTO = execution_history_service.create_execution_histories(jwt_user_id, role,
+                                                                                                 execution_histories)
+    status: HTTPStatus = HTTPStatus.CREATED if not result.errors else HTTPStatus.MULTI_STATUS
+
+    return create_json_response(result), status
 
 
 @execution_history_blueprint.route("/<int:execution_history_id>", methods=["DELETE"])
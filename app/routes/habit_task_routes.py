@@ -4,10 +4,11 @@ from typing import Optional
 from flask import Blueprint, jsonify, request, Response
 from flask_jwt_extended import jwt_required
 
-from ..dtos import HabitTaskReadDTO, HabitTaskCreateDTO, HabitTaskUpdateDTO
-from ..services import habit_task_service
+from ..dtos import HabitTaskReadDTO, HabitTaskCreateDTO, HabitTaskUpdateDTO, HabitTaskStreakReadDTO, \
+    HabitTaskStatisticsReadDTO
+from ..services import habit_task_service, habit_task_streak_service, habit_task_statistics_service
 from ..services.auth_service import get_jwt_data
-from ..utils import get_payload
+from ..utils import get_payload, get_stream_mimetype, create_stream_response, create_json_response
 
 habit_task_blueprint = Blueprint("habit_tasks", __name__)
 
@@ -21,11 +22,16 @@ def get_habit_tasks() -> tuple[Response, HTTPStatus]:
     category_id: Optional[str] = request.args.get("category_id")
     name: Optional[str] = request.args.get("name")
 
+    stream_mimetype: Optional[str] = get_stream_mimetype()
+
+    if stream_mimetype is not None:
+        return create_stream_response(habit_task_service.stream_habit_tasks(jwt_user_id, role, user_id, category_id,
+                                                                            name), stream_mimetype), HTTPStatus.OK
+
     habit_tasks: list[HabitTaskReadDTO] = habit_task_service.get_habit_tasks(jwt_user_id, role, user_id, category_id,
                                                                              name)
-    habit_tasks_dicts: list[dict] = [habit_task.model_dump() for habit_task in habit_tasks]
 
-    return jsonify(habit_tasks_dicts), HTTPStatus.OK
+    return create_json_response(habit_tasks), HTTPStatus.OK
 
 
 @habit_task_blueprint.route("/<int:habit_task_id>", methods=["GET"])
@@ -35,7 +41,32 @@ def get_habit_task_by_id(habit_task_id: int) -> tuple[Response, HTTPStatus]:
 
     habit_task: HabitTaskReadDTO = habit_task_service.get_habit_task_by_id(jwt_user_id, role, habit_task_id)
 
-    return jsonify(habit_task.model_dump()), HTTPStatus.OK
+    return create_json_response(habit_task), HTTPStatus.OK
+
+
+@habit_task_blueprint.route("/<int:habit_task_id>/streak", methods=["GET"])
+@jwt_required()
+def get_habit_task_streak(habit_task_id: int) -> tuple[Response, HTTPStatus]:
+    jwt_user_id, role = get_jwt_data()
+
+    streak: HabitTaskStreakReadDTO = habit_task_streak_service.get_habit_task_streak(jwt_user_id, role,
+                                                                                     habit_task_id)
+
+    return create_json_response(streak), HTTPStatus.OK
+
+
+@habit_task_blueprint.route("/<int:habit_task_id>/statistics", methods=["GET"])
+@jwt_required()
+def get_habit_task_statistics(habit_task_id: int) -> tuple[Response, HTTPStatus]:
+    jwt_user_id, role = get_jwt_data()
+
+    start_date: Optional[str] = request.args.get("start_date")
+    end_date: Optional[str] = request.args.get("end_date")
+
+    statistics: HabitTaskStatisticsReadDTO = habit_task_statistics_service.get_habit_task_statistics(
+        jwt_user_id, role, habit_task_id, start_date, end_date)
+
+    return create_json_response(statistics), HTTPStatus.OK
 
 
 @habit_task_blueprint.route("/", methods=["POST"])
@@ -49,7 +80,7 @@ def create_habit_task() -> tuple[Response, HTTPStatus]:
     habit_task_read_dto: HabitTaskReadDTO = habit_task_service.create_habit_task(jwt_user_id, role,
                                                                                  habit_task_create_dto)
 
-    return jsonify(habit_task_read_dto.model_dump()), HTTPStatus.CREATED
+    return create_json_response(habit_task_read_dto), HTTPStatus.CREATED
 
 
 @habit_task_blueprint.route("/<int:habit_task_id>", methods=["PUT"])
@@ -63,7 +94,7 @@ def update_habit_task(habit_task_id: int) -> tuple[Response, HTTPStatus]:
     habit_task_read_dto: HabitTaskReadDTO = habit_task_service.update_habit_task(jwt_user_id, role, habit_task_id,
                                                                                  habit_task_update_dto)
 
-    return jsonify(habit_task_read_dto.model_dump()), HTTPStatus.CREATED
+    return create_json_response(habit_task_read_dto), HTTPStatus.CREATED
 
 
 @habit_task_blueprint.route("/<int:habit_task_id>", methods=["DELETE"])
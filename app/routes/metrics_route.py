@@ -0,0 +1,12 @@
+from flask import Blueprint, Response
+
+from .. import database
+from ..metrics import EXPOSITION_MIMETYPE, render_metrics
+
+metrics_blueprint = Blueprint("metrics", __name__)
+
+
+# Prometheus text exposition format, scraped by the monitoring of the load balancer pool
+@metrics_blueprint.route("/metrics", methods=["GET"])
+def get_metrics() -> Response:
+    return Response(render_metrics(database.engine), content_type=EXPOSITION_MIMETYPE)
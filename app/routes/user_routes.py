@@ -7,7 +7,8 @@ from flask_jwt_extended import jwt_required
 from ..dtos import UserCreateDTO, UserUpdateDTO, UserReadDTO
 from ..services import user_service
 from ..services.auth_service import get_jwt_data
-from ..utils import get_payload
+from ..utils import get_payload, get_stream_mimetype, create_stream_response, create_json_response, \
+    str_to_bool_or_none
 
 user_blueprint = Blueprint("users", __name__)
 
@@ -21,9 +22,14 @@ def get_users() -> tuple[Response, HTTPStatus]:
     last_name: Optional[str] = request.args.get("last_name")
     is_active: Optional[str] = request.args.get("is_active")
 
+    stream_mimetype: Optional[str] = get_stream_mimetype()
+
+    if stream_mimetype is not None:
+        return create_stream_response(user_service.stream_users(jwt_user_id, role, first_name, last_name, is_active),
+                                      stream_mimetype), HTTPStatus.OK
+
     users: list[UserReadDTO] = user_service.get_users(jwt_user_id, role, first_name, last_name, is_active)
-    users_dicts: list[dict] = [user.model_dump() for user in users]
-    return jsonify(users_dicts), HTTPStatus.OK
+    return create_json_response(users), HTTPStatus.OK
 
 
 @user_blueprint.route("/id/<int:user_id>", methods=["GET"])
@@ -33,7 +39,7 @@ def get_user_by_id(user_id: int) -> tuple[Response, HTTPStatus]:
 
     user: UserReadDTO = user_service.get_user_by_id(jwt_user_id, role, user_id)
 
-    return jsonify(user.model_dump()), HTTPStatus.OK
+    return create_json_response(user), HTTPStatus.OK
 
 
 @user_blueprint.route("/email/<email>", methods=["GET"])
@@ -42,7 +48,7 @@ def get_user_by_email(email: str) -> tuple[Response, HTTPStatus]:
     jwt_user_id, role = get_jwt_data()
     user: UserReadDTO = user_service.get_user_by_email(jwt_user_id, role, email)
 
-    return jsonify(user.model_dump()), HTTPStatus.OK
+    return create_json_response(user), HTTPStatus.OK
 
 
 @user_blueprint.route("/", methods=["POST"])
@@ -52,7 +58,7 @@ def create_user() -> tuple[Response, HTTPStatus]:
     user_create_dto: UserCreateDTO = UserCreateDTO(**payload)
     user_read_dto: UserReadDTO = user_service.create_user(user_create_dto)
 
-    return jsonify(user_read_dto.model_dump()), HTTPStatus.CREATED
+    return create_json_response(user_read_dto), HTTPStatus.CREATED
 
 
 @user_blueprint.route("/<int:user_id>", methods=["PUT"])
@@ -65,14 +71,19 @@ def update_user(user_id: int) -> tuple[Response, HTTPStatus]:
     user_update_dto: UserUpdateDTO = UserUpdateDTO(**payload)
     user_read_dto: UserReadDTO = user_service.update_user(jwt_user_id, role, user_id, user_update_dto)
 
-    return jsonify(user_read_dto.model_dump()), HTTPStatus.OK
+    return create_json_response(user_read_dto), HTTPStatus.OK
 
 
 @user_blueprint.route("/<int:user_id>", methods=["DELETE"])
 @jwt_required()
 def delete_user(user_id: int) -> tuple[Response, HTTPStatus]:
+    # ?async=true answers right away and purges the user's data in the background
+    asynchronous: Optional[str] = request.args.get("async")
     jwt_user_id, role = get_jwt_data()
 
-    user: UserReadDTO = user_service.delete_user(jwt_user_id, role, user_id)
+    user: UserReadDTO = user_service.delete_user(jwt_user_id, role, user_id, asynchronous)
+
+    if str_to_bool_or_none(asynchronous):
+        return jsonify({}), HTTPStatus.ACCEPTED
 
     return jsonify({}), HTTPStatus.NO_CONTENT
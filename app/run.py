@@ -1,6 +1,6 @@
 from app import create_app
 
-app = create_app()
-
+# Password hashing workers are spawned, and spawn imports the main module again as __mp_main__ in every worker.
+# Building the app only under the guard keeps them from running create_app, flask --app still finds the factory.
 if __name__ == "__main__":
-    app.run(debug=True)
\ No newline at end of file
+    create_app().run(debug=True)
@@ -0,0 +1,134 @@
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Iterator, Optional
+
+from sqlalchemy import DDL, Connection, Table, event, inspect, literal_column, text
+from sqlalchemy.sql.expression import ColumnElement, TableClause, column, table
+
+# The trigram tokenizer matches any substring of at least three characters, shorter terms cannot use the index
+MIN_TERM_LENGTH: int = 3
+
+
+@dataclass(frozen=True)
+class SearchIndex:
+    name: str
+    content_table: str
+    columns: tuple[str, ...]
+    # bm25 weight per column, in the order of columns
+    weights: tuple[float, ...]
+
+    # Cached so every statement refers to the same FROM object
+    @cached_property
+    def table(self) -> TableClause:
+        return table(self.name, column("rowid"), *(column(name) for name in self.columns))
+
+    def match(self, column_name: Optional[str], match_expression: ColumnElement) -> ColumnElement:
+        # The table name as left operand searches all columns, a column name restricts the search to it
+        target: ColumnElement = literal_column(self.name) if column_name is None else self.table.c[column_name]
+
+        return target.op("MATCH")(match_expression)
+
+    def rank(self) -> ColumnElement:
+        # bm25 is lower for better matches
+        return literal_column(f"bm25({self.name}, {', '.join(str(weight) for weight in self.weights)})")
+
+    def get_create_statements(self) -> list[str]:
+        columns: str = ", ".join(self.columns)
+        new_values: str = ", ".join(f"new.{name}" for name in self.columns)
+        old_values: str = ", ".join(f"old.{name}" for name in self.columns)
+        delete: str = (f"INSERT INTO {self.name}({self.name}, rowid, {columns}) "
+                       f"VALUES ('delete', old.id, {old_values});")
+        insert: str = f"INSERT INTO {self.name}(rowid, {columns}) VALUES (new.id, {new_values});"
+
+        # External content table: the index only stores trigrams, the triggers keep it in sync with the rows
+        return [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.name} USING fts5({columns}, content='{self.content_table}', "
+            f"content_rowid='id', tokenize='trigram')",
+            f"CREATE TRIGGER IF NOT EXISTS {self.name}_insert AFTER INSERT ON {self.content_table} "
+            f"BEGIN {insert} END",
+            f"CREATE TRIGGER IF NOT EXISTS {self.name}_delete AFTER DELETE ON {self.content_table} "
+            f"BEGIN {delete} END",
+            f"CREATE TRIGGER IF NOT EXISTS {self.name}_update AFTER UPDATE OF {columns} ON {self.content_table} "
+            f"BEGIN {delete} {insert} END",
+        ]
+
+    def get_drop_trigger_statements(self) -> list[str]:
+        return [f"DROP TRIGGER IF EXISTS {self.name}_{action}" for action in ("insert", "delete", "update")]
+
+    def get_rebuild_statement(self) -> str:
+        return f"INSERT INTO {self.name}({self.name}) VALUES ('rebuild')"
+
+
+SEARCH_INDEXES: list[SearchIndex] = []
+
+
+def register_search_index(content_table: Table, columns: dict[str, float]) -> SearchIndex:
+    search_index: SearchIndex = SearchIndex(f"{content_table.name}_search", content_table.name,
+                                            tuple(columns), tuple(columns.values()))
+
+    for statement in search_index.get_create_statements():
+        event.listen(content_table, "after_create", DDL(statement))
+
+    event.listen(content_table, "after_drop", DDL(f"DROP TABLE IF EXISTS {search_index.name}"))
+
+    SEARCH_INDEXES.append(search_index)
+
+    return search_index
+
+
+# FTS5 query for a literal substring, double quotes inside the term are escaped by doubling them
+def get_match_expression(term: Optional[str]) -> Optional[str]:
+    if term is None or len(term) < MIN_TERM_LENGTH:
+        return None
+
+    return '"' + term.replace('"', '""') + '"'
+
+
+def get_short_term(term: Optional[str]) -> Optional[str]:
+    if term is None or len(term) >= MIN_TERM_LENGTH:
+        return None
+
+    return term
+
+
+def create_missing_search_indexes(connection: Connection) -> list[str]:
+    existing_tables: set[str] = set(inspect(connection).get_table_names())
+    created: list[str] = []
+
+    for search_index in SEARCH_INDEXES:
+        if search_index.name in existing_tables or search_index.content_table not in existing_tables:
+            continue
+
+        for statement in search_index.get_create_statements():
+            connection.execute(text(statement))
+
+        # Rows written before the triggers existed
+        connection.execute(text(search_index.get_rebuild_statement()))
+        created.append(search_index.name)
+
+    return created
+
+
+def rebuild_search_indexes(connection: Connection) -> list[str]:
+    for search_index in SEARCH_INDEXES:
+        connection.execute(text(search_index.get_rebuild_statement()))
+
+    return [search_index.name for search_index in SEARCH_INDEXES]
+
+
+# For bulk loads: rebuilding an index once is much faster than syncing it row by row through the triggers.
+# On an error the triggers come back with the rollback of the transaction.
+@contextmanager
+def deferred_search_index_sync(connection: Connection) -> Iterator[None]:
+    for search_index in SEARCH_INDEXES:
+        for statement in search_index.get_drop_trigger_statements():
+            connection.execute(text(statement))
+
+    yield
+
+    for search_index in SEARCH_INDEXES:
+        for statement in search_index.get_create_statements():
+            connection.execute(text(statement))
+
+        connection.execute(text(search_index.get_rebuild_statement()))
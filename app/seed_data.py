@@ -1,101 +1,267 @@
-import random
-from datetime import datetime, timezone, timedelta
+import argparse
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Iterator, Optional
 
+import numpy as np
 from faker import Faker
+from sqlalchemy import Connection, Table, func, insert, select
 
-from app import create_app, database
-from app.models import User, Category, HabitTask, ExecutionHistory
+from app.models import Category, ExecutionHistory, HabitTask, User
 from app.models.User import UserRole
+from app.password_hashing import hash_password
+from app.search_index import deferred_search_index_sync
 
-app = create_app()
-fake = Faker()
+# Distinct values drawn from Faker once, rows pick from them by index
+VOCABULARY_SIZE: int = 2000
+SEED_PASSWORD: str = "password123"
 
+# Spread of the lognormal activity weights. With 1.5 roughly a fifth of the users produce three quarters of the
+# executions, and within one user a few habit tasks are done daily while most are done now and then.
+USER_ACTIVITY_SIGMA: float = 1.5
+HABIT_TASK_ACTIVITY_SIGMA: float = 1.0
 
-def seed_users(n: int = 10) -> list[User]:
-    users: list[User] = []
 
-    for _ in range(n):
-        user = User(
-            first_name=fake.first_name(),
-            last_name=fake.last_name(),
-            email=fake.email(),
-            role=UserRole.USER,
-            is_active=True
+@dataclass(frozen=True)
+class SeedOptions:
+    users: int = 10
+    # Means, the actual numbers per user and category are Poisson distributed (at least one)
+    categories_per_user: float = 3.0
+    habit_tasks_per_category: float = 5.0
+    execution_histories: int = 2250
+    days: int = 30
+    end_date: date = field(default_factory=date.today)
+    seed: int = 0
+    chunk_size: int = 50_000
+
+
+@dataclass
+class SeedCounts:
+    users: int = 0
+    categories: int = 0
+    habit_tasks: int = 0
+    execution_histories: int = 0
+
+
+@dataclass(frozen=True)
+class Vocabulary:
+    first_names: list[str]
+    last_names: list[str]
+    words: list[str]
+    sentences: list[str]
+
+    @staticmethod
+    def build(seed: int, size: int = VOCABULARY_SIZE) -> "Vocabulary":
+        fake: Faker = Faker()
+        fake.seed_instance(seed)
+
+        return Vocabulary(
+            first_names=[fake.first_name() for _ in range(size)],
+            last_names=[fake.last_name() for _ in range(size)],
+            words=[fake.word().capitalize() for _ in range(size)],
+            sentences=[fake.sentence() for _ in range(size)]
         )
 
-        user.set_password("password123")
-        users.append(user)
 
-    database.session.add_all(users)
-    database.session.flush()
+# Inserts through Core executemany with explicit ids, so no ORM objects are built and no ids have to be read
+# back. The database may already contain rows, new ids continue after the highest existing one.
+def seed(connection: Connection, options: SeedOptions) -> SeedCounts:
+    with deferred_search_index_sync(connection):
+        return _seed(connection, options)
 
-    return users
 
+def _seed(connection: Connection, options: SeedOptions) -> SeedCounts:
+    rng: np.random.Generator = np.random.default_rng(options.seed)
+    vocabulary: Vocabulary = Vocabulary.build(options.seed)
+    created_at: datetime = datetime.combine(options.end_date, datetime.min.time()) - timedelta(days=options.days)
+    counts: SeedCounts = SeedCounts()
 
-def seed_categories(users: list[User], categories_per_user: int = 3) -> list[Category]:
-    categories: list[Category] = []
+    user_ids: np.ndarray = _next_ids(connection, User.__table__, options.users)
+    hashed_password: str = hash_password(SEED_PASSWORD)
+    first_names: np.ndarray = rng.integers(0, len(vocabulary.first_names), options.users)
+    last_names: np.ndarray = rng.integers(0, len(vocabulary.last_names), options.users)
 
-    for user in users:
-        for _ in range(categories_per_user):
-            category = Category(
-                user_id=user.id,
-                name=fake.word(),
-                description=fake.sentence()
-            )
+    counts.users = _insert_chunks(connection, User.__table__, ({
+        "id": int(user_id),
+        "first_name": vocabulary.first_names[first_name],
+        "last_name": vocabulary.last_names[last_name],
+        # The id keeps generated emails unique
+        "email": f"{vocabulary.first_names[first_name]}.{vocabulary.last_names[last_name]}.{user_id}@example.com"
+        .lower(),
+        "hashed_password": hashed_password,
+        "is_active": True,
+        "role": UserRole.USER,
+        "created_at": created_at,
+        "updated_at": created_at
+    } for user_id, first_name, last_name in zip(user_ids, first_names, last_names)), options.chunk_size)
 
-            categories.append(category)
+    category_user_ids: np.ndarray = np.repeat(user_ids, _children_per_parent(rng, options.users,
+                                                                             options.categories_per_user))
+    category_ids: np.ndarray = _next_ids(connection, Category.__table__, len(category_user_ids))
+    counts.categories = _insert_chunks(connection, Category.__table__, (
+        {"id": int(category_id), "user_id": int(user_id), "created_at": created_at, "updated_at": created_at,
+         **_name_and_description(vocabulary, rng)}
+        for category_id, user_id in zip(category_ids, category_user_ids)
+    ), options.chunk_size)
 
-    database.session.add_all(categories)
-    database.session.flush()
+    habit_tasks_per_category: np.ndarray = _children_per_parent(rng, len(category_ids),
+                                                                options.habit_tasks_per_category)
+    habit_task_category_ids: np.ndarray = np.repeat(category_ids, habit_tasks_per_category)
+    habit_task_user_ids: np.ndarray = np.repeat(category_user_ids, habit_tasks_per_category)
+    habit_task_ids: np.ndarray = _next_ids(connection, HabitTask.__table__, len(habit_task_category_ids))
+    counts.habit_tasks = _insert_chunks(connection, HabitTask.__table__, (
+        {"id": int(habit_task_id), "category_id": int(category_id), "created_at": created_at,
+         "updated_at": created_at, **_name_and_description(vocabulary, rng)}
+        for habit_task_id, category_id in zip(habit_task_ids, habit_task_category_ids)
+    ), options.chunk_size)
 
-    return categories
+    executions_per_habit_task: np.ndarray = _executions_per_habit_task(
+        rng, user_ids, habit_task_user_ids, options.execution_histories
+    )
+    execution_history_ids: np.ndarray = _next_ids(connection, ExecutionHistory.__table__,
+                                                  options.execution_histories)
+    counts.execution_histories = _insert_chunks(connection, ExecutionHistory.__table__, _execution_history_rows(
+        rng, execution_history_ids, habit_task_ids, habit_task_user_ids, executions_per_habit_task, created_at,
+        options
+    ), options.chunk_size)
 
+    return counts
 
-def seed_habit_tasks(categories: list[Category], habit_tasks_per_category: int = 5) -> list[HabitTask]:
-    habit_tasks: list[HabitTask] = []
 
-    for category in categories:
-        for _ in range(habit_tasks_per_category):
-            task = HabitTask(
-                category_id=category.id,
-                name=fake.word(),
-                description=fake.sentence()
-            )
+def _next_ids(connection: Connection, table: Table, count: int) -> np.ndarray:
+    first_id: int = connection.scalar(select(func.coalesce(func.max(table.c.id), 0))) + 1
 
-            habit_tasks.append(task)
+    return np.arange(first_id, first_id + count, dtype=np.int64)
 
-    database.session.add_all(habit_tasks)
-    database.session.flush()
 
-    return habit_tasks
+def _children_per_parent(rng: np.random.Generator, parents: int, mean: float) -> np.ndarray:
+    return np.maximum(rng.poisson(mean, parents), 1)
 
 
-def seed_execution_histories(habit_tasks: list[HabitTask], execution_histories_per_habit_task: int = 15) -> list[
-    ExecutionHistory]:
-    execution_histories: list[ExecutionHistory] = []
+def _name_and_description(vocabulary: Vocabulary, rng: np.random.Generator) -> dict[str, str]:
+    return {
+        "name": vocabulary.words[rng.integers(len(vocabulary.words))],
+        "description": vocabulary.sentences[rng.integers(len(vocabulary.sentences))]
+    }
 
-    for habit_task in habit_tasks:
-        for _ in range(execution_histories_per_habit_task):
-            exec_time = datetime.now(timezone.utc) - timedelta(days=random.randint(0, 30))
 
-            history = ExecutionHistory(
-                habit_task_id=habit_task.id,
-                executed_at=exec_time
-            )
+# Lognormal weights per user, split between the habit tasks of the user by weights of their own
+def _executions_per_habit_task(rng: np.random.Generator,
+                               user_ids: np.ndarray,
+                               habit_task_user_ids: np.ndarray,
+                               total: int) -> np.ndarray:
+    if len(habit_task_user_ids) == 0:
+        return np.zeros(0, dtype=np.int64)
 
-            execution_histories.append(history)
+    user_weights: np.ndarray = rng.lognormal(0.0, USER_ACTIVITY_SIGMA, len(user_ids))
+    habit_task_weights: np.ndarray = rng.lognormal(0.0, HABIT_TASK_ACTIVITY_SIGMA, len(habit_task_user_ids))
+    # Ids are consecutive, so the position of a user in user_ids is its id minus the first id
+    weights: np.ndarray = user_weights[habit_task_user_ids - user_ids[0]] * habit_task_weights
 
-    database.session.add_all(execution_histories)
+    return rng.multinomial(total, weights / weights.sum())
 
-    return execution_histories
 
+def _execution_history_rows(rng: np.random.Generator,
+                            ids: np.ndarray,
+                            habit_task_ids: np.ndarray,
+                            habit_task_user_ids: np.ndarray,
+                            executions_per_habit_task: np.ndarray,
+                            start: datetime,
+                            options: SeedOptions) -> Iterator[dict]:
+    span_seconds: int = options.days * 24 * 60 * 60
+    # Upper bounds of the habit task ranges of each chunk, the arrays of one chunk are built at once
+    boundaries: np.ndarray = np.cumsum(executions_per_habit_task)
+    first_task: int = 0
+
+    while first_task < len(habit_task_ids):
+        offset: int = int(boundaries[first_task - 1]) if first_task else 0
+        last_task: int = max(int(np.searchsorted(boundaries, offset + options.chunk_size, side="right")),
+                             first_task + 1)
+        counts: np.ndarray = executions_per_habit_task[first_task:last_task]
+
+        task_ids: np.ndarray = np.repeat(habit_task_ids[first_task:last_task], counts)
+        user_ids: np.ndarray = np.repeat(habit_task_user_ids[first_task:last_task], counts)
+        seconds: np.ndarray = rng.integers(0, span_seconds, len(task_ids))
+        # Chronological per habit task, like rows inserted over time
+        order: np.ndarray = np.lexsort((seconds, task_ids))
+
+        for index, row_id in enumerate(ids[offset:offset + len(task_ids)]):
+            position: int = order[index]
+
+            yield {
+                "id": int(row_id),
+                "habit_task_id": int(task_ids[position]),
+                "user_id": int(user_ids[position]),
+                "executed_at": start + timedelta(seconds=int(seconds[position]))
+            }
+
+        first_task = last_task
+
+
+def _insert_chunks(connection: Connection, table: Table, rows: Iterator[dict], chunk_size: int) -> int:
+    inserted: int = 0
+    chunk: list[dict] = []
+
+    for row in rows:
+        chunk.append(row)
+
+        if len(chunk) == chunk_size:
+            connection.execute(insert(table), chunk)
+            inserted += len(chunk)
+            chunk = []
+
+    if chunk:
+        connection.execute(insert(table), chunk)
+        inserted += len(chunk)
+
+    return inserted
+
+
+def parse_options(argv: Optional[list[str]] = None) -> SeedOptions:
+    defaults: SeedOptions = SeedOptions()
+    parser = argparse.ArgumentParser(description="Fill the database with generated users, categories, habit tasks "
+                                                 "and execution histories.")
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--categories-per-user", type=float, default=defaults.categories_per_user)
+    parser.add_argument("--habit-tasks-per-category", type=float, default=defaults.habit_tasks_per_category)
+    parser.add_argument("--execution-histories", type=int, default=defaults.execution_histories)
+    parser.add_argument("--days", type=int, default=defaults.days,
+                        help="Execution histories are spread over this many days before the end date.")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=defaults.end_date,
+                        help="Last day of generated data, fix it for reproducible data (default: today).")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--chunk-size", type=int, default=defaults.chunk_size,
+                        help="Rows per executemany.")
+
+    arguments = parser.parse_args(argv)
+
+    return SeedOptions(**{name.replace("-", "_"): value for name, value in vars(arguments).items()})
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    from app import create_app, database
+    from app.services import daily_execution_count_service, habit_task_streak_service
+
+    options: SeedOptions = parse_options(argv)
+    app = create_app()
 
-if __name__ == "__main__":
     with app.app_context():
-        with database.session.begin():
-            users: list[User] = seed_users()
-            categories: list[Category] = seed_categories(users)
-            habit_tasks: list[HabitTask] = seed_habit_tasks(categories)
-            execution_histories: list[ExecutionHistory] = seed_execution_histories(habit_tasks)
+        started_at: float = time.perf_counter()
+
+        with database.engine.begin() as connection:
+            counts: SeedCounts = seed(connection, options)
+
+        print(f"Seeded {counts.users} users, {counts.categories} categories, {counts.habit_tasks} habit tasks and "
+              f"{counts.execution_histories} execution histories in {time.perf_counter() - started_at:.1f}s")
+
+        # The rollups are maintained by the services, rows inserted here bypass them
+        started_at = time.perf_counter()
+        daily_execution_count_service.rebuild_daily_execution_counts()
+        habit_task_streak_service.rebuild_streaks()
 
-            print("Seeding finished")
+        print(f"Rebuilt daily execution counts and streaks in {time.perf_counter() - started_at:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
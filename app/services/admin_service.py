@@ -0,0 +1,41 @@
+import sqlite3
+
+from flask import current_app
+from sqlalchemy import Connection
+
+from app import database, slow_queries
+from app.dtos import DatabaseDiagnosticsReadDTO, SlowQueryReadDTO
+from app.models.User import UserRole
+from app.sqlite_pragmas import PragmaReport, get_pragma_report, read_pragmas
+
+
+def get_slow_queries(requester_role: UserRole) -> list[SlowQueryReadDTO]:
+    if requester_role != UserRole.ADMIN:
+        raise PermissionError("Forbidden")
+
+    return [SlowQueryReadDTO.model_validate(slow_query) for slow_query in slow_queries.get_slow_queries()]
+
+
+def clear_slow_queries(requester_role: UserRole) -> None:
+    if requester_role != UserRole.ADMIN:
+        raise PermissionError("Forbidden")
+
+    slow_queries.clear_slow_queries()
+
+
+def get_database_diagnostics(requester_role: UserRole) -> DatabaseDiagnosticsReadDTO:
+    if requester_role != UserRole.ADMIN:
+        raise PermissionError("Forbidden")
+
+    configured_pragmas: dict = current_app.config["SQLITE_PRAGMAS"]
+    connection: Connection = database.session.connection()
+    report: PragmaReport = get_pragma_report(connection, configured_pragmas)
+    sizes: dict = read_pragmas(connection, ["page_size", "page_count", "freelist_count"])
+
+    return DatabaseDiagnosticsReadDTO(
+        sqlite_version=sqlite3.sqlite_version,
+        pragmas=report.applied,
+        configured_pragmas=configured_pragmas,
+        mismatches=report.mismatches,
+        **sizes
+    )
@@ -2,10 +2,13 @@ from typing import Optional
 
 from flask_jwt_extended import create_access_token, get_jwt
 
+from app import background_tasks
 from app.exceptions.exceptions import MissingAuthDataException, InvalidCredentialsException
 from app.models import User
 from app.models.User import UserRole
+from app.password_hashing import needs_rehash
 from app.repositories import user_repository
+from app.services import user_service
 
 
 def login(email: Optional[str], password: Optional[str]) -> str:
@@ -17,6 +20,10 @@ def login(email: Optional[str], password: Optional[str]) -> str:
     if user is None or not user.check_password(password):
         raise InvalidCredentialsException()
 
+    # Hashes created with another cost are upgraded once the plain password is known
+    if needs_rehash(user.hashed_password):
+        background_tasks.run_in_background(user_service.rehash_password, user.id, password, user.hashed_password)
+
     return create_access_token(
         identity=str(user.id),
         additional_claims={"role": user.role.value}
@@ -1,14 +1,18 @@
-from typing import Optional
+from typing import Iterator, Optional
 
+from sqlalchemy import Row
 from sqlalchemy.exc import IntegrityError
 
 from app import database
+from app.background_tasks import run_in_background
 from app.dtos import CategoryReadDTO, CategoryCreateDTO, CategoryUpdateDTO
 from app.exceptions.exceptions import EntityNotFoundException, EntityPersistenceException
 from app.models import Category
 from app.models.User import UserRole
 from app.repositories import category_repository
-from app.utils import str_to_int_or_none
+from app.services import purge_service
+from app.utils import str_to_bool_or_none, str_to_int_or_none
+from app.write_queue import serialized_write, transaction
 
 entity_type: str = "Category"
 
@@ -26,28 +30,47 @@ def get_categories(requester_id: int,
     if requester_role != UserRole.ADMIN and requester_id != user_id_int:
         raise PermissionError("Forbidden")
 
-    categories: list[Category] = category_repository.get_categories(user_id_int, name)
+    categories: list[Row] = category_repository.get_categories(user_id_int, name)
 
     return [CategoryReadDTO.model_validate(category) for category in categories]
 
 
+def stream_categories(requester_id: int,
+                      requester_role: UserRole,
+                      user_id: Optional[str],
+                      name: Optional[str]) -> Iterator[CategoryReadDTO]:
+    user_id_int: Optional[int] = str_to_int_or_none(user_id)
+
+    if requester_role == UserRole.USER and user_id_int is None:
+        user_id_int = requester_id
+
+    if requester_role != UserRole.ADMIN and requester_id != user_id_int:
+        raise PermissionError("Forbidden")
+
+    # Checks above run eagerly, rows are fetched and converted only while the response is being written
+    categories: Iterator[Row] = category_repository.iter_categories(user_id_int, name)
+
+    return (CategoryReadDTO.model_validate(category) for category in categories)
+
+
 def get_category_by_id(requester_id: int,
                        requester_role: UserRole,
                        category_id: int) -> CategoryReadDTO:
     try:
-        category: Category = get_category_entity(category_id)
+        if requester_role == UserRole.ADMIN:
+            category: Category = get_category_entity(category_id)
+        else:
+            category: Category = get_category_entity(category_id, requester_id)
     except EntityNotFoundException as e:
         if requester_role == UserRole.ADMIN:
             raise e
         else:
             raise PermissionError("Forbidden")
 
-    if requester_role != UserRole.ADMIN and requester_id != category.user_id:
-        raise PermissionError("Forbidden")
-
     return CategoryReadDTO.model_validate(category)
 
 
+@serialized_write
 def create_category(requester_id: int,
                     requester_role: UserRole,
                     category_dto: CategoryCreateDTO) -> CategoryReadDTO:
@@ -57,14 +80,18 @@ def create_category(requester_id: int,
     category: Category = convert_dto_to_model(category_dto)
 
     try:
-        with database.session.begin():
+        with transaction():
             created_category: Category = category_repository.create_category(database.session, category)
+            # Built before the commit, which expires the entity and would reload it on the first attribute access
+            database.session.flush()
+            category_read_dto: CategoryReadDTO = CategoryReadDTO.model_validate(created_category)
     except IntegrityError:
         raise EntityPersistenceException(entity_type)
 
-    return CategoryReadDTO.model_validate(created_category)
+    return category_read_dto
 
 
+@serialized_write
 def update_category(requester_id: int,
                     requester_role: UserRole,
                     category_id: int,
@@ -72,7 +99,7 @@ def update_category(requester_id: int,
     updates: dict = category_updates.model_dump(exclude_unset=True)
 
     try:
-        with database.session.begin():
+        with transaction():
             if requester_role == UserRole.ADMIN:
                 category: Category = get_category_entity(category_id)
             else:
@@ -81,6 +108,9 @@ def update_category(requester_id: int,
             for field, value in updates.items():
                 if hasattr(category, field):
                     setattr(category, field, value)
+
+            database.session.flush()
+            category_read_dto: CategoryReadDTO = CategoryReadDTO.model_validate(category)
     except EntityNotFoundException as e:
         if requester_role == UserRole.ADMIN:
             raise e
@@ -89,26 +119,36 @@ def update_category(requester_id: int,
     except IntegrityError:
         raise EntityPersistenceException(entity_type)
 
-    return CategoryReadDTO.model_validate(category)
+    return category_read_dto
 
 
+@serialized_write
 def delete_category(requester_id: int,
                     requester_role: UserRole,
-                    category_id: int) -> CategoryReadDTO:
+                    category_id: int,
+                    asynchronous: Optional[str] = None) -> CategoryReadDTO:
+    asynchronous_bool: bool = str_to_bool_or_none(asynchronous) or False
+
     try:
-        with database.session.begin():
+        with transaction():
             if requester_role == UserRole.ADMIN:
                 category: Category = get_category_entity(category_id)
             else:
                 category: Category = get_category_entity(category_id, requester_id)
 
-            category_repository.delete_category(database.session, category)
+            if asynchronous_bool:
+                category_repository.mark_category_deleted(database.session, category)
+            else:
+                category_repository.delete_category(database.session, category)
     except EntityNotFoundException as e:
         if requester_role == UserRole.ADMIN:
             raise e
         else:
             raise PermissionError("Forbidden")
 
+    if asynchronous_bool:
+        run_in_background(purge_service.purge_category, category_id)
+
     return CategoryReadDTO.model_validate(category)
 
 
@@ -0,0 +1,97 @@
+from collections import Counter
+from datetime import date, datetime, MINYEAR, MAXYEAR
+from typing import Iterable, Optional
+
+from sqlalchemy import Row
+
+from app import database
+from app.dtos import DailyExecutionCountReadDTO, ExecutionHeatmapReadDTO
+from app.models.User import UserRole
+from app.repositories import daily_execution_count_repository
+from app.utils import str_to_int_or_none, str_to_date_or_none, get_utc_time
+
+HEATMAP_SIZE: int = 366
+
+
+def get_daily_execution_counts(requester_id: int,
+                               requester_role: UserRole,
+                               user_id: Optional[str],
+                               category_id: Optional[str],
+                               habit_task_id: Optional[str],
+                               start_date: Optional[str],
+                               end_date: Optional[str]) -> list[DailyExecutionCountReadDTO]:
+    user_id_int: Optional[int] = str_to_int_or_none(user_id)
+    category_id_int: Optional[int] = str_to_int_or_none(category_id)
+    habit_task_id_int: Optional[int] = str_to_int_or_none(habit_task_id)
+    start_date_d: Optional[date] = str_to_date_or_none(start_date)
+    end_date_d: Optional[date] = str_to_date_or_none(end_date)
+
+    if requester_role == UserRole.USER and user_id_int is None:
+        user_id_int = requester_id
+
+    if requester_role != UserRole.ADMIN and requester_id != user_id_int:
+        raise PermissionError("Forbidden")
+
+    daily_execution_counts: list[Row] = daily_execution_count_repository.get_daily_execution_counts(
+        user_id_int, category_id_int, habit_task_id_int, start_date_d, end_date_d)
+
+    return [DailyExecutionCountReadDTO.model_validate(daily_execution_count) for daily_execution_count in
+            daily_execution_counts]
+
+
+def get_execution_heatmap(requester_id: int,
+                          requester_role: UserRole,
+                          user_id: Optional[str],
+                          category_id: Optional[str],
+                          year: Optional[str]) -> ExecutionHeatmapReadDTO:
+    user_id_int: Optional[int] = str_to_int_or_none(user_id)
+    category_id_int: Optional[int] = str_to_int_or_none(category_id)
+    year_int: int = get_utc_time().year if year is None else int(year)
+
+    if not MINYEAR <= year_int <= MAXYEAR:
+        raise ValueError("Invalid year")
+
+    if requester_role == UserRole.USER and user_id_int is None:
+        user_id_int = requester_id
+
+    if requester_role != UserRole.ADMIN and requester_id != user_id_int:
+        raise PermissionError("Forbidden")
+
+    counts: list[int] = [0] * HEATMAP_SIZE
+
+    # At most one row per day of the year comes back, whatever the number of executions
+    for day, total in daily_execution_count_repository.get_daily_totals(user_id_int, category_id_int,
+                                                                        date(year_int, 1, 1), date(year_int, 12, 31)):
+        counts[day.timetuple().tm_yday - 1] = total
+
+    return ExecutionHeatmapReadDTO(year=year_int, counts=counts)
+
+
+def record_execution(habit_task_id: int, user_id: int, executed_at: datetime) -> None:
+    record_executions([(habit_task_id, user_id, executed_at)])
+
+
+def record_executions(executions: Iterable[tuple[int, int, datetime]]) -> None:
+    counts: Counter = Counter(
+        (habit_task_id, user_id, executed_at.date()) for habit_task_id, user_id, executed_at in executions
+    )
+
+    if not counts:
+        return
+
+    daily_execution_count_repository.increment_daily_execution_counts(database.session, [
+        {"habit_task_id": habit_task_id, "user_id": user_id, "day": day, "count": count}
+        for (habit_task_id, user_id, day), count in counts.items()
+    ])
+
+
+def record_deletion(habit_task_id: int, executed_at: datetime) -> None:
+    daily_execution_count_repository.decrement_daily_execution_count(database.session, habit_task_id,
+                                                                     executed_at.date())
+
+
+def rebuild_daily_execution_counts() -> int:
+    with database.session.begin():
+        rebuilt: int = daily_execution_count_repository.rebuild_daily_execution_counts(database.session)
+
+    return rebuilt
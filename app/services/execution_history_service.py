@@ -1,19 +1,31 @@
+import base64
+import binascii
+import json
 from datetime import datetime
-from typing import Optional
+from typing import Iterator, Optional
 
+from pydantic import ValidationError
+from sqlalchemy import Row
 from sqlalchemy.exc import IntegrityError
 
 from app import database
-from app.dtos import ExecutionHistoryReadDTO, ExecutionHistoryCreateDTO
+from app.dtos import ExecutionHistoryReadDTO, ExecutionHistoryCreateDTO, ExecutionHistoryBulkErrorDTO, \
+    ExecutionHistoryBulkCreatedDTO, ExecutionHistoryBulkResultDTO
 from app.exceptions.exceptions import EntityNotFoundException, EntityPersistenceException
 from app.models import ExecutionHistory, HabitTask
 from app.models.User import UserRole
-from app.repositories import execution_history_repository
+from app.repositories import execution_history_repository, habit_task_repository
+from app.services import habit_task_streak_service, daily_execution_count_service
 from app.services.habit_task_service import get_habit_task_entity
 from app.utils import str_to_int_or_none, str_to_datetime_or_none
+from app.write_queue import serialized_write, transaction
 
 entity_type: str = "Execution history"
 
+DEFAULT_PAGE_SIZE: int = 100
+MAX_PAGE_SIZE: int = 1000
+MAX_BULK_SIZE: int = 1000
+
 
 def get_execution_histories(requester_id: int,
                             requester_role: UserRole,
@@ -34,47 +46,120 @@ def get_execution_histories(requester_id: int,
     if requester_role != UserRole.ADMIN and requester_id != user_id_int:
         raise PermissionError("Forbidden")
 
-    execution_histories: list[ExecutionHistory] = execution_history_repository.get_execution_histories(user_id_int,
-                                                                                                       category_id_int,
-                                                                                                       habit_task_id_int,
-                                                                                                       start_datetime_dt,
-                                                                                                       end_datetime_dt)
+    execution_histories: list[Row] = execution_history_repository.get_execution_histories(
+        user_id_int, category_id_int, habit_task_id_int, start_datetime_dt, end_datetime_dt)
 
     return [ExecutionHistoryReadDTO.model_validate(execution_history) for execution_history in execution_histories]
 
 
+def stream_execution_histories(requester_id: int,
+                               requester_role: UserRole,
+                               user_id: Optional[str],
+                               category_id: Optional[str],
+                               habit_task_id: Optional[str],
+                               start_datetime: Optional[str],
+                               end_datetime: Optional[str]) -> Iterator[ExecutionHistoryReadDTO]:
+    user_id_int: Optional[int] = str_to_int_or_none(user_id)
+    category_id_int: Optional[int] = str_to_int_or_none(category_id)
+    habit_task_id_int: Optional[int] = str_to_int_or_none(habit_task_id)
+    start_datetime_dt: Optional[datetime] = str_to_datetime_or_none(start_datetime)
+    end_datetime_dt: Optional[datetime] = str_to_datetime_or_none(end_datetime)
+
+    if requester_role == UserRole.USER and user_id_int is None:
+        user_id_int = requester_id
+
+    if requester_role != UserRole.ADMIN and requester_id != user_id_int:
+        raise PermissionError("Forbidden")
+
+    execution_histories: Iterator[Row] = execution_history_repository.iter_execution_histories(
+        user_id_int, category_id_int, habit_task_id_int, start_datetime_dt, end_datetime_dt)
+
+    return (ExecutionHistoryReadDTO.model_validate(execution_history) for execution_history in execution_histories)
+
+
+def get_execution_histories_page(requester_id: int,
+                                 requester_role: UserRole,
+                                 user_id: Optional[str],
+                                 category_id: Optional[str],
+                                 habit_task_id: Optional[str],
+                                 start_datetime: Optional[str],
+                                 end_datetime: Optional[str],
+                                 cursor: Optional[str],
+                                 limit: Optional[str]) -> tuple[list[ExecutionHistoryReadDTO], Optional[str]]:
+    user_id_int: Optional[int] = str_to_int_or_none(user_id)
+    category_id_int: Optional[int] = str_to_int_or_none(category_id)
+    habit_task_id_int: Optional[int] = str_to_int_or_none(habit_task_id)
+    start_datetime_dt: Optional[datetime] = str_to_datetime_or_none(start_datetime)
+    end_datetime_dt: Optional[datetime] = str_to_datetime_or_none(end_datetime)
+    after: Optional[tuple[datetime, int]] = decode_cursor(cursor)
+    limit_int: int = DEFAULT_PAGE_SIZE if limit is None else int(limit)
+
+    if not 0 < limit_int <= MAX_PAGE_SIZE:
+        raise ValueError(f"Limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    if requester_role == UserRole.USER and user_id_int is None:
+        user_id_int = requester_id
+
+    if requester_role != UserRole.ADMIN and requester_id != user_id_int:
+        raise PermissionError("Forbidden")
+
+    # One extra row tells whether another page exists without a COUNT query
+    execution_histories: list[Row] = execution_history_repository.get_execution_histories_page(
+        user_id_int, category_id_int, habit_task_id_int, start_datetime_dt, end_datetime_dt, after, limit_int + 1)
+
+    next_cursor: Optional[str] = None
+
+    if len(execution_histories) > limit_int:
+        execution_histories = execution_histories[:limit_int]
+        last: ExecutionHistory = execution_histories[-1]
+        next_cursor = encode_cursor(last.executed_at, last.id)
+
+    return [ExecutionHistoryReadDTO.model_validate(execution_history) for execution_history in
+            execution_histories], next_cursor
+
+
 def get_execution_history_by_id(requester_id: int,
                                 requester_role: UserRole,
                                 execution_history_id: int) -> ExecutionHistoryReadDTO:
     try:
-        execution_history: ExecutionHistory = get_execution_history_entity(execution_history_id)
+        if requester_role == UserRole.ADMIN:
+            execution_history: ExecutionHistory = get_execution_history_entity(execution_history_id)
+        else:
+            execution_history: ExecutionHistory = get_execution_history_entity(execution_history_id, requester_id)
     except EntityNotFoundException as e:
         if requester_role == UserRole.ADMIN:
             raise e
         else:
             raise PermissionError("Forbidden")
 
-    if requester_role != UserRole.ADMIN and requester_id != execution_history.habit_task.category.user_id:
-        raise PermissionError("Forbidden")
-
     return ExecutionHistoryReadDTO.model_validate(execution_history)
 
 
+@serialized_write
 def create_execution_history(requester_id: int,
                              requester_role: UserRole,
                              execution_history_dto: ExecutionHistoryCreateDTO) -> ExecutionHistoryReadDTO:
     execution_history: ExecutionHistory = convert_dto_to_model(execution_history_dto)
 
     try:
-        with database.session.begin():
+        with transaction():
             # Check if habit task exists / exists and belongs to requester
             if requester_role == UserRole.ADMIN:
-                _habit_task: HabitTask = get_habit_task_entity(execution_history.habit_task_id)
+                habit_task: HabitTask = get_habit_task_entity(execution_history.habit_task_id)
+                execution_history.user_id = habit_task.category.user_id
             else:
                 _habit_task: HabitTask = get_habit_task_entity(execution_history.habit_task_id, requester_id)
+                execution_history.user_id = requester_id
 
             created_execution_history: ExecutionHistory = execution_history_repository.create_execution_history(
                 database.session, execution_history)
+            habit_task_streak_service.record_execution(execution_history.habit_task_id, execution_history.executed_at)
+            daily_execution_count_service.record_execution(execution_history.habit_task_id, execution_history.user_id,
+                                                           execution_history.executed_at)
+            # Built before the commit, which expires the entity and would reload it on the first attribute access
+            database.session.flush()
+            execution_history_read_dto: ExecutionHistoryReadDTO = ExecutionHistoryReadDTO.model_validate(
+                created_execution_history)
     except EntityNotFoundException as e:
         if requester_role == UserRole.ADMIN:
             raise e
@@ -83,20 +168,87 @@ def create_execution_history(requester_id: int,
     except IntegrityError:
         raise EntityPersistenceException(entity_type)
 
-    return ExecutionHistoryReadDTO.model_validate(created_execution_history)
+    return execution_history_read_dto
+
+
+@serialized_write
+def create_execution_histories(requester_id: int,
+                               requester_role: UserRole,
+                               payloads: list) -> ExecutionHistoryBulkResultDTO:
+    if len(payloads) > MAX_BULK_SIZE:
+        raise ValueError(f"At most {MAX_BULK_SIZE} execution histories can be created at once")
+
+    errors: list[ExecutionHistoryBulkErrorDTO] = []
+    valid_items: list[tuple[int, ExecutionHistoryCreateDTO]] = []
+
+    for index, payload in enumerate(payloads):
+        try:
+            valid_items.append((index, ExecutionHistoryCreateDTO.model_validate(payload)))
+        except ValidationError as e:
+            errors.append(ExecutionHistoryBulkErrorDTO(index=index, error=str(e.errors())))
+
+    rows: list[dict] = []
+    # Payload position of each row
+    row_indexes: list[int] = []
+
+    try:
+        with transaction():
+            # One IN query checks existence and ownership of every referenced habit task
+            habit_task_owners: dict[int, int] = habit_task_repository.get_habit_task_owners(
+                {execution_history_dto.habit_task_id for _, execution_history_dto in valid_items})
+
+            for index, execution_history_dto in valid_items:
+                owner_id: Optional[int] = habit_task_owners.get(execution_history_dto.habit_task_id)
+
+                if requester_role != UserRole.ADMIN and owner_id != requester_id:
+                    errors.append(ExecutionHistoryBulkErrorDTO(index=index, error="Forbidden"))
+                elif owner_id is None:
+                    errors.append(ExecutionHistoryBulkErrorDTO(index=index,
+                                                               error=str(EntityNotFoundException("Habit Task"))))
+                else:
+                    rows.append({
+                        "habit_task_id": execution_history_dto.habit_task_id,
+                        "user_id": owner_id,
+                        "executed_at": execution_history_dto.executed_at
+                    })
+                    row_indexes.append(index)
+
+            created: list[ExecutionHistoryBulkCreatedDTO] = []
+
+            if rows:
+                created_execution_histories: list[ExecutionHistory] = \
+                    execution_history_repository.create_execution_histories(database.session, rows)
+                habit_task_streak_service.record_executions((row["habit_task_id"], row["executed_at"]) for row in rows)
+                daily_execution_count_service.record_executions(
+                    (row["habit_task_id"], row["user_id"], row["executed_at"]) for row in rows)
+
+                # Converted before commit, which would otherwise expire the rows RETURNING just loaded
+                created = [ExecutionHistoryBulkCreatedDTO(index=index,
+                                                          id=execution_history.id,
+                                                          habit_task_id=execution_history.habit_task_id,
+                                                          executed_at=execution_history.executed_at)
+                           for index, execution_history in zip(row_indexes, created_execution_histories)]
+    except IntegrityError:
+        raise EntityPersistenceException(entity_type)
+
+    return ExecutionHistoryBulkResultDTO(created=created, errors=sorted(errors, key=lambda error: error.index))
 
 
+@serialized_write
 def delete_execution_history(requester_id: int,
                              requester_role: UserRole,
                              execution_history_id: int) -> ExecutionHistoryReadDTO:
     try:
-        with database.session.begin():
+        with transaction():
             if requester_role == UserRole.ADMIN:
                 execution_history: ExecutionHistory = get_execution_history_entity(execution_history_id)
             else:
                 execution_history: ExecutionHistory = get_execution_history_entity(execution_history_id, requester_id)
 
             execution_history_repository.delete_execution_history(database.session, execution_history)
+            habit_task_streak_service.record_deletion(execution_history.habit_task_id, execution_history.executed_at)
+            daily_execution_count_service.record_deletion(execution_history.habit_task_id,
+                                                          execution_history.executed_at)
     except EntityNotFoundException as e:
         if requester_role == UserRole.ADMIN:
             raise e
@@ -106,6 +258,14 @@ def delete_execution_history(requester_id: int,
     return ExecutionHistoryReadDTO.model_validate(execution_history)
 
 
+def backfill_user_ids() -> int:
+    with database.engine.begin() as connection:
+        execution_history_repository.add_user_id_column_if_missing(connection)
+        updated: int = execution_history_repository.backfill_user_ids(connection)
+
+    return updated
+
+
 def convert_dto_to_model(execution_history_dto: ExecutionHistoryCreateDTO) -> ExecutionHistory:
     return ExecutionHistory(
         habit_task_id=execution_history_dto.habit_task_id,
@@ -121,3 +281,21 @@ def get_execution_history_entity(execution_history_id: int, user_id: Optional[in
         raise EntityNotFoundException(entity_type)
 
     return execution_history
+
+
+def encode_cursor(executed_at: datetime, execution_history_id: int) -> str:
+    raw: bytes = json.dumps([executed_at.isoformat(), execution_history_id]).encode("utf-8")
+
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[tuple[datetime, int]]:
+    if cursor is None:
+        return None
+
+    try:
+        executed_at, execution_history_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+
+        return datetime.fromisoformat(executed_at), int(execution_history_id)
+    except (binascii.Error, UnicodeError, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
@@ -1,5 +1,6 @@
-from typing import Optional
+from typing import Iterator, Optional
 
+from sqlalchemy import Row
 from sqlalchemy.exc import IntegrityError
 
 from app import database
@@ -7,9 +8,10 @@ from app.dtos import HabitTaskReadDTO, HabitTaskCreateDTO, HabitTaskUpdateDTO
 from app.exceptions.exceptions import EntityNotFoundException, EntityPersistenceException
 from app.models import HabitTask, Category
 from app.models.User import UserRole
-from app.repositories import habit_task_repository
+from app.repositories import habit_task_repository, execution_history_repository, daily_execution_count_repository
 from app.services.category_service import get_category_entity
 from app.utils import str_to_int_or_none
+from app.write_queue import serialized_write, transaction
 
 entity_type: str = "Habit Task"
 
@@ -28,35 +30,55 @@ def get_habit_tasks(requester_id: int,
     if requester_role != UserRole.ADMIN and requester_id != user_id_int:
         raise PermissionError("Forbidden")
 
-    habit_tasks: list[HabitTask] = habit_task_repository.get_habit_tasks(user_id_int, category_id_int, name)
+    habit_tasks: list[Row] = habit_task_repository.get_habit_tasks(user_id_int, category_id_int, name)
 
     return [HabitTaskReadDTO.model_validate(habit_task) for habit_task in habit_tasks]
 
 
+def stream_habit_tasks(requester_id: int,
+                       requester_role: UserRole,
+                       user_id: Optional[str],
+                       category_id: Optional[str],
+                       name: Optional[str]) -> Iterator[HabitTaskReadDTO]:
+    user_id_int: Optional[int] = str_to_int_or_none(user_id)
+    category_id_int: Optional[int] = str_to_int_or_none(category_id)
+
+    if requester_role == UserRole.USER and user_id_int is None:
+        user_id_int = requester_id
+
+    if requester_role != UserRole.ADMIN and requester_id != user_id_int:
+        raise PermissionError("Forbidden")
+
+    habit_tasks: Iterator[Row] = habit_task_repository.iter_habit_tasks(user_id_int, category_id_int, name)
+
+    return (HabitTaskReadDTO.model_validate(habit_task) for habit_task in habit_tasks)
+
+
 def get_habit_task_by_id(requester_id: int,
                          requester_role: UserRole,
                          habit_task_id: int) -> HabitTaskReadDTO:
     try:
-        habit_task: HabitTask = get_habit_task_entity(habit_task_id)
+        if requester_role == UserRole.ADMIN:
+            habit_task: HabitTask = get_habit_task_entity(habit_task_id)
+        else:
+            habit_task: HabitTask = get_habit_task_entity(habit_task_id, requester_id)
     except EntityNotFoundException as e:
         if requester_role == UserRole.ADMIN:
             raise e
         else:
             raise PermissionError("Forbidden")
 
-    if requester_role != UserRole.ADMIN and requester_id != habit_task.category.user_id:
-        raise PermissionError("Forbidden")
-
     return HabitTaskReadDTO.model_validate(habit_task)
 
 
+@serialized_write
 def create_habit_task(requester_id: int,
                       requester_role: UserRole,
                       habit_task_dto: HabitTaskCreateDTO) -> HabitTaskReadDTO:
     habit_task: HabitTask = convert_dto_to_model(habit_task_dto)
 
     try:
-        with database.session.begin():
+        with transaction():
             # Check if category exists / exists and belongs to requester
             if requester_role == UserRole.ADMIN:
                 _category: Category = get_category_entity(habit_task.category_id)
@@ -64,6 +86,9 @@ def create_habit_task(requester_id: int,
                 _category: Category = get_category_entity(habit_task.category_id, requester_id)
 
             created_habit_task: HabitTask = habit_task_repository.create_habit_task(database.session, habit_task)
+            # Built before the commit, which expires the entity and would reload it on the first attribute access
+            database.session.flush()
+            habit_task_read_dto: HabitTaskReadDTO = HabitTaskReadDTO.model_validate(created_habit_task)
     except EntityNotFoundException as e:
         if requester_role == UserRole.ADMIN:
             raise e
@@ -72,9 +97,10 @@ def create_habit_task(requester_id: int,
     except IntegrityError:
         raise EntityPersistenceException(entity_type)
 
-    return HabitTaskReadDTO.model_validate(created_habit_task)
+    return habit_task_read_dto
 
 
+@serialized_write
 def update_habit_task(requester_id: int,
                       requester_role: UserRole,
                       habit_task_id: int,
@@ -82,19 +108,34 @@ def update_habit_task(requester_id: int,
     updates: dict = habit_task_updates.model_dump(exclude_unset=True)
 
     try:
-        with database.session.begin():
+        with transaction():
             if requester_role == UserRole.ADMIN:
                 habit_task: HabitTask = get_habit_task_entity(habit_task_id)
+
+                if "category_id" in updates:
+                    new_category: Category = get_category_entity(updates["category_id"])
             else:
                 habit_task: HabitTask = get_habit_task_entity(habit_task_id, requester_id)
 
                 if "category_id" in updates:
-                    _category: Category = get_category_entity(updates["category_id"],
-                                                              habit_task.category.user_id)  # Check if new category belongs to user
+                    # Check if new category belongs to user
+                    new_category: Category = get_category_entity(updates["category_id"], requester_id)
+
+            previous_user_id: int = habit_task.category.user_id
 
             for field, value in updates.items():
                 if hasattr(habit_task, field):
                     setattr(habit_task, field, value)
+
+            # Keep the denormalized owner of execution histories in sync when the task changes hands
+            if "category_id" in updates and new_category.user_id != previous_user_id:
+                execution_history_repository.update_user_id_for_habit_task(database.session, habit_task.id,
+                                                                            new_category.user_id)
+                daily_execution_count_repository.update_user_id_for_habit_task(database.session, habit_task.id,
+                                                                                new_category.user_id)
+
+            database.session.flush()
+            habit_task_read_dto: HabitTaskReadDTO = HabitTaskReadDTO.model_validate(habit_task)
     except EntityNotFoundException as e:
         if requester_role == UserRole.ADMIN:
             raise e
@@ -103,14 +144,15 @@ def update_habit_task(requester_id: int,
     except IntegrityError:
         raise EntityPersistenceException(entity_type)
 
-    return HabitTaskReadDTO.model_validate(habit_task)
+    return habit_task_read_dto
 
 
+@serialized_write
 def delete_habit_task(requester_id: int,
                       requester_role: UserRole,
                       habit_task_id: int) -> HabitTaskReadDTO:
     try:
-        with database.session.begin():
+        with transaction():
             if requester_role == UserRole.ADMIN:
                 habit_task: HabitTask = get_habit_task_entity(habit_task_id)
             else:
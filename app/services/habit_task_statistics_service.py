@@ -0,0 +1,100 @@
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+import numpy as np
+
+from app.dtos import HabitTaskStatisticsReadDTO
+from app.exceptions.exceptions import EntityNotFoundException
+from app.models.User import UserRole
+from app.repositories import execution_history_repository
+from app.services.habit_task_service import get_habit_task_entity
+from app.utils import get_utc_time, str_to_date_or_none
+
+DEFAULT_WINDOW_DAYS: int = 90
+MAX_WINDOW_DAYS: int = 3660
+ROLLING_WINDOWS: tuple[int, int] = (7, 30)
+
+# 1970-01-01, day 0 of datetime64[D], was a Thursday
+EPOCH_WEEKDAY: int = 3
+
+
+def get_habit_task_statistics(requester_id: int,
+                              requester_role: UserRole,
+                              habit_task_id: int,
+                              start_date: Optional[str],
+                              end_date: Optional[str]) -> HabitTaskStatisticsReadDTO:
+    end_date_d: date = str_to_date_or_none(end_date) or get_utc_time().date()
+    start_date_d: date = str_to_date_or_none(start_date) or end_date_d - timedelta(days=DEFAULT_WINDOW_DAYS - 1)
+
+    if start_date_d > end_date_d:
+        raise ValueError("start_date must not be after end_date")
+
+    if (end_date_d - start_date_d).days >= MAX_WINDOW_DAYS:
+        raise ValueError(f"The window must not exceed {MAX_WINDOW_DAYS} days")
+
+    try:
+        if requester_role == UserRole.ADMIN:
+            get_habit_task_entity(habit_task_id)
+        else:
+            get_habit_task_entity(habit_task_id, requester_id)
+    except EntityNotFoundException as e:
+        if requester_role == UserRole.ADMIN:
+            raise e
+        else:
+            raise PermissionError("Forbidden")
+
+    # The rolling frequencies of the first days also need the executions just before the window
+    lead_in: timedelta = timedelta(days=max(ROLLING_WINDOWS) - 1)
+    executed_at_values: list[str] = execution_history_repository.get_executed_at_values(
+        habit_task_id,
+        datetime.combine(start_date_d - lead_in, time.min),
+        datetime.combine(end_date_d + timedelta(days=1), time.min)
+    )
+
+    return compute_statistics(habit_task_id, np.array(executed_at_values, dtype="datetime64[us]"),
+                              start_date_d, end_date_d)
+
+
+# Expects the executions from the window and up to the largest rolling window before it
+def compute_statistics(habit_task_id: int,
+                       executed_at: np.ndarray,
+                       start_date: date,
+                       end_date: date) -> HabitTaskStatisticsReadDTO:
+    window_start: np.datetime64 = np.datetime64(start_date, "D")
+    window_days: int = (end_date - start_date).days + 1
+    lead_in_days: int = max(ROLLING_WINDOWS) - 1
+
+    executed_at = np.sort(executed_at)
+    execution_days: np.ndarray = executed_at.astype("datetime64[D]")
+    day_offsets: np.ndarray = (execution_days - window_start).astype(np.int64)
+
+    # Executions per day, starting lead_in_days before the window
+    daily_counts: np.ndarray = np.bincount(day_offsets + lead_in_days, minlength=lead_in_days + window_days)
+    cumulative_counts: np.ndarray = np.concatenate(([0], np.cumsum(daily_counts)))
+    window_ends: np.ndarray = np.arange(lead_in_days + 1, lead_in_days + window_days + 1)
+
+    in_window: np.ndarray = day_offsets >= 0
+    window_executed_at: np.ndarray = executed_at[in_window]
+    window_execution_days: np.ndarray = execution_days[in_window]
+
+    gaps_hours: np.ndarray = np.diff(window_executed_at) / np.timedelta64(1, "h")
+    hours: np.ndarray = (window_executed_at - window_execution_days) // np.timedelta64(1, "h")
+    weekdays: np.ndarray = (window_execution_days.astype(np.int64) + EPOCH_WEEKDAY) % 7
+
+    rolling_7_day_frequency, rolling_30_day_frequency = (
+        (cumulative_counts[window_ends] - cumulative_counts[window_ends - size]) / size for size in ROLLING_WINDOWS
+    )
+
+    return HabitTaskStatisticsReadDTO(
+        habit_task_id=habit_task_id,
+        start_date=start_date,
+        end_date=end_date,
+        total_executions=window_executed_at.size,
+        completion_rate=np.count_nonzero(daily_counts[lead_in_days:]) / window_days,
+        mean_gap_hours=float(gaps_hours.mean()) if gaps_hours.size else None,
+        max_gap_hours=float(gaps_hours.max()) if gaps_hours.size else None,
+        hour_histogram=np.bincount(hours, minlength=24).tolist(),
+        weekday_histogram=np.bincount(weekdays, minlength=7).tolist(),
+        rolling_7_day_frequency=rolling_7_day_frequency.tolist(),
+        rolling_30_day_frequency=rolling_30_day_frequency.tolist()
+    )
@@ -0,0 +1,140 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Iterable, Optional
+
+from app import database
+from app.dtos import HabitTaskStreakReadDTO
+from app.exceptions.exceptions import EntityNotFoundException
+from app.models import HabitTaskStreak
+from app.models.User import UserRole
+from app.repositories import habit_task_streak_repository
+from app.services.habit_task_service import get_habit_task_entity
+from app.utils import get_utc_time
+
+ONE_DAY: timedelta = timedelta(days=1)
+
+
+def get_habit_task_streak(requester_id: int,
+                          requester_role: UserRole,
+                          habit_task_id: int) -> HabitTaskStreakReadDTO:
+    try:
+        if requester_role == UserRole.ADMIN:
+            get_habit_task_entity(habit_task_id)
+        else:
+            get_habit_task_entity(habit_task_id, requester_id)
+    except EntityNotFoundException as e:
+        if requester_role == UserRole.ADMIN:
+            raise e
+        else:
+            raise PermissionError("Forbidden")
+
+    streak: Optional[HabitTaskStreak] = habit_task_streak_repository.get_streak(habit_task_id)
+
+    # Tasks without stored state (e.g. created before streaks were tracked) are computed on the fly
+    if streak is None:
+        streak = HabitTaskStreak(habit_task_id=habit_task_id)
+        apply_days(streak, habit_task_streak_repository.get_execution_days(habit_task_id))
+
+    return convert_model_to_dto(streak, get_utc_time().date())
+
+
+def record_execution(habit_task_id: int, executed_at: datetime) -> None:
+    streak: Optional[HabitTaskStreak] = habit_task_streak_repository.get_streak(habit_task_id)
+
+    if streak is None or not advance_streak(streak, executed_at.date()):
+        recompute_streak(habit_task_id, streak)
+
+
+def record_executions(executions: Iterable[tuple[int, datetime]]) -> None:
+    days_by_habit_task: dict[int, set[date]] = defaultdict(set)
+
+    for habit_task_id, executed_at in executions:
+        days_by_habit_task[habit_task_id].add(executed_at.date())
+
+    for habit_task_id, days in days_by_habit_task.items():
+        streak: Optional[HabitTaskStreak] = habit_task_streak_repository.get_streak(habit_task_id)
+
+        if streak is None or not all(advance_streak(streak, day) for day in sorted(days)):
+            recompute_streak(habit_task_id, streak)
+
+
+def record_deletion(habit_task_id: int, executed_at: datetime) -> None:
+    streak: Optional[HabitTaskStreak] = habit_task_streak_repository.get_streak(habit_task_id)
+
+    # Another execution on the same day keeps every run intact
+    if streak is not None and habit_task_streak_repository.has_execution_on_day(habit_task_id, executed_at.date()):
+        return
+
+    recompute_streak(habit_task_id, streak)
+
+
+def recompute_streak(habit_task_id: int, streak: Optional[HabitTaskStreak]) -> HabitTaskStreak:
+    if streak is None:
+        streak = habit_task_streak_repository.create_streak(database.session,
+                                                            HabitTaskStreak(habit_task_id=habit_task_id))
+
+    apply_days(streak, habit_task_streak_repository.get_execution_days(habit_task_id))
+
+    return streak
+
+
+def rebuild_streaks() -> int:
+    streaks: dict[int, HabitTaskStreak] = {}
+
+    with database.session.begin():
+        habit_task_streak_repository.delete_all_streaks(database.session)
+
+        for habit_task_id, day in habit_task_streak_repository.get_all_execution_days():
+            if habit_task_id not in streaks:
+                streaks[habit_task_id] = HabitTaskStreak(habit_task_id=habit_task_id)
+
+            advance_streak(streaks[habit_task_id], day)
+
+        database.session.add_all(streaks.values())
+
+    return len(streaks)
+
+
+def apply_days(streak: HabitTaskStreak, days: list[date]) -> None:
+    streak.current_streak = 0
+    streak.longest_streak = 0
+    streak.last_execution_day = None
+
+    for day in days:
+        advance_streak(streak, day)
+
+
+# Extends the streak by one execution day in O(1). Returns False for a day before the last recorded one,
+# which can only be handled by a recompute.
+def advance_streak(streak: HabitTaskStreak, day: date) -> bool:
+    last_day: Optional[date] = streak.last_execution_day
+
+    if last_day is not None and day < last_day:
+        return False
+
+    if last_day is not None and day == last_day:
+        return True
+
+    if last_day is not None and day == last_day + ONE_DAY:
+        streak.current_streak += 1
+    else:
+        streak.current_streak = 1
+
+    streak.longest_streak = max(streak.longest_streak or 0, streak.current_streak)
+    streak.last_execution_day = day
+
+    return True
+
+
+def convert_model_to_dto(streak: HabitTaskStreak, today: date) -> HabitTaskStreakReadDTO:
+    last_day: Optional[date] = streak.last_execution_day
+
+    # A run is still current if it ended today or yesterday (today's execution may be pending)
+    is_current: bool = last_day is not None and last_day >= today - ONE_DAY
+
+    return HabitTaskStreakReadDTO(
+        habit_task_id=streak.habit_task_id,
+        current_streak=streak.current_streak if is_current else 0,
+        longest_streak=streak.longest_streak,
+        last_execution_day=last_day
+    )
@@ -0,0 +1,53 @@
+from typing import Callable
+
+from flask import current_app
+from sqlalchemy.orm import Session
+
+from app import database
+from app.repositories import purge_repository
+
+
+# Each batch commits on its own so SQLite's write lock is released between batches
+def purge_user(user_id: int) -> int:
+    purged: int = _purge_in_batches(lambda session, batch_size: purge_repository.delete_user_data_batch(
+        session, user_id, batch_size))
+
+    with database.session.begin():
+        purged += purge_repository.delete_user_row(database.session, user_id)
+
+    return purged
+
+
+def purge_category(category_id: int) -> int:
+    purged: int = _purge_in_batches(lambda session, batch_size: purge_repository.delete_category_data_batch(
+        session, category_id, batch_size))
+
+    with database.session.begin():
+        purged += purge_repository.delete_category_row(database.session, category_id)
+
+    return purged
+
+
+# Resumes purges interrupted by a restart
+def purge_deleted() -> int:
+    with database.session.begin():
+        user_ids: list[int] = purge_repository.get_pending_user_ids(database.session)
+        category_ids: list[int] = purge_repository.get_pending_category_ids(database.session)
+
+    purged: int = sum(purge_user(user_id) for user_id in user_ids)
+
+    return purged + sum(purge_category(category_id) for category_id in category_ids)
+
+
+def _purge_in_batches(delete_batch: Callable[[Session, int], int]) -> int:
+    batch_size: int = current_app.config["PURGE_BATCH_SIZE"]
+    purged: int = 0
+
+    while True:
+        with database.session.begin():
+            deleted: int = delete_batch(database.session, batch_size)
+
+        if deleted == 0:
+            return purged
+
+        purged += deleted
@@ -1,14 +1,20 @@
-from typing import Optional
+from typing import Iterator, Optional
 
+from sqlalchemy import Row
 from sqlalchemy.exc import IntegrityError
 
 from app import database
+from app.background_tasks import run_in_background
 from app.dtos import UserCreateDTO, UserReadDTO, UserUpdateDTO
-from app.exceptions.exceptions import EntityPersistenceException, EntityNotFoundException
+from app.exceptions.exceptions import EntityPersistenceException, EntityNotFoundException, \
+    ServiceUnavailableException
 from app.models import User, Category
 from app.models.User import UserRole
+from app.password_hashing import hash_password, needs_rehash
 from app.repositories import user_repository, category_repository
+from app.services import purge_service
 from app.utils import str_to_bool_or_none
+from app.write_queue import serialized_write, transaction
 
 entity_type: str = "User"
 
@@ -23,11 +29,26 @@ def get_users(requester_id: int,
 
     is_active_bool: Optional[bool] = str_to_bool_or_none(is_active)
 
-    users: list[User] = user_repository.get_users(first_name, last_name, is_active_bool)
+    users: list[Row] = user_repository.get_users(first_name, last_name, is_active_bool)
 
     return [UserReadDTO.model_validate(user) for user in users]
 
 
+def stream_users(requester_id: int,
+                 requester_role: UserRole,
+                 first_name: Optional[str],
+                 last_name: Optional[str],
+                 is_active: Optional[str]) -> Iterator[UserReadDTO]:
+    if requester_role != UserRole.ADMIN:
+        raise PermissionError("Forbidden")
+
+    is_active_bool: Optional[bool] = str_to_bool_or_none(is_active)
+
+    users: Iterator[Row] = user_repository.iter_users(first_name, last_name, is_active_bool)
+
+    return (UserReadDTO.model_validate(user) for user in users)
+
+
 def get_user_by_id(requester_id: int,
                    requester_role: UserRole,
                    user_id: int) -> UserReadDTO:
@@ -59,20 +80,30 @@ def get_user_by_email(requester_id: int,
 
 
 def create_user(user_dto: UserCreateDTO) -> UserReadDTO:
+    # The password is hashed here, so the writer thread of the write queue never waits for bcrypt
     user: User = convert_dto_to_model(user_dto)
 
+    return save_new_user(user)
+
+
+@serialized_write
+def save_new_user(user: User) -> UserReadDTO:
     try:
-        with database.session.begin():
+        with transaction():
             created_user: User = user_repository.create_user(database.session, user)
             database.session.flush()
             _created_category: Category = category_repository.create_default_category_for_user(database.session,
                                                                                                created_user.id)
-
-        return UserReadDTO.model_validate(created_user)
+            # Built before the commit, which expires the entity and would reload it on the first attribute access
+            database.session.flush()
+            user_read_dto: UserReadDTO = UserReadDTO.model_validate(created_user)
     except IntegrityError:
         raise EntityPersistenceException(entity_type)
 
+    return user_read_dto
 
+
+@serialized_write
 def update_user(requester_id: int,
                 requester_role: UserRole,
                 user_id: int,
@@ -83,32 +114,65 @@ def update_user(requester_id: int,
     updates: dict = user_updates.model_dump(exclude_unset=True)
 
     try:
-        with database.session.begin():
+        with transaction():
             user: User = get_user_entity_by_id(user_id)
 
             for field, value in updates.items():
                 if hasattr(user, field):
                     setattr(user, field, value)
+
+            database.session.flush()
+            user_read_dto: UserReadDTO = UserReadDTO.model_validate(user)
     except IntegrityError:
         raise EntityPersistenceException(entity_type)
 
-    return UserReadDTO.model_validate(user)
+    return user_read_dto
 
 
+@serialized_write
 def delete_user(requester_id: int,
                 requester_role: UserRole,
-                user_id: int) -> UserReadDTO:
+                user_id: int,
+                asynchronous: Optional[str] = None) -> UserReadDTO:
     if requester_role != UserRole.ADMIN and requester_id != user_id:
         raise PermissionError("Forbidden")
 
-    with database.session.begin():
+    asynchronous_bool: bool = str_to_bool_or_none(asynchronous) or False
+
+    with transaction():
         user: User = get_user_entity_by_id(user_id)
 
-        user_repository.delete_user(database.session, user)
+        # Asynchronous deletion hides the user right away and leaves removing its data to a background purge
+        if asynchronous_bool:
+            user_repository.mark_user_deleted(database.session, user)
+        else:
+            user_repository.delete_user(database.session, user)
+
+    if asynchronous_bool:
+        run_in_background(purge_service.purge_user, user_id)
 
     return UserReadDTO.model_validate(user)
 
 
+def rehash_password(user_id: int, plain_password: str, verified_hash: str) -> bool:
+    try:
+        new_hash: str = hash_password(plain_password)
+    except ServiceUnavailableException:
+        # Best effort, the next login tries again
+        return False
+
+    with database.session.begin():
+        user: Optional[User] = user_repository.get_user_by_id(user_id)
+
+        # Skip users whose password changed since it was verified
+        if user is None or user.hashed_password != verified_hash or not needs_rehash(user.hashed_password):
+            return False
+
+        user.hashed_password = new_hash
+
+    return True
+
+
 def convert_dto_to_model(user_dto: UserCreateDTO) -> User:
     user: User = User(
         first_name=user_dto.first_name,
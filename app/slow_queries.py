@@ -0,0 +1,139 @@
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from types import FrameType
+from typing import Optional
+
+from flask import Flask
+from sqlalchemy import Connection, event
+from sqlalchemy.engine.interfaces import DBAPICursor, ExecutionContext
+
+from app.read_only_database import get_engines
+from app.utils import get_utc_time
+
+EXPLAINABLE_STATEMENTS: frozenset[str] = frozenset({"SELECT", "WITH", "INSERT", "UPDATE", "DELETE"})
+
+
+@dataclass(frozen=True)
+class SlowQuery:
+    recorded_at: datetime
+    duration_ms: float
+    statement: str
+    # Only the types of the bound values are kept, never the values themselves
+    parameters: list[str]
+    # Repository (or service) function that issued the statement
+    caller: Optional[str]
+    query_plan: list[str]
+
+
+_slow_queries: deque[SlowQuery] = deque(maxlen=100)
+_threshold_seconds: float = 0.1
+
+
+def init_slow_query_log(app: Flask) -> None:
+    global _slow_queries, _threshold_seconds
+
+    if not app.config["SLOW_QUERY_LOG_ENABLED"]:
+        return
+
+    _threshold_seconds = app.config["SLOW_QUERY_THRESHOLD_MS"] / 1000
+    # Ring buffer, the oldest entries are dropped once it is full
+    _slow_queries = deque(maxlen=app.config["SLOW_QUERY_LOG_SIZE"])
+
+    with app.app_context():
+        for engine in get_engines():
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# Newest first
+def get_slow_queries() -> list[SlowQuery]:
+    return list(reversed(_slow_queries))
+
+
+def clear_slow_queries() -> None:
+    _slow_queries.clear()
+
+
+def redact_parameters(parameters: object) -> list[str]:
+    if isinstance(parameters, dict):
+        return [f"{name}=<{type(value).__name__}>" for name, value in parameters.items()]
+
+    if isinstance(parameters, (list, tuple)):
+        return [f"<{type(value).__name__}>" for value in parameters]
+
+    return []
+
+
+def find_caller(frame: Optional[FrameType]) -> Optional[str]:
+    service_caller: Optional[str] = None
+
+    while frame is not None:
+        module: str = frame.f_globals.get("__name__", "")
+
+        if module.startswith("app.repositories."):
+            return f"{module}.{frame.f_code.co_name}"
+
+        if service_caller is None and module.startswith("app.services."):
+            service_caller = f"{module}.{frame.f_code.co_name}"
+
+        frame = frame.f_back
+
+    return service_caller
+
+
+def _before_cursor_execute(connection: Connection,
+                           _cursor: DBAPICursor,
+                           _statement: str,
+                           _parameters: object,
+                           _context: Optional[ExecutionContext],
+                           _executemany: bool) -> None:
+    connection.info.setdefault("slow_query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(connection: Connection,
+                          _cursor: DBAPICursor,
+                          statement: str,
+                          parameters: object,
+                          _context: Optional[ExecutionContext],
+                          executemany: bool) -> None:
+    started_at: list[float] = connection.info.get("slow_query_started_at", [])
+
+    if not started_at:
+        return
+
+    duration: float = time.perf_counter() - started_at.pop()
+
+    if duration < _threshold_seconds:
+        return
+
+    _slow_queries.append(SlowQuery(
+        recorded_at=get_utc_time(),
+        duration_ms=round(duration * 1000, 3),
+        statement=statement,
+        parameters=redact_parameters(parameters[0] if executemany and parameters else parameters),
+        caller=find_caller(sys._getframe(1)),
+        query_plan=[] if executemany else _explain(connection, statement, parameters)
+    ))
+
+
+def _explain(connection: Connection, statement: str, parameters: object) -> list[str]:
+    keyword: str = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+
+    if keyword not in EXPLAINABLE_STATEMENTS:
+        return []
+
+    # A separate cursor on the same DBAPI connection sees the same transaction and leaves the results of
+    # the slow statement untouched. EXPLAIN QUERY PLAN does not run the statement itself.
+    cursor: DBAPICursor = connection.connection.dbapi_connection.cursor()
+
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+
+        return [row[3] for row in cursor.fetchall()]
+    except connection.dialect.loaded_dbapi.Error:
+        return []
+    finally:
+        cursor.close()
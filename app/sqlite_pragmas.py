@@ -0,0 +1,102 @@
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Union
+
+from flask import Flask
+from sqlalchemy import Connection
+from sqlalchemy.engine.interfaces import DBAPIConnection
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import ConnectionPoolEntry
+
+PragmaValue = Union[int, str]
+
+# WAL lets readers run next to a writer, and with it NORMAL only syncs at checkpoints, which can lose the last
+# transactions on power loss but never corrupts the database. A negative cache_size is in KiB.
+DEFAULT_PRAGMAS: dict[str, PragmaValue] = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "cache_size": -65536,
+    "mmap_size": 268435456,
+    "temp_store": "MEMORY",
+}
+
+# Values SQLite reports back as numbers
+PRAGMA_ENUMS: dict[str, dict[str, int]] = {
+    "synchronous": {"OFF": 0, "NORMAL": 1, "FULL": 2, "EXTRA": 3},
+    "temp_store": {"DEFAULT": 0, "FILE": 1, "MEMORY": 2},
+}
+
+# In-memory databases only support the memory journal and cannot be memory-mapped
+FILE_ONLY_PRAGMAS: frozenset[str] = frozenset({"journal_mode", "mmap_size"})
+
+
+@dataclass
+class PragmaReport:
+    applied: dict[str, Optional[PragmaValue]] = field(default_factory=dict)
+    # Pragmas whose value differs from the configured one, with both values
+    mismatches: list[str] = field(default_factory=list)
+
+
+def create_pragma_listener(pragmas: dict[str, PragmaValue]) -> Callable[[DBAPIConnection, ConnectionPoolEntry], None]:
+    for name in pragmas:
+        if not name.isidentifier():
+            raise ValueError(f"Invalid pragma name: {name}")
+
+    # Runs once per new pooled connection, most of these settings only last as long as the connection
+    def apply_pragmas(dbapi_connection: DBAPIConnection, _connection_record: ConnectionPoolEntry) -> None:
+        cursor = dbapi_connection.cursor()
+
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+            # journal_mode reports the resulting mode as a row, which has to be consumed
+            cursor.fetchall()
+
+        cursor.close()
+
+    return apply_pragmas
+
+
+def read_pragmas(connection: Connection, names: list[str]) -> dict[str, Optional[PragmaValue]]:
+    return {name: connection.exec_driver_sql(f"PRAGMA {name}").scalar() for name in names}
+
+
+def get_pragma_report(connection: Connection, pragmas: dict[str, PragmaValue]) -> PragmaReport:
+    report: PragmaReport = PragmaReport(applied=read_pragmas(connection, list(pragmas)))
+    in_memory: bool = _is_in_memory(connection)
+
+    for name, expected in pragmas.items():
+        if in_memory and name in FILE_ONLY_PRAGMAS:
+            continue
+
+        if _normalize(name, report.applied[name]) != _normalize(name, expected):
+            report.mismatches.append(f"{name}={report.applied[name]} (configured {expected})")
+
+    return report
+
+
+def verify_pragmas(app: Flask) -> None:
+    from app import database
+
+    try:
+        with app.app_context():
+            with database.engine.connect() as connection:
+                report: PragmaReport = get_pragma_report(connection, app.config["SQLITE_PRAGMAS"])
+    except SQLAlchemyError as e:
+        app.logger.warning("Pragma check skipped: %s", e)
+        return
+
+    # A value can be refused without an error, e.g. mmap_size above the compile-time limit
+    for mismatch in report.mismatches:
+        app.logger.warning("SQLite pragma not applied: %s", mismatch)
+
+
+def _normalize(name: str, value: Optional[PragmaValue]) -> str:
+    if isinstance(value, str):
+        value = PRAGMA_ENUMS.get(name, {}).get(value.upper(), value)
+
+    return str(value).lower()
+
+
+def _is_in_memory(connection: Connection) -> bool:
+    # The main database of an in-memory or temporary database has no file
+    return not any(row[1] == "main" and row[2] for row in connection.exec_driver_sql("PRAGMA database_list"))
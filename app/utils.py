@@ -1,9 +1,20 @@
-from datetime import datetime, timezone
-from typing import Optional
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from typing import Iterator, Optional, Sequence, Union
 
-from flask import request
+from flask import current_app, request, Response, stream_with_context
+from pydantic import BaseModel, TypeAdapter
 
 from app.exceptions.exceptions import MissingPayloadException
+from app.request_metrics import measure_serialization
+
+try:
+    import orjson
+except ImportError:  # Optional, responses are encoded by pydantic without it
+    orjson = None
+
+JSON_MIMETYPE: str = "application/json"
+NDJSON_MIMETYPE: str = "application/x-ndjson"
 
 
 def get_utc_time() -> datetime:
@@ -38,6 +49,13 @@ def str_to_datetime_or_none(string: Optional[str]) -> Optional[datetime]:
     return datetime.strptime(string, "%Y-%m-%d %H:%M:%S")
 
 
+def str_to_date_or_none(string: Optional[str]) -> Optional[date]:
+    if string is None:
+        return None
+
+    return datetime.strptime(string, "%Y-%m-%d").date()
+
+
 def get_payload() -> dict:
     payload: Optional[dict] = request.get_json(silent=True)
 
@@ -45,3 +63,81 @@ def get_payload() -> dict:
         raise MissingPayloadException()
 
     return payload
+
+
+def get_stream_mimetype() -> Optional[str]:
+    # NDJSON has to be asked for explicitly, a wildcard Accept header keeps the regular JSON response
+    if request.accept_mimetypes.best_match([JSON_MIMETYPE, NDJSON_MIMETYPE]) == NDJSON_MIMETYPE:
+        return NDJSON_MIMETYPE
+
+    if str_to_bool_or_none(request.args.get("stream")):
+        return JSON_MIMETYPE
+
+    return None
+
+
+def create_stream_response(items: Iterator[BaseModel], mimetype: str) -> Response:
+    if mimetype == NDJSON_MIMETYPE:
+        chunks: Iterator[str] = _generate_ndjson(items)
+    else:
+        chunks: Iterator[str] = _generate_json_array(items)
+
+    return Response(stream_with_context(chunks), mimetype=mimetype)
+
+
+# DTOs are encoded to JSON bytes in one pass, without intermediate dicts or jsonify
+def create_json_response(data: Union[BaseModel, Sequence[BaseModel]]) -> Response:
+    with measure_serialization():
+        body: bytes = dump_json(data)
+
+    return current_app.response_class(body, mimetype=JSON_MIMETYPE)
+
+
+# A sequence is encoded with the serializer of its first item's type, so every item has to be of that type: a
+# subclass would lose its extra fields and an unrelated model would not be encoded at all
+def dump_json(data: Union[BaseModel, Sequence[BaseModel]]) -> bytes:
+    if orjson is not None and current_app.config.get("JSON_USE_ORJSON", False):
+        return orjson.dumps(data, default=_model_fields, option=orjson.OPT_UTC_Z)
+
+    if isinstance(data, BaseModel):
+        return data.__pydantic_serializer__.to_json(data)
+
+    if not data:
+        return b"[]"
+
+    model_type: type[BaseModel] = type(data[0])
+
+    if any(type(item) is not model_type for item in data):
+        raise TypeError(f"Cannot encode a sequence mixing {model_type.__name__} with other types")
+
+    return _get_list_adapter(model_type).dump_json(list(data))
+
+
+@lru_cache
+def _get_list_adapter(model_type: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[model_type])
+
+
+# orjson handles datetimes and enums natively, models only need to expose their field values
+def _model_fields(value: object) -> dict:
+    if isinstance(value, BaseModel):
+        return value.__dict__
+
+    raise TypeError(f"Type {type(value).__name__} is not JSON serializable")
+
+
+def _generate_ndjson(items: Iterator[BaseModel]) -> Iterator[str]:
+    for item in items:
+        yield item.model_dump_json() + "\n"
+
+
+def _generate_json_array(items: Iterator[BaseModel]) -> Iterator[str]:
+    separator: str = ""
+
+    yield "["
+
+    for item in items:
+        yield separator + item.model_dump_json()
+        separator = ","
+
+    yield "]"
@@ -0,0 +1,185 @@
+import atexit
+import queue
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Callable, Iterator, Optional, TypeVar
+
+from flask import Flask
+
+from app.exceptions.exceptions import ServiceUnavailableException
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Job:
+    function: Callable
+    args: tuple
+    kwargs: dict
+    future: Future = field(default_factory=Future)
+
+
+# Serializes writes through one thread. Pending jobs are run back to back in one transaction (each in its own
+# savepoint, so a failing job only rolls back itself) and committed together, which takes the SQLite write
+# lock once per batch instead of once per request.
+class WriteQueue:
+    def __init__(self, app: Flask, max_batch_size: int, limit: int) -> None:
+        self._app: Flask = app
+        self._max_batch_size: int = max_batch_size
+        self._jobs: queue.Queue[Optional[_Job]] = queue.Queue(maxsize=limit)
+        self._thread: threading.Thread = threading.Thread(target=self._run, name="write-queue", daemon=True)
+        self._thread.start()
+
+    def submit(self, function: Callable[..., T], *args, **kwargs) -> Future:
+        job: _Job = _Job(function, args, kwargs)
+
+        try:
+            self._jobs.put_nowait(job)
+        except queue.Full:
+            raise ServiceUnavailableException()
+
+        return job.future
+
+    def shutdown(self) -> None:
+        # Jobs already queued are still run
+        self._jobs.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            job: Optional[_Job] = self._jobs.get()
+
+            if job is None:
+                return
+
+            batch: list[_Job] = [job]
+
+            while len(batch) < self._max_batch_size:
+                try:
+                    job = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+
+                if job is None:
+                    self._run_batch(batch)
+                    return
+
+                batch.append(job)
+
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: list[_Job]) -> None:
+        from app import database
+
+        outcomes: list[tuple[_Job, object, Optional[Exception]]] = []
+        _batch.after_commit = []
+
+        try:
+            with self._app.app_context():
+                try:
+                    with database.session.begin():
+                        # Takes the write lock up front. It also keeps pysqlite from treating the first SAVEPOINT
+                        # as the start of the transaction, whose RELEASE would then commit every job on its own.
+                        database.session.connection().exec_driver_sql("BEGIN IMMEDIATE")
+
+                        for job in batch:
+                            try:
+                                outcomes.append((job, job.function(*job.args, **job.kwargs), None))
+                            except Exception as e:
+                                outcomes.append((job, None, e))
+                finally:
+                    database.session.remove()
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0].future.set_exception(e)
+            else:
+                # Nothing of the batch was committed, so every job can safely run again in a batch of its own
+                for job in batch:
+                    self._run_batch([job])
+
+            return
+        finally:
+            after_commit: list[Callable[[], object]] = _batch.after_commit
+            _batch.after_commit = None
+
+        for job, result, error in outcomes:
+            if error is None:
+                job.future.set_result(result)
+            else:
+                job.future.set_exception(error)
+
+        for callback in after_commit:
+            callback()
+
+
+# Set on the writer thread while a batch runs
+_batch: threading.local = threading.local()
+_write_queue: Optional[WriteQueue] = None
+
+
+def init_write_queue(app: Flask) -> None:
+    global _write_queue
+
+    shutdown_write_queue()
+
+    # Off by default. Needs a database file, every thread would see its own in-memory database.
+    if not app.config["WRITE_QUEUE_ENABLED"]:
+        return
+
+    _write_queue = WriteQueue(app, app.config["WRITE_QUEUE_MAX_BATCH_SIZE"], app.config["WRITE_QUEUE_LIMIT"])
+
+
+def shutdown_write_queue() -> None:
+    global _write_queue
+
+    if _write_queue is not None:
+        _write_queue.shutdown()
+
+    _write_queue = None
+
+
+def in_write_batch() -> bool:
+    return getattr(_batch, "after_commit", None) is not None
+
+
+# Mutating service functions run on the writer thread when the queue is enabled, and inline otherwise
+def serialized_write(function: Callable[..., T]) -> Callable[..., T]:
+    @wraps(function)
+    def wrapper(*args, **kwargs) -> T:
+        if _write_queue is None or in_write_batch():
+            return function(*args, **kwargs)
+
+        return _write_queue.submit(function, *args, **kwargs).result()
+
+    return wrapper
+
+
+# The transaction of a service function: a savepoint within the batch on the writer thread, a transaction of
+# its own anywhere else
+@contextmanager
+def transaction() -> Iterator[None]:
+    from app import database
+
+    if in_write_batch():
+        with database.session.begin_nested():
+            yield
+    else:
+        with database.session.begin():
+            yield
+
+
+# Holds callback back until the current batch is committed. Outside of a batch nothing is deferred and the
+# caller runs it itself.
+def defer_until_commit(callback: Callable[[], object]) -> bool:
+    if not in_write_batch():
+        return False
+
+    _batch.after_commit.append(callback)
+
+    return True
+
+
+atexit.register(shutdown_write_queue)
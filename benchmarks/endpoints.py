@@ -0,0 +1,388 @@
+import argparse
+import json
+import re
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+from flask import Flask
+from flask.testing import FlaskClient
+from flask_jwt_extended import create_access_token
+from sqlalchemy import func, select
+
+# Latency, queries per request and peak RSS of every route, driven through the Flask test client against SQLite
+# databases generated by app.seed_data at several scales. Each scale runs in its own process so the peak RSS
+# belongs to it, on a copy of the fixture so the write routes leave the fixture untouched.
+#
+#   python -m benchmarks.endpoints --scales 1 10 --output results.json
+#   python -m benchmarks.endpoints --scales 1 10 --baseline results.json
+
+FIXTURES_DIRECTORY: Path = Path(__file__).parent / "fixtures"
+# 1x, other scales multiply users and execution histories
+BASE_USERS: int = 100
+BASE_EXECUTION_HISTORIES: int = 20_000
+DAYS: int = 365
+END_DATE: date = date(2024, 12, 31)
+SEED: int = 0
+
+SERVER_TIMING_QUERIES: re.Pattern = re.compile(r'desc="(\d+) queries"')
+
+
+@dataclass(frozen=True)
+class Subject:
+    user_id: int
+    email: str
+    category_id: int
+    habit_task_id: int
+    execution_history_id: int
+
+
+@dataclass
+class Samples:
+    latencies: list[float] = field(default_factory=list)
+    queries: list[int] = field(default_factory=list)
+    errors: int = 0
+
+
+# A request for one subject. Ids of created rows are collected under the case name, so a later case can
+# update or delete them instead of the seeded rows.
+RequestBuilder = Callable[[Subject, dict[str, list[int]]], tuple[str, str, Optional[dict]]]
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    role: str
+    build: RequestBuilder
+    creates: bool = False
+
+
+MONTH: str = f"start_datetime={END_DATE - timedelta(days=30)} 00:00:00&end_datetime={END_DATE} 23:59:59"
+
+
+def _created(created: dict[str, list[int]], name: str) -> int:
+    return created[name].pop()
+
+
+CASES: list[Case] = [
+    Case("POST /auth/login", "USER",
+         lambda s, c: ("POST", "/auth/login", {"email": s.email, "password": "password123"})),
+    Case("GET /users", "ADMIN", lambda s, c: ("GET", "/users/?is_active=true", None)),
+    Case("GET /users?first_name", "ADMIN", lambda s, c: ("GET", "/users/?first_name=ann", None)),
+    Case("GET /users/id", "USER", lambda s, c: ("GET", f"/users/id/{s.user_id}", None)),
+    Case("GET /users/email", "USER", lambda s, c: ("GET", f"/users/email/{s.email}", None)),
+    Case("GET /categories", "USER", lambda s, c: ("GET", "/categories/", None)),
+    Case("GET /categories?name", "USER", lambda s, c: ("GET", "/categories/?name=ing", None)),
+    Case("GET /categories/id", "USER", lambda s, c: ("GET", f"/categories/{s.category_id}", None)),
+    Case("GET /habit_tasks", "USER", lambda s, c: ("GET", "/habit_tasks/", None)),
+    Case("GET /habit_tasks?category_id", "USER",
+         lambda s, c: ("GET", f"/habit_tasks/?category_id={s.category_id}", None)),
+    Case("GET /habit_tasks/id", "USER", lambda s, c: ("GET", f"/habit_tasks/{s.habit_task_id}", None)),
+    Case("GET /habit_tasks/id/streak", "USER",
+         lambda s, c: ("GET", f"/habit_tasks/{s.habit_task_id}/streak", None)),
+    Case("GET /habit_tasks/id/statistics", "USER",
+         lambda s, c: ("GET", f"/habit_tasks/{s.habit_task_id}/statistics", None)),
+    Case("GET /execution_histories (month)", "USER",
+         lambda s, c: ("GET", f"/execution_histories/?{MONTH}", None)),
+    Case("GET /execution_histories (page)", "USER", lambda s, c: ("GET", "/execution_histories/?limit=50", None)),
+    Case("GET /execution_histories (admin, month)", "ADMIN",
+         lambda s, c: ("GET", f"/execution_histories/?user_id={s.user_id}&{MONTH}", None)),
+    Case("GET /execution_histories/id", "USER",
+         lambda s, c: ("GET", f"/execution_histories/{s.execution_history_id}", None)),
+    Case("GET /execution_histories/daily", "USER",
+         lambda s, c: ("GET", f"/execution_histories/daily?start_date={END_DATE - timedelta(days=90)}"
+                              f"&end_date={END_DATE}", None)),
+    Case("GET /execution_histories/heatmap", "USER",
+         lambda s, c: ("GET", f"/execution_histories/heatmap?year={END_DATE.year}", None)),
+    Case("POST /categories", "USER",
+         lambda s, c: ("POST", "/categories/", {"user_id": s.user_id, "name": "Benchmark"}), creates=True),
+    Case("PUT /categories/id", "USER",
+         lambda s, c: ("PUT", f"/categories/{c['POST /categories'][-1]}", {"name": "Renamed"})),
+    Case("POST /habit_tasks", "USER",
+         lambda s, c: ("POST", "/habit_tasks/", {"category_id": s.category_id, "name": "Benchmark"}),
+         creates=True),
+    Case("PUT /habit_tasks/id", "USER",
+         lambda s, c: ("PUT", f"/habit_tasks/{c['POST /habit_tasks'][-1]}",
+                       {"category_id": s.category_id, "name": "Renamed"})),
+    Case("POST /execution_histories", "USER",
+         lambda s, c: ("POST", "/execution_histories/",
+                       {"habit_task_id": s.habit_task_id, "executed_at": f"{END_DATE}T12:00:00"}), creates=True),
+    Case("POST /execution_histories/bulk", "USER",
+         lambda s, c: ("POST", "/execution_histories/bulk", {"execution_histories": [
+             {"habit_task_id": s.habit_task_id, "executed_at": f"{END_DATE - timedelta(days=day)}T08:00:00"}
+             for day in range(10)
+         ]})),
+    Case("DELETE /execution_histories/id", "USER",
+         lambda s, c: ("DELETE", f"/execution_histories/{_created(c, 'POST /execution_histories')}", None)),
+    Case("DELETE /habit_tasks/id", "USER",
+         lambda s, c: ("DELETE", f"/habit_tasks/{_created(c, 'POST /habit_tasks')}", None)),
+    Case("DELETE /categories/id", "USER",
+         lambda s, c: ("DELETE", f"/categories/{_created(c, 'POST /categories')}", None)),
+    Case("PUT /users/id", "USER", lambda s, c: ("PUT", f"/users/{s.user_id}", {"first_name": "Renamed"})),
+    Case("GET /admin/slow_queries", "ADMIN", lambda s, c: ("GET", "/admin/slow_queries", None)),
+    Case("GET /metrics", "ADMIN", lambda s, c: ("GET", "/metrics", None)),
+]
+
+
+def get_fixture_path(scale: int) -> Path:
+    return FIXTURES_DIRECTORY / f"endpoints-{scale}x-seed{SEED}.db"
+
+
+def create_benchmark_app(database_path: Path, **config: object) -> Flask:
+    from app import create_app
+
+    return create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{database_path}", "INDEX_CHECK_ON_STARTUP": False,
+                       **config})
+
+
+# Generated once per scale and reused by later runs
+def build_fixture(scale: int) -> Path:
+    from app import database
+    from app.seed_data import SeedOptions, seed
+    from app.services import daily_execution_count_service, habit_task_streak_service
+
+    path: Path = get_fixture_path(scale)
+
+    if path.exists():
+        return path
+
+    FIXTURES_DIRECTORY.mkdir(exist_ok=True)
+    partial_path: Path = path.with_suffix(".partial")
+    partial_path.unlink(missing_ok=True)
+
+    # The seeded password is hashed once, inline
+    app: Flask = create_benchmark_app(partial_path, PASSWORD_HASHING_POOL_SIZE=0)
+    started_at: float = time.perf_counter()
+
+    with app.app_context():
+        with database.engine.begin() as connection:
+            seed(connection, SeedOptions(users=BASE_USERS * scale,
+                                         execution_histories=BASE_EXECUTION_HISTORIES * scale,
+                                         days=DAYS, end_date=END_DATE, seed=SEED))
+
+        daily_execution_count_service.rebuild_daily_execution_counts()
+        habit_task_streak_service.rebuild_streaks()
+        database.engine.dispose()
+
+    partial_path.rename(path)
+    print(f"Built {path.name} in {time.perf_counter() - started_at:.1f}s", file=sys.stderr)
+
+    return path
+
+
+def pick_subjects(count: int) -> list[Subject]:
+    from app import database
+    from app.models import Category, ExecutionHistory, HabitTask, User
+
+    # Uniform over users, so the skew of the seeded activity shows up in the latency percentiles
+    user_ids: list[int] = database.session.scalars(
+        select(User.id).where(User.id.in_(select(Category.user_id))).order_by(User.id)
+    ).all()
+    chosen: np.ndarray = np.random.default_rng(SEED).choice(user_ids, min(count, len(user_ids)), replace=False)
+    subjects: list[Subject] = []
+
+    for user_id in map(int, chosen):
+        habit_task: HabitTask = database.session.scalars(
+            select(HabitTask).join(Category).where(Category.user_id == user_id).order_by(HabitTask.id).limit(1)
+        ).first()
+        execution_history_id: Optional[int] = database.session.scalar(
+            select(func.min(ExecutionHistory.id)).where(ExecutionHistory.user_id == user_id)
+        )
+
+        if habit_task is None or execution_history_id is None:
+            continue
+
+        subjects.append(Subject(user_id=user_id,
+                                email=database.session.scalar(select(User.email).where(User.id == user_id)),
+                                category_id=habit_task.category_id,
+                                habit_task_id=habit_task.id,
+                                execution_history_id=execution_history_id))
+
+    database.session.remove()
+
+    return subjects
+
+
+def run_case(client: FlaskClient,
+             case: Case,
+             subjects: list[Subject],
+             tokens: dict[tuple[int, str], str],
+             created: dict[int, dict[str, list[int]]],
+             requests: int) -> Samples:
+    samples: Samples = Samples()
+
+    for index in range(requests):
+        subject: Subject = subjects[index % len(subjects)]
+        method, url, payload = case.build(subject, created.setdefault(subject.user_id, {}))
+        headers: dict[str, str] = {"Authorization": f"Bearer {tokens[(subject.user_id, case.role)]}"}
+
+        started_at: float = time.perf_counter()
+        response = client.open(url, method=method, json=payload, headers=headers)
+        # The body of streamed responses is produced while it is read
+        response.get_data()
+        samples.latencies.append(time.perf_counter() - started_at)
+
+        match: Optional[re.Match] = SERVER_TIMING_QUERIES.search(response.headers.get("Server-Timing", ""))
+        samples.queries.append(int(match.group(1)) if match else 0)
+
+        if response.status_code >= 400:
+            samples.errors += 1
+        elif case.creates:
+            created[subject.user_id].setdefault(case.name, []).append(response.get_json()["id"])
+
+    return samples
+
+
+def summarize(samples: Samples) -> dict:
+    latencies_ms: np.ndarray = np.array(samples.latencies) * 1000
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+
+    return {
+        "requests": len(samples.latencies),
+        "errors": samples.errors,
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "queries_per_request": round(float(np.mean(samples.queries)), 2),
+    }
+
+
+def run_cases(app: Flask, scale: int, requests: int, subject_count: int) -> dict[str, dict]:
+    with app.app_context():
+        subjects: list[Subject] = pick_subjects(subject_count)
+        tokens: dict[tuple[int, str], str] = {
+            (subject.user_id, role): create_access_token(identity=str(subject.user_id),
+                                                         additional_claims={"role": role})
+            for subject in subjects for role in ("USER", "ADMIN")
+        }
+
+    client: FlaskClient = app.test_client()
+    created: dict[int, dict[str, list[int]]] = {}
+    endpoints: dict[str, dict] = {}
+
+    for case in CASES:
+        # Warm up statement caches and the SQLite page cache
+        run_case(client, case, subjects, tokens, created, min(len(subjects), requests))
+        endpoints[case.name] = summarize(run_case(client, case, subjects, tokens, created, requests))
+        print(f"{scale}x {case.name}: {endpoints[case.name]}", file=sys.stderr)
+
+    return endpoints
+
+
+def run_scale(scale: int, requests: int, subject_count: int, bcrypt_rounds: Optional[int]) -> dict:
+    fixture: Path = build_fixture(scale)
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_path: Path = Path(directory) / fixture.name
+        shutil.copyfile(fixture, database_path)
+
+        from app.password_hashing import shutdown_password_hashing
+
+        app: Flask = create_benchmark_app(database_path, **({} if bcrypt_rounds is None
+                                                             else {"BCRYPT_ROUNDS": bcrypt_rounds}))
+
+        try:
+            endpoints: dict[str, dict] = run_cases(app, scale, requests, subject_count)
+        finally:
+            # Worker processes exit without running atexit hooks, the hashing pool has to be stopped explicitly
+            shutdown_password_hashing()
+
+    return {
+        "users": BASE_USERS * scale,
+        "execution_histories": BASE_EXECUTION_HISTORIES * scale,
+        # Linux reports ru_maxrss in kilobytes
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "endpoints": endpoints,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions: list[str] = []
+
+    # Queries per request are averaged over the subjects, other subjects give other averages
+    if baseline.get("subjects") != results["subjects"]:
+        print(f"Baseline used {baseline.get('subjects')} subjects, query counts are not comparable")
+
+    for scale, result in results["scales"].items():
+        baseline_scale: Optional[dict] = baseline["scales"].get(scale)
+
+        if baseline_scale is None:
+            continue
+
+        for name, current in result["endpoints"].items():
+            previous: Optional[dict] = baseline_scale["endpoints"].get(name)
+
+            if previous is None:
+                continue
+
+            p95_change: float = current["p95_ms"] / previous["p95_ms"] - 1 if previous["p95_ms"] else 0.0
+            line: str = (f"{scale:>5} {name:<44}{previous['p95_ms']:>10.2f}{current['p95_ms']:>10.2f}"
+                         f"{p95_change:>+9.0%}{previous['queries_per_request']:>8.1f}"
+                         f"{current['queries_per_request']:>8.1f}")
+
+            if p95_change > tolerance or current["queries_per_request"] > previous["queries_per_request"]:
+                regressions.append(line)
+                line += "  REGRESSION"
+
+            print(line)
+
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Latency, queries per request and peak RSS of every route")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100],
+                        help=f"Multiples of {BASE_USERS} users and {BASE_EXECUTION_HISTORIES} execution histories")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per route and scale")
+    parser.add_argument("--subjects", type=int, default=50, help="Users the requests are spread over")
+    parser.add_argument("--bcrypt-rounds", type=int,
+                        help="Cost of passwords hashed during the run, seeded passwords keep theirs")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON")
+    parser.add_argument("--baseline", type=Path, help="Compare with the JSON results of an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Relative p95 increase reported as a regression")
+    arguments = parser.parse_args()
+
+    results: dict = {
+        "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        "requests": arguments.requests,
+        "subjects": arguments.subjects,
+        "scales": {},
+    }
+
+    for scale in arguments.scales:
+        # A fresh process per scale, peak RSS never goes down within a process
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+            results["scales"][f"{scale}x"] = executor.submit(run_scale, scale, arguments.requests,
+                                                             arguments.subjects, arguments.bcrypt_rounds).result()
+
+    if arguments.output is not None:
+        arguments.output.write_text(json.dumps(results, indent=2))
+
+    for scale, result in results["scales"].items():
+        print(f"{scale}: {result['users']} users, {result['execution_histories']} execution histories, "
+              f"peak RSS {result['peak_rss_mb']} MB")
+        print(f"{'route':<44}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}{'errors':>8}")
+
+        for name, summary in result["endpoints"].items():
+            print(f"{name:<44}{summary['p50_ms']:>10.2f}{summary['p95_ms']:>10.2f}{summary['p99_ms']:>10.2f}"
+                  f"{summary['queries_per_request']:>9.1f}{summary['errors']:>8}")
+
+    if arguments.baseline is not None:
+        print(f"\n{'scale':>5} {'route':<44}{'p95 was':>10}{'p95 now':>10}{'change':>9}{'q was':>8}{'q now':>8}")
+
+        if compare(results, json.loads(arguments.baseline.read_text()), arguments.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
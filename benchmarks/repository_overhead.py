@@ -0,0 +1,161 @@
+import argparse
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import contains_eager
+
+from app import create_app, database
+from app.models import Category, DailyExecutionCount, ExecutionHistory, HabitTask, User
+from app.repositories import category_repository, daily_execution_count_repository, execution_history_repository, \
+    habit_task_repository, user_repository
+
+# Per-call overhead of the repository reads on a small in-memory database, where statement building and
+# compilation dominate. "legacy" is the Model.query implementation the repositories used before.
+
+START_DATETIME: datetime = datetime(2024, 1, 1)
+END_DATETIME: datetime = datetime(2024, 2, 1)
+
+
+def seed() -> None:
+    user: User = User(first_name="Bench", last_name="User", email="bench@example.com", hashed_password="-")
+    database.session.add(user)
+    database.session.flush()
+
+    category: Category = Category(user_id=user.id, name="Bench")
+    database.session.add(category)
+    database.session.flush()
+
+    habit_task: HabitTask = HabitTask(category_id=category.id, name="Bench")
+    database.session.add(habit_task)
+    database.session.flush()
+
+    for hour in range(0, 24 * 30, 12):
+        executed_at: datetime = START_DATETIME + timedelta(hours=hour)
+        database.session.add(ExecutionHistory(habit_task_id=habit_task.id, user_id=user.id, executed_at=executed_at))
+
+    for day in range(30):
+        database.session.add(DailyExecutionCount(habit_task_id=habit_task.id, user_id=user.id,
+                                                 day=START_DATETIME.date() + timedelta(days=day), count=2))
+
+    database.session.commit()
+
+
+def legacy_get_categories() -> list:
+    return Category.query.filter(Category.user_id == 1, Category.name.ilike("%Ben%")).all()
+
+
+def legacy_get_category_by_id() -> object:
+    return Category.query.filter(Category.id == 1, Category.user_id == 1).first()
+
+
+def legacy_get_users() -> list:
+    return User.query.filter(User.first_name.ilike("%Ben%"), User.is_active == True).all()  # noqa: E712
+
+
+def legacy_get_user_by_id() -> object:
+    return User.query.get(1)
+
+
+def legacy_get_user_by_email() -> object:
+    return User.query.filter(User.email == "bench@example.com").first()
+
+
+def legacy_get_habit_tasks() -> list:
+    return HabitTask.query.filter(
+        HabitTask.category_id.in_(select(Category.id).where(Category.user_id == 1)),
+        HabitTask.category_id == 1
+    ).all()
+
+
+def legacy_get_habit_task_by_id() -> object:
+    return (HabitTask.query.join(HabitTask.category).options(contains_eager(HabitTask.category))
+            .filter(HabitTask.id == 1, Category.user_id == 1).first())
+
+
+def legacy_get_execution_histories() -> list:
+    return ExecutionHistory.query.filter(ExecutionHistory.user_id == 1,
+                                         START_DATETIME <= ExecutionHistory.executed_at,
+                                         ExecutionHistory.executed_at <= END_DATETIME).all()
+
+
+def legacy_get_execution_histories_page() -> list:
+    return (ExecutionHistory.query
+            .filter(ExecutionHistory.user_id == 1,
+                    tuple_(ExecutionHistory.executed_at, ExecutionHistory.id) > tuple_(START_DATETIME, 1))
+            .order_by(ExecutionHistory.executed_at, ExecutionHistory.id).limit(20).all())
+
+
+def legacy_get_execution_history_by_id() -> object:
+    return ExecutionHistory.query.filter(ExecutionHistory.id == 1, ExecutionHistory.user_id == 1).first()
+
+
+def legacy_get_daily_execution_counts() -> list:
+    return (DailyExecutionCount.query
+            .filter(DailyExecutionCount.user_id == 1,
+                    DailyExecutionCount.day >= START_DATETIME.date(),
+                    DailyExecutionCount.day <= END_DATETIME.date())
+            .order_by(DailyExecutionCount.day, DailyExecutionCount.habit_task_id).all())
+
+
+CASES: dict[str, tuple[Callable[[], object], Callable[[], object]]] = {
+    "get_categories": (legacy_get_categories, lambda: category_repository.get_categories(1, "Ben")),
+    "get_category_by_id": (legacy_get_category_by_id, lambda: category_repository.get_category_by_id(1, 1)),
+    "get_users": (legacy_get_users, lambda: user_repository.get_users("Ben", None, True)),
+    "get_user_by_id": (legacy_get_user_by_id, lambda: user_repository.get_user_by_id(1)),
+    "get_user_by_email": (legacy_get_user_by_email,
+                          lambda: user_repository.get_user_by_email("bench@example.com")),
+    "get_habit_tasks": (legacy_get_habit_tasks, lambda: habit_task_repository.get_habit_tasks(1, 1, None)),
+    "get_habit_task_by_id": (legacy_get_habit_task_by_id, lambda: habit_task_repository.get_habit_task_by_id(1, 1)),
+    "get_execution_histories": (legacy_get_execution_histories,
+                                lambda: execution_history_repository.get_execution_histories(
+                                    1, None, None, START_DATETIME, END_DATETIME)),
+    "get_execution_histories_page": (legacy_get_execution_histories_page,
+                                     lambda: execution_history_repository.get_execution_histories_page(
+                                         1, None, None, None, None, (START_DATETIME, 1), 20)),
+    "get_execution_history_by_id": (legacy_get_execution_history_by_id,
+                                    lambda: execution_history_repository.get_execution_history_by_id(1, 1)),
+    "get_daily_execution_counts": (legacy_get_daily_execution_counts,
+                                   lambda: daily_execution_count_repository.get_daily_execution_counts(
+                                       1, None, None, date(2024, 1, 1), date(2024, 2, 1))),
+}
+
+
+def measure(function: Callable[[], object], iterations: int) -> float:
+    # A fresh identity map per call, like a new request would have
+    for _ in range(50):
+        database.session.expunge_all()
+        function()
+
+    start: float = time.perf_counter()
+
+    for _ in range(iterations):
+        database.session.expunge_all()
+        function()
+
+    return (time.perf_counter() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-call overhead of the repository read functions")
+    parser.add_argument("--iterations", type=int, default=2000)
+    arguments = parser.parse_args()
+
+    app = create_app()
+
+    with app.app_context():
+        seed()
+
+        print(f"{'function':<32}{'legacy us':>12}{'select us':>12}{'speedup':>10}")
+
+        for name, (legacy, current) in CASES.items():
+            legacy_seconds: float = measure(legacy, arguments.iterations)
+            current_seconds: float = measure(current, arguments.iterations)
+
+            print(f"{name:<32}{legacy_seconds * 1e6:>12.1f}{current_seconds * 1e6:>12.1f}"
+                  f"{legacy_seconds / current_seconds:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -113,6 +113,7 @@ def fake_execution_history_model(fake_habit_task_model: HabitTask) -> ExecutionH
     return ExecutionHistory(
         id=1,
         habit_task_id=1,
+        user_id=1,
         executed_at=datetime.now(),
         habit_task=fake_habit_task_model
     )
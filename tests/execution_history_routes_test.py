@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+from typing import Iterator
+
+import pytest
+from flask import Flask
+from flask_jwt_extended import create_access_token
+from werkzeug.test import TestResponse
+
+from app import create_app, database
+from app.models import Category, HabitTask, User
+from app.models.User import UserRole
+from app.password_hashing import shutdown_password_hashing
+
+
+@pytest.fixture
+def app() -> Iterator[Flask]:
+    app: Flask = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:", "INDEX_CHECK_ON_STARTUP": False,
+                             "METRICS_ENABLED": False, "SLOW_QUERY_LOG_ENABLED": False,
+                             "PASSWORD_HASHING_POOL_SIZE": 0,
+                             "JWT_SECRET_KEY": "execution-history-routes-test-secret-key"})
+
+    with app.app_context():
+        user: User = User(first_name="John", last_name="Doe", email="john@example.com", hashed_password="hash",
+                          role=UserRole.USER)
+        database.session.add(HabitTask(category=Category(user=user, name="Sport"), name="Swim"))
+        database.session.commit()
+
+    yield app
+
+    shutdown_password_hashing()
+
+    with app.app_context():
+        database.drop_all()
+        database.session.remove()
+
+
+def _post_bulk(app: Flask, payload: object) -> TestResponse:
+    with app.app_context():
+        token: str = create_access_token(identity="1", additional_claims={"role": UserRole.USER.value})
+
+    return app.test_client().post("/execution_histories/bulk", json=payload,
+                                  headers={"Authorization": f"Bearer {token}"})
+
+
+def test_bulk_create_returns_the_payload_position_of_created_items(app: Flask):
+    executed_at: list[datetime] = [datetime(2025, 1, 1, 8) + timedelta(hours=hour) for hour in range(200)]
+    items: list[dict] = [{"habit_task_id": 1 if position % 3 else 2, "executed_at": value.isoformat()}
+                         for position, value in enumerate(executed_at)]
+
+    response: TestResponse = _post_bulk(app, {"execution_histories": items})
+    body: dict = response.get_json()
+
+    assert response.status_code == 207
+    assert [error["index"] for error in body["errors"]] == list(range(0, 200, 3))
+    assert [created["index"] for created in body["created"]] == [position for position in range(200) if position % 3]
+
+    for created in body["created"]:
+        assert created["executed_at"] == items[created["index"]]["executed_at"]
+
+
+def test_bulk_create_rejects_a_payload_that_is_not_an_object(app: Flask):
+    response: TestResponse = _post_bulk(app, [{"habit_task_id": 1, "executed_at": "2025-01-03T08:00:00"}])
+
+    assert response.status_code == 400
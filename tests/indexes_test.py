@@ -0,0 +1,55 @@
+from typing import Iterator
+
+import pytest
+from flask import Flask
+from sqlalchemy import Connection, text
+
+from app import database
+from app.indexes import check_indexes, create_missing_indexes, IndexReport
+
+
+@pytest.fixture
+def connection() -> Iterator[Connection]:
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+    database.init_app(app)
+
+    with app.app_context():
+        database.create_all()
+
+        with database.engine.connect() as connection:
+            yield connection
+
+
+def test_check_indexes_on_fresh_schema(connection: Connection):
+    report: IndexReport = check_indexes(connection)
+
+    assert report.missing == []
+    assert report.unused == []
+    assert report.full_scans == {}
+
+
+def test_check_indexes_reports_missing_index_and_full_scan(connection: Connection):
+    connection.execute(text("DROP INDEX ix_categories_user_id"))
+
+    report: IndexReport = check_indexes(connection)
+
+    assert report.missing == ["ix_categories_user_id"]
+    assert report.full_scans["categories by user"] == ["categories"]
+
+
+def test_check_indexes_reports_unused_index(connection: Connection):
+    connection.execute(text("CREATE INDEX ix_unused ON users (last_name)"))
+
+    report: IndexReport = check_indexes(connection)
+
+    assert report.unused == ["ix_unused"]
+
+
+def test_create_missing_indexes(connection: Connection):
+    connection.execute(text("DROP INDEX ix_execution_histories_executed_at"))
+
+    created: list[str] = create_missing_indexes(connection)
+
+    assert created == ["ix_execution_histories_executed_at"]
+    assert check_indexes(connection).missing == []
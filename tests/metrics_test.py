@@ -0,0 +1,111 @@
+import threading
+
+import pytest
+from flask import Flask
+from pytest_mock import MockerFixture
+from sqlalchemy import text
+
+from app import database
+from app.metrics import Histogram, Registry, Shard, init_metrics, render_metrics
+
+REGISTRY = "app.metrics.registry"
+GET_JOB_COUNTS = "app.password_hashing.get_job_counts"
+
+
+@pytest.fixture
+def registry(mocker: MockerFixture) -> Registry:
+    return mocker.patch(REGISTRY, Registry())
+
+
+@pytest.fixture
+def app(registry: Registry) -> Flask:
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+    app.config["METRICS_ENABLED"] = True
+    database.init_app(app)
+    init_metrics(app)
+
+    @app.route("/ok")
+    def ok() -> str:
+        database.session.execute(text("SELECT 1"))
+        return "ok"
+
+    @app.route("/fail")
+    def fail() -> str:
+        raise RuntimeError("fail")
+
+    return app
+
+
+def test_histogram_buckets_are_upper_bounds():
+    histogram: Histogram = Histogram((0.1, 1.0))
+
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.sum == pytest.approx(2.65)
+
+
+def test_registry_collects_shards_of_all_threads(registry: Registry):
+    def record() -> None:
+        registry.shard().requests[("users.get_users", "GET", 200)] += 1
+
+    threads: list[threading.Thread] = [threading.Thread(target=record) for _ in range(3)]
+
+    for thread in threads:
+        thread.start()
+        thread.join()
+
+    record()
+
+    total: Shard = registry.collect()
+
+    assert total.requests[("users.get_users", "GET", 200)] == 4
+    # Finished threads are folded into the retired totals
+    assert len(registry._shards) == 1
+    assert registry.collect().requests[("users.get_users", "GET", 200)] == 4
+
+
+def test_requests_are_counted_per_endpoint_and_status(app: Flask, registry: Registry):
+    app.config["PROPAGATE_EXCEPTIONS"] = False
+    client = app.test_client()
+
+    client.get("/ok")
+    client.get("/ok")
+    client.get("/fail")
+    client.get("/missing")
+
+    total: Shard = registry.collect()
+
+    assert total.requests[("ok", "GET", 200)] == 2
+    assert total.requests[("fail", "GET", 500)] == 1
+    assert total.requests[("unmatched", "GET", 404)] == 1
+    assert total.in_flight == {"ok": 0, "fail": 0, "unmatched": 0}
+    assert sum(total.latencies[("ok", "GET")].counts) == 2
+    assert sum(total.pool_wait.counts) >= 2
+
+
+def test_pool_wait_is_recorded_after_the_pool_is_disposed(app: Flask, registry: Registry):
+    with app.app_context():
+        database.engine.dispose()
+
+    app.test_client().get("/ok")
+
+    assert sum(registry.collect().pool_wait.counts) == 1
+
+
+def test_render_metrics(mocker: MockerFixture, app: Flask):
+    mocker.patch(GET_JOB_COUNTS, return_value=(2, 3))
+    app.test_client().get("/ok")
+
+    with app.app_context():
+        body: str = render_metrics(database.engine)
+
+    assert "# TYPE http_requests_total counter" in body
+    assert 'http_requests_total{endpoint="ok",method="GET",status="200"} 1' in body
+    assert 'http_request_duration_seconds_bucket{endpoint="ok",method="GET",le="+Inf"} 1' in body
+    assert 'http_request_duration_seconds_count{endpoint="ok",method="GET"} 1' in body
+    assert "db_pool_checkout_wait_seconds_count" in body
+    assert 'password_hashing_jobs{state="running"} 2' in body
+    assert 'password_hashing_jobs{state="queued"} 3' in body
@@ -0,0 +1,148 @@
+import runpy
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from flask import Flask
+from pytest_mock import MockerFixture
+
+from app import password_hashing
+from app.exceptions.exceptions import ServiceUnavailableException
+
+
+@pytest.fixture
+def pooled_app() -> Iterator[Flask]:
+    app = Flask(__name__)
+    app.config["BCRYPT_ROUNDS"] = 4
+    app.config["PASSWORD_HASHING_POOL_SIZE"] = 1
+    app.config["PASSWORD_HASHING_QUEUE_LIMIT"] = 0
+
+    password_hashing.init_password_hashing(app)
+
+    yield app
+
+    password_hashing.shutdown_password_hashing()
+    password_hashing._rounds = password_hashing.DEFAULT_ROUNDS
+
+
+def test_hash_and_check_password_inline():
+    hashed_password: str = password_hashing.hash_password("password123")
+
+    assert hashed_password != "password123"
+    assert password_hashing.check_password("password123", hashed_password)
+    assert not password_hashing.check_password("password124", hashed_password)
+
+
+def test_hash_and_check_password_on_pool(pooled_app: Flask):
+    hashed_password: str = password_hashing.hash_password("password123")
+
+    assert password_hashing.check_password("password123", hashed_password)
+    assert not password_hashing.check_password("password124", hashed_password)
+
+
+def test_saturated_pool_rejects_immediately(mocker: MockerFixture, pooled_app: Flask):
+    mocker.patch.object(password_hashing, "_slots", threading.BoundedSemaphore(1))
+    password_hashing._slots.acquire()
+    mock_submit = mocker.patch.object(password_hashing._executor, "submit")
+
+    with pytest.raises(ServiceUnavailableException):
+        password_hashing.hash_password("password123")
+
+    mock_submit.assert_not_called()
+
+
+def test_pool_is_replaced_after_a_worker_died(pooled_app: Flask):
+    hashed_password: str = password_hashing.hash_password("password123")
+    broken_executor: ProcessPoolExecutor = password_hashing._executor
+
+    for process in list(broken_executor._processes.values()):
+        process.kill()
+        process.join()
+
+    assert password_hashing.check_password("password123", hashed_password)
+    assert password_hashing.check_password("password123", hashed_password)
+    assert password_hashing._executor is not broken_executor
+    assert password_hashing._slots.acquire(blocking=False)
+
+
+def test_pool_broken_twice_rejects_the_job(mocker: MockerFixture, pooled_app: Flask):
+    mocker.patch.object(password_hashing, "_submit", side_effect=BrokenProcessPool())
+    replace = mocker.spy(password_hashing, "_replace_broken_executor")
+
+    with pytest.raises(ServiceUnavailableException):
+        password_hashing.hash_password("password123")
+
+    replace.assert_called_once()
+    assert password_hashing._slots.acquire(blocking=False)
+
+
+def test_slot_is_released_after_job(pooled_app: Flask):
+    for _ in range(3):
+        password_hashing.hash_password("password123")
+
+    assert password_hashing._slots.acquire(blocking=False)
+
+
+def test_get_job_counts(mocker: MockerFixture, pooled_app: Flask):
+    assert password_hashing.get_job_counts() == (0, 0)
+
+    mocker.patch.object(password_hashing, "_pending_jobs", 3)
+
+    assert password_hashing.get_job_counts() == (1, 2)
+
+
+def test_pending_jobs_are_released_after_job(pooled_app: Flask):
+    password_hashing.hash_password("password123")
+
+    assert password_hashing._pending_jobs == 0
+
+
+def test_hash_password_uses_configured_rounds(pooled_app: Flask):
+    hashed_password: str = password_hashing.hash_password("password123")
+
+    assert password_hashing.get_rounds(hashed_password) == 4
+    assert not password_hashing.needs_rehash(hashed_password)
+
+
+def test_needs_rehash_with_different_rounds():
+    hashed_password: str = password_hashing._hash_password("password123", 5)
+
+    assert password_hashing.needs_rehash(hashed_password)
+
+
+def test_invalid_rounds_are_rejected():
+    app = Flask(__name__)
+    app.config["BCRYPT_ROUNDS"] = 3
+    app.config["PASSWORD_HASHING_POOL_SIZE"] = 0
+
+    with pytest.raises(ValueError):
+        password_hashing.init_password_hashing(app)
+
+
+@pytest.mark.parametrize(
+    "target_seconds, expected_rounds",
+    [
+        (0.05, 11),
+        (0.0001, 4),
+        (10.0, 12),
+    ]
+)
+def test_pick_rounds(target_seconds: float, expected_rounds: int):
+    # Simulated host where cost 4 takes 0.2 ms and every round doubles it
+    picked, timings = password_hashing.pick_rounds(target_seconds, 12, lambda rounds: 0.0002 * 2 ** (rounds - 4))
+
+    assert picked == expected_rounds
+    assert min(timings) == 4
+
+
+def test_spawned_workers_do_not_build_the_app(mocker: MockerFixture):
+    create_app = mocker.patch("app.create_app")
+    run_path: Path = Path(password_hashing.__file__).parent / "run.py"
+
+    # What spawn does with the main module of the parent in every worker started by python app/run.py
+    runpy.run_path(str(run_path), run_name="__mp_main__")
+
+    create_app.assert_not_called()
@@ -0,0 +1,90 @@
+from datetime import date, datetime
+from typing import Iterator
+
+import pytest
+from flask import Flask
+
+from app import database, init_database
+from app.models import Category, DailyExecutionCount, ExecutionHistory, HabitTask, User
+from app.models.User import UserRole
+from app.repositories import category_repository, daily_execution_count_repository, execution_history_repository, \
+    habit_task_repository
+
+EXECUTED_AT: datetime = datetime(2025, 1, 1, 8)
+PERIOD: tuple[datetime, datetime] = (datetime(2025, 1, 1), datetime(2025, 1, 2))
+
+
+# Three users with one category, habit task, execution and daily count each: "live" as is, "deleted category"
+# with its category pending purge and "deleted user" pending purge itself
+@pytest.fixture
+def app() -> Iterator[Flask]:
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+    init_database(app)
+
+    with app.app_context():
+        database.create_all()
+
+        for name in ("live", "deleted category", "deleted user"):
+            user: User = User(first_name=name, last_name="Doe", email=f"{name.replace(' ', '.')}@example.com",
+                              hashed_password="hash", role=UserRole.USER)
+            category: Category = Category(user=user, name=name)
+            habit_task: HabitTask = HabitTask(category=category, name=name)
+            database.session.add_all([user, category, habit_task])
+            database.session.flush()
+            database.session.add_all([
+                ExecutionHistory(habit_task_id=habit_task.id, user_id=user.id, executed_at=EXECUTED_AT),
+                DailyExecutionCount(habit_task_id=habit_task.id, user_id=user.id, day=EXECUTED_AT.date(), count=1)
+            ])
+
+            if name == "deleted category":
+                category.deleted_at = EXECUTED_AT
+            elif name == "deleted user":
+                user.deleted_at = EXECUTED_AT
+
+        database.session.commit()
+
+        yield app
+
+        database.drop_all()
+        database.session.remove()
+
+
+def test_listings_only_contain_live_rows(app: Flask):
+    assert [row.name for row in category_repository.get_categories(None, None)] == ["live"]
+    assert [row.name for row in habit_task_repository.get_habit_tasks(None, None, None)] == ["live"]
+    assert [row.user_id for row in execution_history_repository.get_execution_histories(None, None, None,
+                                                                                         None, None)] == [1]
+    assert [row.user_id for row in daily_execution_count_repository.get_daily_execution_counts(None, None, None,
+                                                                                                None, None)] == [1]
+    assert daily_execution_count_repository.get_daily_totals(None, None, date(2025, 1, 1),
+                                                             date(2025, 1, 1)) == [(date(2025, 1, 1), 1)]
+
+
+@pytest.mark.parametrize("user_id", [2, 3])
+def test_filters_do_not_reach_below_pending_rows(app: Flask, user_id: int):
+    assert category_repository.get_categories(user_id, None) == []
+    assert category_repository.get_category_by_id(user_id, None) is None
+    assert habit_task_repository.get_habit_tasks(user_id, None, None) == []
+    assert habit_task_repository.get_habit_tasks(None, user_id, None) == []
+    assert execution_history_repository.get_execution_histories(user_id, None, None, *PERIOD) == []
+    assert execution_history_repository.get_execution_histories(None, user_id, None, None, None) == []
+    assert execution_history_repository.get_execution_histories(None, None, user_id, None, None) == []
+    assert daily_execution_count_repository.get_daily_execution_counts(None, user_id, None, None, None) == []
+    assert daily_execution_count_repository.get_daily_totals(user_id, None, date(2025, 1, 1),
+                                                             date(2025, 1, 1)) == []
+
+
+def test_lookups_by_id_skip_rows_below_pending_rows(app: Flask):
+    # Every user got the rows with their own id, see the fixture
+    for pending_id in (2, 3):
+        assert habit_task_repository.get_habit_task_by_id(pending_id, None) is None
+        assert execution_history_repository.get_execution_history_by_id(pending_id, None) is None
+
+    assert habit_task_repository.get_habit_task_by_id(1, None) is not None
+    assert execution_history_repository.get_execution_history_by_id(1, None) is not None
+
+
+def test_habit_task_owners_skip_tasks_below_pending_rows(app: Flask):
+    # Bulk ingest attaches executions only to the habit tasks found here
+    assert habit_task_repository.get_habit_task_owners({1, 2, 3}) == {1: 1}
@@ -0,0 +1,137 @@
+import threading
+from datetime import datetime
+from typing import Callable, Iterator
+
+import pytest
+from flask import Flask
+from flask.testing import FlaskClient
+from werkzeug.test import TestResponse
+from flask_jwt_extended import create_access_token
+from sqlalchemy import Connection, event
+
+from app import create_app, database
+from app.models import Category, ExecutionHistory, HabitTask, User
+from app.models.User import UserRole
+from app.password_hashing import shutdown_password_hashing
+
+# (method, path, payload) of every write endpoint, against the rows created by the fixture
+WRITE_REQUESTS: list[tuple[str, str, object]] = [
+    ("POST", "/users/", {"first_name": "Jane", "last_name": "Doe", "email": "jane@example.com",
+                         "password": "password123"}),
+    ("PUT", "/users/1", {"first_name": "Renamed"}),
+    ("DELETE", "/users/1", None),
+    ("POST", "/categories/", {"user_id": 1, "name": "Reading"}),
+    ("PUT", "/categories/1", {"name": "Renamed"}),
+    ("DELETE", "/categories/1", None),
+    ("POST", "/habit_tasks/", {"category_id": 1, "name": "Run"}),
+    ("PUT", "/habit_tasks/1", {"category_id": 1, "name": "Renamed"}),
+    ("DELETE", "/habit_tasks/1", None),
+    ("POST", "/execution_histories/", {"habit_task_id": 1, "executed_at": "2025-01-02T08:00:00"}),
+    ("POST", "/execution_histories/bulk", {"execution_histories": [
+        {"habit_task_id": 1, "executed_at": "2025-01-03T08:00:00"},
+        {"habit_task_id": 1, "executed_at": "2025-01-04T08:00:00"}
+    ]}),
+    ("DELETE", "/execution_histories/1", None),
+]
+
+
+@pytest.fixture
+def app() -> Iterator[Flask]:
+    app: Flask = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:", "INDEX_CHECK_ON_STARTUP": False,
+                             "METRICS_ENABLED": False, "SLOW_QUERY_LOG_ENABLED": False,
+                             "PASSWORD_HASHING_POOL_SIZE": 0, "BCRYPT_ROUNDS": 4,
+                             "JWT_SECRET_KEY": "post-commit-queries-test-secret-key"})
+
+    with app.app_context():
+        user: User = User(first_name="John", last_name="Doe", email="john@example.com", hashed_password="hash",
+                          role=UserRole.USER)
+        category: Category = Category(user=user, name="Sport")
+        habit_task: HabitTask = HabitTask(category=category, name="Swim")
+        database.session.add_all([user, category, habit_task])
+        database.session.flush()
+        database.session.add(ExecutionHistory(habit_task_id=habit_task.id, user_id=user.id,
+                                              executed_at=datetime(2025, 1, 1, 8)))
+        database.session.commit()
+
+    yield app
+
+    shutdown_password_hashing()
+
+    with app.app_context():
+        database.drop_all()
+        database.session.remove()
+
+
+@pytest.fixture
+def selects_after_commit(app: Flask) -> Iterator[list[str]]:
+    statements: list[str] = []
+    committed: threading.Event = threading.Event()
+    # Statements of background tasks started by a request are not its own
+    request_thread: int = threading.get_ident()
+
+    def on_commit(_connection: Connection) -> None:
+        if threading.get_ident() == request_thread:
+            committed.set()
+
+    def on_execute(_connection: Connection, _cursor: object, statement: str, *_args: object) -> None:
+        if committed.is_set() and threading.get_ident() == request_thread and \
+                statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    with app.app_context():
+        listeners: list[tuple[str, Callable]] = [("commit", on_commit), ("before_cursor_execute", on_execute)]
+
+        for name, listener in listeners:
+            event.listen(database.engine, name, listener)
+
+        yield statements
+
+        for name, listener in listeners:
+            event.remove(database.engine, name, listener)
+
+
+# Where a created or updated resource is read back, by the first segment of the write path
+READ_PATHS: dict[str, str] = {
+    "users": "/users/id/{id}",
+    "categories": "/categories/{id}",
+    "habit_tasks": "/habit_tasks/{id}",
+    "execution_histories": "/execution_histories/{id}",
+}
+
+
+def _request(app: Flask, method: str, path: str, payload: object, role: UserRole = UserRole.USER) -> TestResponse:
+    with app.app_context():
+        token: str = create_access_token(identity="1", additional_claims={"role": role.value})
+
+    client: FlaskClient = app.test_client()
+
+    return client.open(path, method=method, json=payload, headers={"Authorization": f"Bearer {token}"})
+
+
+@pytest.mark.parametrize("method, path, payload", WRITE_REQUESTS, ids=[f"{m} {p}" for m, p, _ in WRITE_REQUESTS])
+def test_write_endpoints_do_not_reload_after_commit(app: Flask,
+                                                    selects_after_commit: list[str],
+                                                    method: str,
+                                                    path: str,
+                                                    payload: object):
+    response: TestResponse = _request(app, method, path, payload)
+
+    assert response.status_code < 300, response.get_data(as_text=True)
+    assert selects_after_commit == []
+
+
+@pytest.mark.parametrize("method, path, payload", [request for request in WRITE_REQUESTS if request[0] != "DELETE"],
+                         ids=[f"{m} {p}" for m, p, _ in WRITE_REQUESTS if m != "DELETE"])
+def test_write_responses_match_a_later_read(app: Flask, method: str, path: str, payload: object):
+    body: dict = _request(app, method, path, payload).get_json()
+    written: list[dict] = body["created"] if "created" in body else [body]
+    read_path: str = READ_PATHS[path.split("/")[1]]
+
+    assert written
+
+    for resource in written:
+        read: TestResponse = _request(app, "GET", read_path.format(id=resource["id"]), None, UserRole.ADMIN)
+        # Bulk results also carry the payload position of each item
+        resource.pop("index", None)
+
+        assert read.get_json() == resource
@@ -0,0 +1,112 @@
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from flask import Flask, g
+from sqlalchemy import Connection, Row, make_url, text
+from sqlalchemy.engine import URL
+from sqlalchemy.exc import OperationalError
+
+from app import database, init_database
+from app.models import Category, User
+from app.models.User import UserRole
+from app.read_only_database import get_engines, get_read_connection, get_read_only_engine, get_read_only_url
+from app.repositories import category_repository
+
+
+def _create_app(database_uri: str) -> Flask:
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_uri
+    init_database(app)
+
+    with app.app_context():
+        database.create_all()
+
+    return app
+
+
+@pytest.fixture
+def app(tmp_path: Path) -> Iterator[Flask]:
+    app: Flask = _create_app(f"sqlite:///{tmp_path / 'test.db'}")
+
+    with app.app_context():
+        user: User = User(first_name="John", last_name="Doe", email="john@example.com", hashed_password="hash",
+                          role=UserRole.USER)
+        database.session.add(user)
+        database.session.flush()
+        database.session.add(Category(user_id=user.id, name="Sport"))
+        database.session.commit()
+
+    yield app
+
+    with app.app_context():
+        for engine in get_engines():
+            engine.dispose()
+
+
+def test_read_only_url():
+    url: URL = get_read_only_url(make_url("sqlite:////data/app.db"))
+
+    assert url.database == "file:/data/app.db"
+    assert dict(url.query) == {"mode": "ro", "uri": "true"}
+
+    assert get_read_only_url(make_url("sqlite:///:memory:")) is None
+    assert get_read_only_url(make_url("sqlite://")) is None
+    assert get_read_only_url(make_url("sqlite:///file:app.db?mode=ro&uri=true")) is None
+    assert get_read_only_url(make_url("postgresql://localhost/app")) is None
+
+
+def test_listings_are_rows_from_the_read_only_engine(app: Flask):
+    with app.app_context():
+        categories: list[Row] = category_repository.get_categories(None, None)
+
+        assert [category.name for category in categories] == ["Sport"]
+        assert isinstance(categories[0], Row)
+        assert get_read_connection().engine is get_read_only_engine()
+        assert get_read_connection().engine is not database.engine
+        # Nothing was loaded into the session
+        assert len(database.session.identity_map) == 0
+
+
+def test_read_connection_cannot_write(app: Flask):
+    with app.app_context():
+        with pytest.raises(OperationalError, match="readonly"):
+            get_read_connection().execute(text("DELETE FROM categories"))
+
+
+def test_read_connection_sees_committed_writes(app: Flask):
+    with app.app_context():
+        assert len(category_repository.get_categories(None, None)) == 1
+
+        database.session.add(Category(user_id=1, name="Reading"))
+        database.session.commit()
+
+        assert len(category_repository.get_categories(None, None)) == 2
+
+
+def test_read_connection_is_closed_with_the_app_context(app: Flask):
+    with app.app_context():
+        connection: Connection = get_read_connection()
+
+        assert get_read_connection() is connection
+
+    assert connection.closed
+
+
+def test_in_memory_database_reads_through_the_session():
+    app: Flask = _create_app("sqlite:///:memory:")
+
+    with app.app_context():
+        assert get_read_only_engine() is None
+        assert get_read_connection() is database.session.connection()
+        assert "read_connection" not in g
+
+
+def test_read_only_connections_can_be_disabled(tmp_path: Path):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'test.db'}"
+    app.config["READ_ONLY_CONNECTIONS_ENABLED"] = False
+    init_database(app)
+
+    with app.app_context():
+        assert get_read_only_engine() is None
@@ -0,0 +1,85 @@
+import logging
+import re
+
+import pytest
+from flask import Flask
+from sqlalchemy import text
+
+from app import database
+from app.request_metrics import init_request_metrics, measure_serialization, get_request_metrics
+
+SERVER_TIMING_PATTERN: re.Pattern = re.compile(
+    r'^db;dur=[\d.]+;desc="(\d+) queries", serialization;dur=[\d.]+, handler;dur=[\d.]+, total;dur=[\d.]+$'
+)
+
+
+@pytest.fixture
+def app() -> Flask:
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+    app.config["REQUEST_METRICS_ENABLED"] = True
+    app.config["N_PLUS_ONE_THRESHOLD"] = 5
+    database.init_app(app)
+    init_request_metrics(app)
+
+    @app.route("/queries/<int:count>")
+    def run_queries(count: int) -> str:
+        for value in range(count):
+            database.session.execute(text("SELECT :value"), {"value": value})
+
+        with measure_serialization():
+            body: str = str(get_request_metrics().query_count)
+
+        return body
+
+    return app
+
+
+def test_server_timing_header_counts_queries(app: Flask):
+    response = app.test_client().get("/queries/3")
+
+    match = SERVER_TIMING_PATTERN.match(response.headers["Server-Timing"])
+
+    assert match is not None
+    assert match.group(1) == "3"
+    assert response.data == b"3"
+
+
+def test_request_is_logged(app: Flask, caplog: pytest.LogCaptureFixture):
+    with caplog.at_level(logging.INFO, logger=app.logger.name):
+        app.test_client().get("/queries/2")
+
+    assert any("request method=GET path=/queries/2 status=200 queries=2" in record.getMessage()
+               for record in caplog.records)
+
+
+def test_repeated_statement_is_flagged(app: Flask, caplog: pytest.LogCaptureFixture):
+    with caplog.at_level(logging.WARNING, logger=app.logger.name):
+        app.test_client().get("/queries/4")
+
+    assert not any("possible N+1" in record.getMessage() for record in caplog.records)
+
+    with caplog.at_level(logging.WARNING, logger=app.logger.name):
+        app.test_client().get("/queries/5")
+
+    assert any("possible N+1" in record.getMessage() and "executions=5" in record.getMessage()
+               for record in caplog.records)
+
+
+def test_queries_outside_requests_are_not_recorded(app: Flask):
+    with app.app_context():
+        database.session.execute(text("SELECT 1"))
+
+        assert get_request_metrics() is None
+
+
+def test_disabled_request_metrics_add_no_header():
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+    app.config["REQUEST_METRICS_ENABLED"] = False
+    database.init_app(app)
+    init_request_metrics(app)
+
+    app.add_url_rule("/", view_func=lambda: "ok")
+
+    assert "Server-Timing" not in app.test_client().get("/").headers
@@ -0,0 +1,73 @@
+from typing import Iterator
+
+import pytest
+from flask import Flask
+from sqlalchemy import Connection, text
+
+from app import database
+from app.models.Category import category_search_index
+from app.search_index import create_missing_search_indexes, get_match_expression, get_short_term
+
+
+@pytest.fixture
+def connection() -> Iterator[Connection]:
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+    database.init_app(app)
+
+    with app.app_context():
+        database.create_all()
+
+        with database.engine.connect() as connection:
+            connection.execute(text("INSERT INTO users (id, first_name, last_name, email, hashed_password, is_active, "
+                                    "role, created_at, updated_at) VALUES (1, 'John', 'Doe', 'john@doe.com', '-', 1, "
+                                    "'USER', '2024-01-01', '2024-01-01')"))
+            connection.execute(text("INSERT INTO categories (id, user_id, name, description, created_at, updated_at) "
+                                    "VALUES (1, 1, 'Running', 'Outdoor', '2024-01-01', '2024-01-01'), "
+                                    "(2, 1, 'Reading', 'Books about running', '2024-01-01', '2024-01-01')"))
+
+            yield connection
+
+
+def search_categories(connection: Connection, term: str) -> list[int]:
+    return list(connection.scalars(text("SELECT rowid FROM categories_search WHERE categories_search MATCH :term "
+                                        "ORDER BY bm25(categories_search, 10.0, 1.0)"),
+                                   {"term": get_match_expression(term)}))
+
+
+def test_get_match_expression():
+    assert get_match_expression(None) is None
+    assert get_match_expression("ab") is None
+    assert get_match_expression("run") == '"run"'
+    assert get_match_expression('a"b') == '"a""b"'
+
+
+def test_get_short_term():
+    assert get_short_term(None) is None
+    assert get_short_term("ab") == "ab"
+    assert get_short_term("run") is None
+
+
+def test_search_index_ranks_name_matches_first(connection: Connection):
+    assert search_categories(connection, "RUN") == [1, 2]
+
+
+def test_search_index_follows_updates_and_deletes(connection: Connection):
+    connection.execute(text("UPDATE categories SET name = 'Walking', description = NULL WHERE id = 1"))
+
+    assert search_categories(connection, "run") == [2]
+    assert search_categories(connection, "walk") == [1]
+
+    connection.execute(text("DELETE FROM categories WHERE id = 2"))
+
+    assert search_categories(connection, "run") == []
+
+
+def test_create_missing_search_indexes_indexes_existing_rows(connection: Connection):
+    connection.execute(text(f"DROP TABLE {category_search_index.name}"))
+
+    created: list[str] = create_missing_search_indexes(connection)
+
+    assert created == [category_search_index.name]
+    assert search_categories(connection, "run") == [1, 2]
+    assert create_missing_search_indexes(connection) == []
@@ -0,0 +1,89 @@
+from datetime import date, datetime
+
+import pytest
+from flask import Flask
+from pytest_mock import MockerFixture
+from sqlalchemy import Connection, func, select, text
+
+from app import database
+from app.models import Category, ExecutionHistory, HabitTask, User
+from app.seed_data import SeedCounts, SeedOptions, parse_options, seed
+
+HASH_PASSWORD = "app.seed_data.hash_password"
+
+OPTIONS: SeedOptions = SeedOptions(users=20, execution_histories=1000, days=10, end_date=date(2024, 1, 11),
+                                   chunk_size=64)
+
+
+@pytest.fixture
+def app(mocker: MockerFixture) -> Flask:
+    mocker.patch(HASH_PASSWORD, return_value="hashed")
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+    database.init_app(app)
+
+    with app.app_context():
+        database.create_all()
+
+    return app
+
+
+def _dump(connection: Connection) -> list[tuple]:
+    return connection.execute(
+        select(ExecutionHistory.id, ExecutionHistory.habit_task_id, ExecutionHistory.user_id,
+               ExecutionHistory.executed_at, HabitTask.name, Category.user_id, User.email)
+        .join(HabitTask, HabitTask.id == ExecutionHistory.habit_task_id)
+        .join(Category, Category.id == HabitTask.category_id)
+        .join(User, User.id == ExecutionHistory.user_id)
+        .order_by(ExecutionHistory.id)
+    ).all()
+
+
+def test_seed_inserts_requested_rows(app: Flask):
+    with app.app_context(), database.engine.begin() as connection:
+        counts: SeedCounts = seed(connection, OPTIONS)
+        rows: list[tuple] = _dump(connection)
+
+        assert counts.users == 20
+        assert counts.execution_histories == 1000
+        assert connection.scalar(select(func.count()).select_from(HabitTask)) == counts.habit_tasks
+        assert len(rows) == 1000
+        # Owner of the execution is the owner of the category of its habit task
+        assert all(row.user_id == row[5] for row in rows)
+        assert all(datetime(2024, 1, 1) <= row.executed_at < datetime(2024, 1, 11) for row in rows)
+        # Search indexes are rebuilt after the load and their triggers restored
+        assert connection.scalar(text("SELECT count(*) FROM habit_tasks_search")) == counts.habit_tasks
+        assert connection.scalar(text("SELECT count(*) FROM sqlite_master WHERE type = 'trigger'")) == 9
+
+
+def test_seed_is_deterministic(app: Flask):
+    with app.app_context(), database.engine.begin() as connection:
+        seed(connection, OPTIONS)
+        first: list[tuple] = _dump(connection)
+
+        for table in ("execution_histories", "habit_tasks", "categories", "users"):
+            connection.execute(text(f"DELETE FROM {table}"))
+
+        seed(connection, OPTIONS)
+
+        # Ids continue after the rows of the first run, everything else is the same
+        assert [row[3:5] for row in _dump(connection)] == [row[3:5] for row in first]
+
+
+def test_activity_is_skewed_towards_few_users(app: Flask):
+    with app.app_context(), database.engine.begin() as connection:
+        seed(connection, SeedOptions(users=200, execution_histories=20_000, end_date=date(2024, 1, 1)))
+
+        per_user: list[int] = connection.scalars(
+            select(func.count()).select_from(ExecutionHistory).group_by(ExecutionHistory.user_id)
+            .order_by(func.count().desc())
+        ).all()
+
+    assert sum(per_user[:40]) > sum(per_user) / 2
+
+
+def test_parse_options():
+    options: SeedOptions = parse_options(["--users", "5", "--execution-histories", "100", "--end-date", "2024-02-01"])
+
+    assert options == SeedOptions(users=5, execution_histories=100, end_date=date(2024, 2, 1))
@@ -0,0 +1,101 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+from pytest_mock import MockerFixture
+from sqlalchemy import Engine, create_engine, event
+
+from app.dtos import DatabaseDiagnosticsReadDTO, SlowQueryReadDTO
+from app.models.User import UserRole
+from app.services.admin_service import clear_slow_queries, get_database_diagnostics, get_slow_queries
+from app.slow_queries import SlowQuery
+from app.sqlite_pragmas import DEFAULT_PRAGMAS, PragmaReport, create_pragma_listener
+
+GET_SLOW_QUERIES = "app.slow_queries.get_slow_queries"
+CLEAR_SLOW_QUERIES = "app.slow_queries.clear_slow_queries"
+CURRENT_APP = "app.services.admin_service.current_app"
+DATABASE_SESSION = "app.services.admin_service.database.session"
+GET_PRAGMA_REPORT = "app.services.admin_service.get_pragma_report"
+READ_PRAGMAS = "app.services.admin_service.read_pragmas"
+
+
+def test_get_slow_queries_by_admin(mocker: MockerFixture):
+    mocker.patch(GET_SLOW_QUERIES, return_value=[SlowQuery(
+        recorded_at=datetime(2024, 1, 1),
+        duration_ms=150.0,
+        statement="SELECT * FROM users WHERE id = ?",
+        parameters=["<int>"],
+        caller="app.repositories.user_repository.get_user_by_id",
+        query_plan=["SEARCH users USING INTEGER PRIMARY KEY (rowid=?)"]
+    )])
+
+    result: list[SlowQueryReadDTO] = get_slow_queries(UserRole.ADMIN)
+
+    assert len(result) == 1
+    assert isinstance(result[0], SlowQueryReadDTO)
+    assert result[0].caller == "app.repositories.user_repository.get_user_by_id"
+
+
+def test_get_slow_queries_by_user(mocker: MockerFixture):
+    mocker.patch(GET_SLOW_QUERIES, return_value=[])
+
+    with pytest.raises(PermissionError):
+        get_slow_queries(UserRole.USER)
+
+
+def test_clear_slow_queries_by_admin(mocker: MockerFixture):
+    clear = mocker.patch(CLEAR_SLOW_QUERIES)
+
+    clear_slow_queries(UserRole.ADMIN)
+
+    clear.assert_called_once()
+
+
+def test_clear_slow_queries_by_user(mocker: MockerFixture):
+    clear = mocker.patch(CLEAR_SLOW_QUERIES)
+
+    with pytest.raises(PermissionError):
+        clear_slow_queries(UserRole.USER)
+
+    clear.assert_not_called()
+
+
+def test_get_database_diagnostics_by_admin(mocker: MockerFixture):
+    mocker.patch(CURRENT_APP, MagicMock(config={"SQLITE_PRAGMAS": {"journal_mode": "WAL", "busy_timeout": 5000}}))
+    mocker.patch(DATABASE_SESSION)
+    mocker.patch(GET_PRAGMA_REPORT, return_value=PragmaReport(
+        applied={"journal_mode": "delete", "busy_timeout": 5000},
+        mismatches=["journal_mode=delete (configured WAL)"]
+    ))
+    mocker.patch(READ_PRAGMAS, return_value={"page_size": 4096, "page_count": 10, "freelist_count": 0})
+
+    result: DatabaseDiagnosticsReadDTO = get_database_diagnostics(UserRole.ADMIN)
+
+    assert result.pragmas == {"journal_mode": "delete", "busy_timeout": 5000}
+    assert result.mismatches == ["journal_mode=delete (configured WAL)"]
+    assert result.page_count == 10
+
+
+def test_get_database_diagnostics_of_in_memory_database(mocker: MockerFixture):
+    engine: Engine = create_engine("sqlite:///:memory:")
+    event.listen(engine, "connect", create_pragma_listener(DEFAULT_PRAGMAS))
+    mocker.patch(CURRENT_APP, MagicMock(config={"SQLITE_PRAGMAS": DEFAULT_PRAGMAS}))
+
+    with engine.connect() as connection:
+        mocker.patch(DATABASE_SESSION, MagicMock(connection=MagicMock(return_value=connection)))
+
+        result: DatabaseDiagnosticsReadDTO = get_database_diagnostics(UserRole.ADMIN)
+
+    # SQLite reports no mmap_size for in-memory databases
+    assert result.pragmas["mmap_size"] is None
+    assert result.pragmas["journal_mode"] == "memory"
+    assert result.mismatches == []
+
+
+def test_get_database_diagnostics_by_user(mocker: MockerFixture):
+    get_pragma_report = mocker.patch(GET_PRAGMA_REPORT)
+
+    with pytest.raises(PermissionError):
+        get_database_diagnostics(UserRole.USER)
+
+    get_pragma_report.assert_not_called()
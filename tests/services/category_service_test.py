@@ -9,14 +9,18 @@ from app.exceptions.exceptions import EntityNotFoundException, EntityPersistence
 from app.models import Category
 from app.models.User import UserRole
 from app.services.category_service import get_categories, convert_dto_to_model, get_category_by_id, create_category, \
-    update_category, delete_category
+    update_category, delete_category, stream_categories
+from app.services.purge_service import purge_category
 
 DATABASE_SESSION = "app.services.category_service.database.session"
 DATABASE_SESSION_BEGIN = "app.services.category_service.database.session.begin"
 GET_CATEGORIES = "app.repositories.category_repository.get_categories"
+ITER_CATEGORIES = "app.repositories.category_repository.iter_categories"
 GET_CATEGORY_ENTITY = "app.services.category_service.get_category_entity"
 CATEGORY_REPO_CREATE = "app.repositories.category_repository.create_category"
 CATEGORY_REPO_DELETE = "app.repositories.category_repository.delete_category"
+CATEGORY_REPO_MARK_DELETED = "app.repositories.category_repository.mark_category_deleted"
+RUN_IN_BACKGROUND = "app.services.category_service.run_in_background"
 
 
 def test_get_categories_by_self(mocker: MockerFixture, fake_category_model: Category):
@@ -138,7 +142,7 @@ def test_get_categories_returns_list_of_category_read_dto(mocker: MockerFixture,
 
 
 def test_get_category_by_id_by_self(mocker: MockerFixture, fake_category_model: Category):
-    mocker.patch(GET_CATEGORY_ENTITY, return_value=fake_category_model)
+    mock_get_category_entity = mocker.patch(GET_CATEGORY_ENTITY, return_value=fake_category_model)
 
     result: CategoryReadDTO = get_category_by_id(
         requester_id=1,
@@ -146,11 +150,12 @@ def test_get_category_by_id_by_self(mocker: MockerFixture, fake_category_model:
         category_id=1
     )
 
+    mock_get_category_entity.assert_called_once_with(1, 1)
     assert isinstance(result, CategoryReadDTO)
 
 
-def test_get_category_by_id_by_different_user(mocker: MockerFixture, fake_category_model: Category):
-    mocker.patch(GET_CATEGORY_ENTITY, return_value=fake_category_model)
+def test_get_category_by_id_owned_by_different_user(mocker: MockerFixture):
+    mocker.patch(GET_CATEGORY_ENTITY, side_effect=EntityNotFoundException("Category"))
 
     with pytest.raises(PermissionError):
         get_category_by_id(
@@ -378,6 +383,44 @@ def test_delete_category_calls_repository(mocker: MockerFixture, fake_category_m
     mock_repo.assert_called_once_with(session_mock, fake_category_model)
 
 
+def test_delete_category_asynchronously_marks_and_schedules_purge(mocker: MockerFixture,
+                                                                 fake_category_model: Category):
+    session_mock = mocker.patch(DATABASE_SESSION, MagicMock())
+    mocker.patch(GET_CATEGORY_ENTITY, return_value=fake_category_model)
+    mock_delete = mocker.patch(CATEGORY_REPO_DELETE)
+    mock_mark_deleted = mocker.patch(CATEGORY_REPO_MARK_DELETED, return_value=fake_category_model)
+    mock_run_in_background = mocker.patch(RUN_IN_BACKGROUND)
+
+    result: CategoryReadDTO = delete_category(
+        requester_id=fake_category_model.user_id,
+        requester_role=UserRole.USER,
+        category_id=fake_category_model.id,
+        asynchronous="true"
+    )
+
+    assert isinstance(result, CategoryReadDTO)
+    mock_mark_deleted.assert_called_once_with(session_mock, fake_category_model)
+    mock_delete.assert_not_called()
+    mock_run_in_background.assert_called_once_with(purge_category, fake_category_model.id)
+
+
+def test_delete_category_asynchronously_forbidden_does_not_schedule_purge(mocker: MockerFixture,
+                                                                          fake_category_model: Category):
+    mocker.patch(DATABASE_SESSION, MagicMock())
+    mocker.patch(GET_CATEGORY_ENTITY, side_effect=EntityNotFoundException("Category"))
+    mock_run_in_background = mocker.patch(RUN_IN_BACKGROUND)
+
+    with pytest.raises(PermissionError):
+        delete_category(
+            requester_id=999,
+            requester_role=UserRole.USER,
+            category_id=fake_category_model.id,
+            asynchronous="true"
+        )
+
+    mock_run_in_background.assert_not_called()
+
+
 def test_delete_category_does_not_call_repository_if_wrong(mocker: MockerFixture, fake_category_model: Category):
     mocker.patch(DATABASE_SESSION, MagicMock())
     mocker.patch(GET_CATEGORY_ENTITY, side_effect=EntityNotFoundException("Category"))
@@ -410,3 +453,22 @@ def test_convert_model_to_dto(fake_category_model: Category):
     assert category_dto.description == fake_category_model.description
     assert category_dto.created_at == fake_category_model.created_at
     assert category_dto.updated_at == fake_category_model.updated_at
+
+
+def test_stream_categories_by_different_user_raises_before_iteration(mocker: MockerFixture):
+    mock_iter_categories = mocker.patch(ITER_CATEGORIES, return_value=iter([]))
+
+    with pytest.raises(PermissionError):
+        stream_categories(1, UserRole.USER, "2", None)
+
+    mock_iter_categories.assert_not_called()
+
+
+def test_stream_categories_by_self(mocker: MockerFixture, fake_category_model: Category):
+    mock_iter_categories = mocker.patch(ITER_CATEGORIES, return_value=iter([fake_category_model] * 3))
+
+    result: list[CategoryReadDTO] = list(stream_categories(1, UserRole.USER, None, "name"))
+
+    mock_iter_categories.assert_called_once_with(1, "name")
+    assert len(result) == 3
+    assert all(isinstance(category, CategoryReadDTO) for category in result)
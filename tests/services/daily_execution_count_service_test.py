@@ -0,0 +1,164 @@
+from datetime import date, datetime, timezone
+from unittest.mock import MagicMock
+
+import pytest
+from pytest_mock import MockerFixture
+
+from app.dtos import DailyExecutionCountReadDTO, ExecutionHeatmapReadDTO
+from app.models import DailyExecutionCount
+from app.models.User import UserRole
+from app.services.daily_execution_count_service import get_daily_execution_counts, record_execution, \
+    record_executions, record_deletion, get_execution_heatmap
+
+DATABASE_SESSION = "app.services.daily_execution_count_service.database.session"
+GET_DAILY_EXECUTION_COUNTS = "app.repositories.daily_execution_count_repository.get_daily_execution_counts"
+INCREMENT_DAILY_EXECUTION_COUNTS = "app.repositories.daily_execution_count_repository.increment_daily_execution_counts"
+DECREMENT_DAILY_EXECUTION_COUNT = "app.repositories.daily_execution_count_repository.decrement_daily_execution_count"
+GET_DAILY_TOTALS = "app.repositories.daily_execution_count_repository.get_daily_totals"
+GET_UTC_TIME = "app.services.daily_execution_count_service.get_utc_time"
+
+
+@pytest.fixture
+def fake_daily_execution_count_model() -> DailyExecutionCount:
+    return DailyExecutionCount(habit_task_id=1, user_id=1, day=date(2020, 1, 1), count=3)
+
+
+def test_get_daily_execution_counts_by_self(mocker: MockerFixture,
+                                            fake_daily_execution_count_model: DailyExecutionCount):
+    mock_get = mocker.patch(GET_DAILY_EXECUTION_COUNTS, return_value=[fake_daily_execution_count_model])
+
+    result: list[DailyExecutionCountReadDTO] = get_daily_execution_counts(1, UserRole.USER, None, None, None,
+                                                                          "2020-01-01", "2020-01-31")
+
+    mock_get.assert_called_once_with(1, None, None, date(2020, 1, 1), date(2020, 1, 31))
+    assert result == [DailyExecutionCountReadDTO(habit_task_id=1, day=date(2020, 1, 1), count=3)]
+
+
+def test_get_daily_execution_counts_by_admin(mocker: MockerFixture):
+    mock_get = mocker.patch(GET_DAILY_EXECUTION_COUNTS, return_value=[])
+
+    get_daily_execution_counts(999, UserRole.ADMIN, None, "2", None, None, None)
+
+    mock_get.assert_called_once_with(None, 2, None, None, None)
+
+
+def test_get_daily_execution_counts_by_different_user(mocker: MockerFixture):
+    mock_get = mocker.patch(GET_DAILY_EXECUTION_COUNTS)
+
+    with pytest.raises(PermissionError):
+        get_daily_execution_counts(1, UserRole.USER, "2", None, None, None, None)
+
+    mock_get.assert_not_called()
+
+
+def test_get_daily_execution_counts_invalid_date(mocker: MockerFixture):
+    mocker.patch(GET_DAILY_EXECUTION_COUNTS)
+
+    with pytest.raises(ValueError):
+        get_daily_execution_counts(1, UserRole.USER, None, None, None, "2020-01-32", None)
+
+
+def test_record_execution(mocker: MockerFixture):
+    session_mock = mocker.patch(DATABASE_SESSION, MagicMock())
+    mock_increment = mocker.patch(INCREMENT_DAILY_EXECUTION_COUNTS)
+
+    record_execution(1, 2, datetime(2020, 1, 1, 8, 30))
+
+    mock_increment.assert_called_once_with(session_mock, [
+        {"habit_task_id": 1, "user_id": 2, "day": date(2020, 1, 1), "count": 1}
+    ])
+
+
+def test_record_executions_aggregates_by_habit_task_and_day(mocker: MockerFixture):
+    mocker.patch(DATABASE_SESSION, MagicMock())
+    mock_increment = mocker.patch(INCREMENT_DAILY_EXECUTION_COUNTS)
+
+    record_executions([
+        (1, 2, datetime(2020, 1, 1, 8)),
+        (1, 2, datetime(2020, 1, 1, 20)),
+        (1, 2, datetime(2020, 1, 2, 8)),
+        (3, 2, datetime(2020, 1, 1, 8)),
+    ])
+
+    rows: list[dict] = mock_increment.call_args.args[1]
+    assert sorted((row["habit_task_id"], row["day"], row["count"]) for row in rows) == [
+        (1, date(2020, 1, 1), 2),
+        (1, date(2020, 1, 2), 1),
+        (3, date(2020, 1, 1), 1),
+    ]
+
+
+def test_record_executions_without_executions(mocker: MockerFixture):
+    mock_increment = mocker.patch(INCREMENT_DAILY_EXECUTION_COUNTS)
+
+    record_executions([])
+
+    mock_increment.assert_not_called()
+
+
+def test_record_deletion(mocker: MockerFixture):
+    session_mock = mocker.patch(DATABASE_SESSION, MagicMock())
+    mock_decrement = mocker.patch(DECREMENT_DAILY_EXECUTION_COUNT)
+
+    record_deletion(1, datetime(2020, 1, 1, 8, 30))
+
+    mock_decrement.assert_called_once_with(session_mock, 1, date(2020, 1, 1))
+
+
+def test_get_execution_heatmap(mocker: MockerFixture):
+    mock_get_totals = mocker.patch(GET_DAILY_TOTALS, return_value=[(date(2024, 1, 1), 2), (date(2024, 12, 31), 5)])
+
+    result: ExecutionHeatmapReadDTO = get_execution_heatmap(1, UserRole.USER, None, "3", "2024")
+
+    mock_get_totals.assert_called_once_with(1, 3, date(2024, 1, 1), date(2024, 12, 31))
+    assert result.year == 2024
+    assert len(result.counts) == 366
+    assert result.counts[0] == 2
+    assert result.counts[365] == 5
+    assert sum(result.counts) == 7
+
+
+def test_get_execution_heatmap_non_leap_year(mocker: MockerFixture):
+    mocker.patch(GET_DAILY_TOTALS, return_value=[(date(2023, 3, 1), 1), (date(2023, 12, 31), 4)])
+
+    result: ExecutionHeatmapReadDTO = get_execution_heatmap(999, UserRole.ADMIN, "1", None, "2023")
+
+    assert len(result.counts) == 366
+    assert result.counts[59] == 1
+    assert result.counts[364] == 4
+    assert result.counts[365] == 0
+
+
+def test_get_execution_heatmap_defaults_to_current_year(mocker: MockerFixture):
+    mocker.patch(GET_UTC_TIME, return_value=datetime(2022, 6, 1, tzinfo=timezone.utc))
+    mock_get_totals = mocker.patch(GET_DAILY_TOTALS, return_value=[])
+
+    result: ExecutionHeatmapReadDTO = get_execution_heatmap(1, UserRole.USER, None, None, None)
+
+    mock_get_totals.assert_called_once_with(1, None, date(2022, 1, 1), date(2022, 12, 31))
+    assert result.year == 2022
+    assert result.counts == [0] * 366
+
+
+def test_get_execution_heatmap_by_different_user(mocker: MockerFixture):
+    mock_get_totals = mocker.patch(GET_DAILY_TOTALS)
+
+    with pytest.raises(PermissionError):
+        get_execution_heatmap(1, UserRole.USER, "2", None, "2024")
+
+    mock_get_totals.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "year",
+    [
+        "0",
+        "10000",
+        "last"
+    ]
+)
+def test_get_execution_heatmap_invalid_year(mocker: MockerFixture, year: str):
+    mocker.patch(GET_DAILY_TOTALS)
+
+    with pytest.raises(ValueError):
+        get_execution_heatmap(1, UserRole.USER, None, None, year)
@@ -4,21 +4,50 @@ import pytest
 from pytest_mock import MockerFixture
 from sqlalchemy.exc import IntegrityError
 
-from app.dtos import ExecutionHistoryReadDTO, ExecutionHistoryCreateDTO
+from app.dtos import ExecutionHistoryReadDTO, ExecutionHistoryCreateDTO, ExecutionHistoryBulkResultDTO
 from app.exceptions.exceptions import EntityNotFoundException, EntityPersistenceException
 from app.models import ExecutionHistory, HabitTask
 from app.models.User import UserRole
 from app.services.execution_history_service import get_execution_histories, get_execution_history_by_id, \
-    create_execution_history, delete_execution_history, convert_dto_to_model
+    create_execution_history, delete_execution_history, convert_dto_to_model, get_execution_histories_page, \
+    encode_cursor, decode_cursor, stream_execution_histories, create_execution_histories
 from app.utils import str_to_datetime_or_none
 
 DATABASE_SESSION = "app.services.habit_task_service.database.session"
 DATABASE_SESSION_BEGIN = "app.services.habit_task_service.database.session.begin"
 GET_EXECUTION_HISTORIES = "app.repositories.execution_history_repository.get_execution_histories"
+ITER_EXECUTION_HISTORIES = "app.repositories.execution_history_repository.iter_execution_histories"
+GET_EXECUTION_HISTORIES_PAGE = "app.repositories.execution_history_repository.get_execution_histories_page"
 GET_EXECUTION_HISTORY_ENTITY = "app.services.execution_history_service.get_execution_history_entity"
 EXECUTION_HISTORY_REPO_CREATE = "app.repositories.execution_history_repository.create_execution_history"
 EXECUTION_HISTORY_REPO_DELETE = "app.repositories.execution_history_repository.delete_execution_history"
 GET_HABIT_TASK_ENTITY = "app.services.execution_history_service.get_habit_task_entity"
+GET_HABIT_TASK_OWNERS = "app.repositories.habit_task_repository.get_habit_task_owners"
+EXECUTION_HISTORY_REPO_BULK_CREATE = "app.repositories.execution_history_repository.create_execution_histories"
+RECORD_STREAK_EXECUTION = "app.services.habit_task_streak_service.record_execution"
+RECORD_STREAK_EXECUTIONS = "app.services.habit_task_streak_service.record_executions"
+RECORD_STREAK_DELETION = "app.services.habit_task_streak_service.record_deletion"
+RECORD_DAILY_EXECUTION = "app.services.daily_execution_count_service.record_execution"
+RECORD_DAILY_EXECUTIONS = "app.services.daily_execution_count_service.record_executions"
+RECORD_DAILY_DELETION = "app.services.daily_execution_count_service.record_deletion"
+
+
+@pytest.fixture(autouse=True)
+def mock_streak_updates(mocker: MockerFixture) -> dict[str, MagicMock]:
+    return {
+        "execution": mocker.patch(RECORD_STREAK_EXECUTION),
+        "executions": mocker.patch(RECORD_STREAK_EXECUTIONS),
+        "deletion": mocker.patch(RECORD_STREAK_DELETION)
+    }
+
+
+@pytest.fixture(autouse=True)
+def mock_daily_count_updates(mocker: MockerFixture) -> dict[str, MagicMock]:
+    return {
+        "execution": mocker.patch(RECORD_DAILY_EXECUTION),
+        "executions": mocker.patch(RECORD_DAILY_EXECUTIONS),
+        "deletion": mocker.patch(RECORD_DAILY_DELETION)
+    }
 
 
 def test_get_execution_histories_by_self(mocker: MockerFixture, fake_execution_history_model: ExecutionHistory):
@@ -167,8 +196,146 @@ def test_get_execution_histories_returns_list_of_execution_history_read_dto(mock
         assert isinstance(execution_history, ExecutionHistoryReadDTO)
 
 
+def test_get_execution_histories_page_returns_next_cursor_when_more_rows(mocker: MockerFixture,
+                                                                       fake_execution_history_model: ExecutionHistory):
+    mocker.patch(GET_EXECUTION_HISTORIES_PAGE, return_value=[fake_execution_history_model] * 3)
+
+    result, next_cursor = get_execution_histories_page(
+        requester_id=1,
+        requester_role=UserRole.USER,
+        user_id=None,
+        category_id=None,
+        habit_task_id=None,
+        start_datetime=None,
+        end_datetime=None,
+        cursor=None,
+        limit="2"
+    )
+
+    assert len(result) == 2
+    assert decode_cursor(next_cursor) == (fake_execution_history_model.executed_at, fake_execution_history_model.id)
+
+
+def test_get_execution_histories_page_returns_no_cursor_on_last_page(mocker: MockerFixture,
+                                                                     fake_execution_history_model: ExecutionHistory):
+    mocker.patch(GET_EXECUTION_HISTORIES_PAGE, return_value=[fake_execution_history_model])
+
+    result, next_cursor = get_execution_histories_page(
+        requester_id=1,
+        requester_role=UserRole.USER,
+        user_id=None,
+        category_id=None,
+        habit_task_id=None,
+        start_datetime=None,
+        end_datetime=None,
+        cursor=None,
+        limit="2"
+    )
+
+    assert len(result) == 1
+    assert next_cursor is None
+
+
+def test_get_execution_histories_page_calls_repository_with_decoded_cursor(mocker: MockerFixture):
+    mock_get_page = mocker.patch(GET_EXECUTION_HISTORIES_PAGE, return_value=[])
+    executed_at = str_to_datetime_or_none("2020-01-01 00:00:00")
+
+    get_execution_histories_page(
+        requester_id=999,
+        requester_role=UserRole.ADMIN,
+        user_id="1",
+        category_id=None,
+        habit_task_id=None,
+        start_datetime=None,
+        end_datetime=None,
+        cursor=encode_cursor(executed_at, 10),
+        limit=None
+    )
+
+    mock_get_page.assert_called_once_with(1, None, None, None, None, (executed_at, 10), 101)
+
+
+def test_get_execution_histories_page_by_different_user(mocker: MockerFixture):
+    mock_get_page = mocker.patch(GET_EXECUTION_HISTORIES_PAGE, return_value=[])
+
+    with pytest.raises(PermissionError):
+        get_execution_histories_page(
+            requester_id=999,
+            requester_role=UserRole.USER,
+            user_id="1",
+            category_id=None,
+            habit_task_id=None,
+            start_datetime=None,
+            end_datetime=None,
+            cursor=None,
+            limit="10"
+        )
+
+    mock_get_page.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "limit",
+    [
+        "0",
+        "-1",
+        "1001"
+    ]
+)
+def test_get_execution_histories_page_rejects_invalid_limit(mocker: MockerFixture, limit: str):
+    mocker.patch(GET_EXECUTION_HISTORIES_PAGE, return_value=[])
+
+    with pytest.raises(ValueError):
+        get_execution_histories_page(
+            requester_id=1,
+            requester_role=UserRole.USER,
+            user_id=None,
+            category_id=None,
+            habit_task_id=None,
+            start_datetime=None,
+            end_datetime=None,
+            cursor=None,
+            limit=limit
+        )
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor",
+        "bm90IGpzb24=",
+        "WzEsIDIsIDNd"
+    ]
+)
+def test_decode_cursor_rejects_invalid_cursor(cursor: str):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_stream_execution_histories_by_different_user_raises_before_iteration(mocker: MockerFixture):
+    mock_iter_execution_histories = mocker.patch(ITER_EXECUTION_HISTORIES, return_value=iter([]))
+
+    with pytest.raises(PermissionError):
+        stream_execution_histories(999, UserRole.USER, "1", None, None, None, None)
+
+    mock_iter_execution_histories.assert_not_called()
+
+
+def test_stream_execution_histories_by_self(mocker: MockerFixture, fake_execution_history_model: ExecutionHistory):
+    mock_iter_execution_histories = mocker.patch(ITER_EXECUTION_HISTORIES,
+                                                 return_value=iter([fake_execution_history_model] * 3))
+
+    result: list[ExecutionHistoryReadDTO] = list(stream_execution_histories(1, UserRole.USER, None, None, None,
+                                                                            None, None))
+
+    mock_iter_execution_histories.assert_called_once_with(1, None, None, None, None)
+    assert len(result) == 3
+    assert all(isinstance(execution_history, ExecutionHistoryReadDTO) for execution_history in result)
+
+
 def test_get_execution_history_by_id_by_self(mocker: MockerFixture, fake_execution_history_model: ExecutionHistory):
-    mocker.patch(GET_EXECUTION_HISTORY_ENTITY, return_value=fake_execution_history_model)
+    mock_get_execution_history_entity = mocker.patch(GET_EXECUTION_HISTORY_ENTITY,
+                                                     return_value=fake_execution_history_model)
 
     result: ExecutionHistoryReadDTO = get_execution_history_by_id(
         requester_id=1,
@@ -176,12 +343,12 @@ def test_get_execution_history_by_id_by_self(mocker: MockerFixture, fake_executi
         execution_history_id=1
     )
 
+    mock_get_execution_history_entity.assert_called_once_with(1, 1)
     assert isinstance(result, ExecutionHistoryReadDTO)
 
 
-def test_get_execution_history_by_id_by_different_user(mocker: MockerFixture,
-                                                       fake_execution_history_model: ExecutionHistory):
-    mocker.patch(GET_EXECUTION_HISTORY_ENTITY, return_value=fake_execution_history_model)
+def test_get_execution_history_by_id_owned_by_different_user(mocker: MockerFixture):
+    mocker.patch(GET_EXECUTION_HISTORY_ENTITY, side_effect=EntityNotFoundException("Execution History"))
 
     with pytest.raises(PermissionError):
         get_execution_history_by_id(
@@ -264,6 +431,65 @@ def test_create_execution_history_by_admin(mocker: MockerFixture, fake_execution
     assert isinstance(result, ExecutionHistoryReadDTO)
 
 
+def test_create_execution_history_sets_owner(mocker: MockerFixture,
+                                            fake_execution_history_dto: ExecutionHistoryCreateDTO,
+                                            fake_habit_task_model: HabitTask):
+    mocker.patch(DATABASE_SESSION, MagicMock())
+    mocker.patch(GET_HABIT_TASK_ENTITY, return_value=fake_habit_task_model)
+    def fake_create(_session, execution_history: ExecutionHistory) -> ExecutionHistory:
+        execution_history.id = 1
+        return execution_history
+
+    mock_create_execution_history = mocker.patch(EXECUTION_HISTORY_REPO_CREATE, side_effect=fake_create)
+
+    create_execution_history(
+        requester_id=999,
+        requester_role=UserRole.ADMIN,
+        execution_history_dto=fake_execution_history_dto
+    )
+
+    created_execution_history: ExecutionHistory = mock_create_execution_history.call_args.args[1]
+    assert created_execution_history.user_id == fake_habit_task_model.category.user_id
+
+
+def test_create_execution_history_updates_streak(mocker: MockerFixture,
+                                                 fake_execution_history_model: ExecutionHistory,
+                                                 fake_execution_history_dto: ExecutionHistoryCreateDTO,
+                                                 fake_habit_task_model: HabitTask,
+                                                 mock_streak_updates: dict[str, MagicMock]):
+    mocker.patch(DATABASE_SESSION, MagicMock())
+    mocker.patch(GET_HABIT_TASK_ENTITY, return_value=fake_habit_task_model)
+    mocker.patch(EXECUTION_HISTORY_REPO_CREATE, return_value=fake_execution_history_model)
+
+    create_execution_history(
+        requester_id=1,
+        requester_role=UserRole.USER,
+        execution_history_dto=fake_execution_history_dto
+    )
+
+    mock_streak_updates["execution"].assert_called_once_with(fake_execution_history_dto.habit_task_id,
+                                                             fake_execution_history_dto.executed_at)
+
+
+def test_create_execution_history_updates_daily_count(mocker: MockerFixture,
+                                                      fake_execution_history_model: ExecutionHistory,
+                                                      fake_execution_history_dto: ExecutionHistoryCreateDTO,
+                                                      fake_habit_task_model: HabitTask,
+                                                      mock_daily_count_updates: dict[str, MagicMock]):
+    mocker.patch(DATABASE_SESSION, MagicMock())
+    mocker.patch(GET_HABIT_TASK_ENTITY, return_value=fake_habit_task_model)
+    mocker.patch(EXECUTION_HISTORY_REPO_CREATE, return_value=fake_execution_history_model)
+
+    create_execution_history(
+        requester_id=1,
+        requester_role=UserRole.USER,
+        execution_history_dto=fake_execution_history_dto
+    )
+
+    mock_daily_count_updates["execution"].assert_called_once_with(fake_execution_history_dto.habit_task_id, 1,
+                                                                  fake_execution_history_dto.executed_at)
+
+
 def test_create_execution_history_failure(mocker: MockerFixture, fake_execution_history_model: ExecutionHistory,
                                           fake_execution_history_dto: ExecutionHistoryCreateDTO,
                                           fake_habit_task_model: HabitTask):
@@ -282,6 +508,117 @@ def test_create_execution_history_failure(mocker: MockerFixture, fake_execution_
         )
 
 
+def fake_bulk_create(_session, rows: list[dict]) -> list[ExecutionHistory]:
+    return [ExecutionHistory(id=index + 1, **row) for index, row in enumerate(rows)]
+
+
+def test_create_execution_histories_by_self(mocker: MockerFixture):
+    mocker.patch(DATABASE_SESSION, MagicMock())
+    mock_get_owners = mocker.patch(GET_HABIT_TASK_OWNERS, return_value={1: 1, 2: 1})
+    mock_bulk_create = mocker.patch(EXECUTION_HISTORY_REPO_BULK_CREATE, side_effect=fake_bulk_create)
+
+    result: ExecutionHistoryBulkResultDTO = create_execution_histories(
+        requester_id=1,
+        requester_role=UserRole.USER,
+        payloads=[
+            {"habit_task_id": 1, "executed_at": "2020-01-01T00:00:00"},
+            {"habit_task_id": 2, "executed_at": "2020-01-02T00:00:00"},
+            {"habit_task_id": 1, "executed_at": "2020-01-03T00:00:00"}
+        ]
+    )
+
+    mock_get_owners.assert_called_once_with({1, 2})
+    mock_bulk_create.assert_called_once()
+    assert [created.index for created in result.created] == [0, 1, 2]
+    assert [created.executed_at.day for created in result.created] == [1, 2, 3]
+    assert result.errors == []
+    assert all(row["user_id"] == 1 for row in mock_bulk_create.call_args.args[1])
+
+
+def test_create_execution_histories_reports_errors_per_item(mocker: MockerFixture):
+    mocker.patch(DATABASE_SESSION, MagicMock())
+    mocker.patch(GET_HABIT_TASK_OWNERS, return_value={1: 1, 2: 2})
+    mocker.patch(EXECUTION_HISTORY_REPO_BULK_CREATE, side_effect=fake_bulk_create)
+
+    result: ExecutionHistoryBulkResultDTO = create_execution_histories(
+        requester_id=1,
+        requester_role=UserRole.USER,
+        payloads=[
+            {"habit_task_id": 1, "executed_at": "2020-01-01T00:00:00"},
+            {"habit_task_id": "invalid"},
+            {"habit_task_id": 2, "executed_at": "2020-01-02T00:00:00"},
+            {"habit_task_id": 3, "executed_at": "2020-01-03T00:00:00"}
+        ]
+    )
+
+    assert [created.index for created in result.created] == [0]
+    assert [error.index for error in result.errors] == [1, 2, 3]
+    assert result.errors[1].error == "Forbidden"
+    assert result.errors[2].error == "Forbidden"
+
+
+def test_create_execution_histories_by_admin_reports_missing_habit_task(mocker: MockerFixture):
+    mocker.patch(DATABASE_SESSION, MagicMock())
+    mocker.patch(GET_HABIT_TASK_OWNERS, return_value={1: 5})
+    mock_bulk_create = mocker.patch(EXECUTION_HISTORY_REPO_BULK_CREATE, side_effect=fake_bulk_create)
+
+    result: ExecutionHistoryBulkResultDTO = create_execution_histories(
+        requester_id=999,
+        requester_role=UserRole.ADMIN,
+        payloads=[
+            {"habit_task_id": 1, "executed_at": "2020-01-01T00:00:00"},
+            {"habit_task_id": 2, "executed_at": "2020-01-02T00:00:00"}
+        ]
+    )
+
+    assert mock_bulk_create.call_args.args[1][0]["user_id"] == 5
+    assert len(result.created) == 1
+    assert result.errors[0].index == 1
+    assert result.errors[0].error == "Habit Task not found"
+
+
+def test_create_execution_histories_does_not_insert_without_valid_items(mocker: MockerFixture):
+    mocker.patch(DATABASE_SESSION, MagicMock())
+    mocker.patch(GET_HABIT_TASK_OWNERS, return_value={})
+    mock_bulk_create = mocker.patch(EXECUTION_HISTORY_REPO_BULK_CREATE, side_effect=fake_bulk_create)
+
+    result: ExecutionHistoryBulkResultDTO = create_execution_histories(
+        requester_id=1,
+        requester_role=UserRole.USER,
+        payloads=[{"habit_task_id": 1, "executed_at": "2020-01-01T00:00:00"}]
+    )
+
+    mock_bulk_create.assert_not_called()
+    assert result.created == []
+    assert len(result.errors) == 1
+
+
+def test_create_execution_histories_rejects_too_many_items(mocker: MockerFixture):
+    mock_get_owners = mocker.patch(GET_HABIT_TASK_OWNERS, return_value={})
+
+    with pytest.raises(ValueError):
+        create_execution_histories(
+            requester_id=1,
+            requester_role=UserRole.USER,
+            payloads=[{"habit_task_id": 1, "executed_at": "2020-01-01T00:00:00"}] * 1001
+        )
+
+    mock_get_owners.assert_not_called()
+
+
+def test_create_execution_histories_failure(mocker: MockerFixture):
+    mocker.patch(DATABASE_SESSION, MagicMock())
+    mocker.patch(GET_HABIT_TASK_OWNERS, return_value={1: 1})
+    mocker.patch(EXECUTION_HISTORY_REPO_BULK_CREATE, side_effect=IntegrityError(None, None, Exception()))
+
+    with pytest.raises(EntityPersistenceException):
+        create_execution_histories(
+            requester_id=1,
+            requester_role=UserRole.USER,
+            payloads=[{"habit_task_id": 1, "executed_at": "2020-01-01T00:00:00"}]
+        )
+
+
 def test_delete_execution_history_by_self(mocker: MockerFixture, fake_execution_history_model: ExecutionHistory):
     mocker.patch(DATABASE_SESSION, MagicMock())
     mocker.patch(GET_EXECUTION_HISTORY_ENTITY, return_value=fake_execution_history_model)
@@ -349,6 +686,38 @@ def test_delete_execution_history_calls_repository(mocker: MockerFixture,
     mock_repo.assert_called_once_with(session_mock, fake_execution_history_model)
 
 
+def test_delete_execution_history_updates_streak(mocker: MockerFixture,
+                                                 fake_execution_history_model: ExecutionHistory,
+                                                 mock_streak_updates: dict[str, MagicMock]):
+    mocker.patch(DATABASE_SESSION, MagicMock())
+    mocker.patch(GET_EXECUTION_HISTORY_ENTITY, return_value=fake_execution_history_model)
+
+    delete_execution_history(
+        requester_id=999,
+        requester_role=UserRole.ADMIN,
+        execution_history_id=fake_execution_history_model.id
+    )
+
+    mock_streak_updates["deletion"].assert_called_once_with(fake_execution_history_model.habit_task_id,
+                                                            fake_execution_history_model.executed_at)
+
+
+def test_delete_execution_history_updates_daily_count(mocker: MockerFixture,
+                                                      fake_execution_history_model: ExecutionHistory,
+                                                      mock_daily_count_updates: dict[str, MagicMock]):
+    mocker.patch(DATABASE_SESSION, MagicMock())
+    mocker.patch(GET_EXECUTION_HISTORY_ENTITY, return_value=fake_execution_history_model)
+
+    delete_execution_history(
+        requester_id=999,
+        requester_role=UserRole.ADMIN,
+        execution_history_id=fake_execution_history_model.id
+    )
+
+    mock_daily_count_updates["deletion"].assert_called_once_with(fake_execution_history_model.habit_task_id,
+                                                                 fake_execution_history_model.executed_at)
+
+
 def test_delete_execution_history_does_not_call_repository_if_wrong(mocker: MockerFixture,
                                                                     fake_execution_history_model: ExecutionHistory):
     mocker.patch(DATABASE_SESSION, MagicMock())
@@ -9,15 +9,17 @@ from app.exceptions.exceptions import EntityNotFoundException, EntityPersistence
 from app.models import HabitTask, Category
 from app.models.User import UserRole
 from app.services.habit_task_service import get_habit_tasks, get_habit_task_by_id, create_habit_task, update_habit_task, \
-    delete_habit_task, convert_dto_to_model
+    delete_habit_task, convert_dto_to_model, stream_habit_tasks
 
 DATABASE_SESSION = "app.services.habit_task_service.database.session"
 DATABASE_SESSION_BEGIN = "app.services.habit_task_service.database.session.begin"
 GET_HABIT_TASKS = "app.repositories.habit_task_repository.get_habit_tasks"
+ITER_HABIT_TASKS = "app.repositories.habit_task_repository.iter_habit_tasks"
 GET_HABIT_TASK_ENTITY = "app.services.habit_task_service.get_habit_task_entity"
 HABIT_TASK_REPO_CREATE = "app.repositories.habit_task_repository.create_habit_task"
 HABIT_TASK_REPO_DELETE = "app.repositories.habit_task_repository.delete_habit_task"
 GET_CATEGORY_ENTITY = "app.services.habit_task_service.get_category_entity"
+UPDATE_EXECUTION_HISTORY_OWNER = "app.repositories.execution_history_repository.update_user_id_for_habit_task"
 
 
 def test_get_habit_tasks_by_self(mocker: MockerFixture, fake_habit_task_model: HabitTask):
@@ -148,7 +150,7 @@ def test_get_habit_tasks_returns_list_of_habit_task_read_dto(mocker: MockerFixtu
 
 
 def test_get_habit_task_by_id_by_self(mocker: MockerFixture, fake_habit_task_model: HabitTask):
-    mocker.patch(GET_HABIT_TASK_ENTITY, return_value=fake_habit_task_model)
+    mock_get_habit_task_entity = mocker.patch(GET_HABIT_TASK_ENTITY, return_value=fake_habit_task_model)
 
     result: HabitTaskReadDTO = get_habit_task_by_id(
         requester_id=1,
@@ -156,11 +158,12 @@ def test_get_habit_task_by_id_by_self(mocker: MockerFixture, fake_habit_task_mod
         habit_task_id=1
     )
 
+    mock_get_habit_task_entity.assert_called_once_with(1, 1)
     assert isinstance(result, HabitTaskReadDTO)
 
 
-def test_get_habit_task_by_id_by_different_user(mocker: MockerFixture, fake_habit_task_model: HabitTask):
-    mocker.patch(GET_HABIT_TASK_ENTITY, return_value=fake_habit_task_model)
+def test_get_habit_task_by_id_owned_by_different_user(mocker: MockerFixture):
+    mocker.patch(GET_HABIT_TASK_ENTITY, side_effect=EntityNotFoundException("Habit Task"))
 
     with pytest.raises(PermissionError):
         get_habit_task_by_id(
@@ -258,16 +261,19 @@ def test_create_habit_task_failure(mocker: MockerFixture, fake_habit_task_model:
 def test_update_habit_task_by_self(mocker: MockerFixture, fake_habit_task_model: HabitTask,
                                    fake_habit_task_update_dto: HabitTaskUpdateDTO, fake_category_model: Category):
     mocker.patch(DATABASE_SESSION, MagicMock())
-    mocker.patch(GET_HABIT_TASK_ENTITY, return_value=fake_habit_task_model)
-    mocker.patch(GET_CATEGORY_ENTITY, return_value=fake_category_model)
+    mock_get_habit_task_entity = mocker.patch(GET_HABIT_TASK_ENTITY, return_value=fake_habit_task_model)
+    mock_get_category_entity = mocker.patch(GET_CATEGORY_ENTITY, return_value=fake_category_model)
+    requester_id: int = fake_habit_task_model.category.user_id
 
     result: HabitTaskReadDTO = update_habit_task(
-        requester_id=fake_habit_task_model.category.user_id,
+        requester_id=requester_id,
         requester_role=UserRole.USER,
         habit_task_id=fake_habit_task_model.id,
         habit_task_updates=fake_habit_task_update_dto
     )
 
+    mock_get_habit_task_entity.assert_called_once_with(fake_habit_task_model.id, requester_id)
+    mock_get_category_entity.assert_called_once_with(fake_habit_task_update_dto.category_id, requester_id)
     assert isinstance(result, HabitTaskReadDTO)
     assert fake_habit_task_model.category_id == fake_habit_task_update_dto.category_id
     assert fake_habit_task_model.name == fake_habit_task_update_dto.name
@@ -308,6 +314,41 @@ def test_update_habit_task_by_admin(mocker: MockerFixture, fake_habit_task_model
     assert fake_habit_task_model.description == fake_habit_task_update_dto.description
 
 
+def test_update_habit_task_to_category_of_different_owner_moves_execution_histories(
+        mocker: MockerFixture, fake_habit_task_model: HabitTask, fake_habit_task_update_dto: HabitTaskUpdateDTO):
+    session_mock = mocker.patch(DATABASE_SESSION, MagicMock())
+    mocker.patch(GET_HABIT_TASK_ENTITY, return_value=fake_habit_task_model)
+    mocker.patch(GET_CATEGORY_ENTITY, return_value=Category(id=10, user_id=2, name="Other"))
+    mock_update_owner = mocker.patch(UPDATE_EXECUTION_HISTORY_OWNER, return_value=0)
+
+    update_habit_task(
+        requester_id=999,
+        requester_role=UserRole.ADMIN,
+        habit_task_id=fake_habit_task_model.id,
+        habit_task_updates=fake_habit_task_update_dto
+    )
+
+    mock_update_owner.assert_called_once_with(session_mock, fake_habit_task_model.id, 2)
+
+
+def test_update_habit_task_within_same_owner_does_not_move_execution_histories(
+        mocker: MockerFixture, fake_habit_task_model: HabitTask, fake_habit_task_update_dto: HabitTaskUpdateDTO,
+        fake_category_model: Category):
+    mocker.patch(DATABASE_SESSION, MagicMock())
+    mocker.patch(GET_HABIT_TASK_ENTITY, return_value=fake_habit_task_model)
+    mocker.patch(GET_CATEGORY_ENTITY, return_value=fake_category_model)
+    mock_update_owner = mocker.patch(UPDATE_EXECUTION_HISTORY_OWNER, return_value=0)
+
+    update_habit_task(
+        requester_id=fake_habit_task_model.category.user_id,
+        requester_role=UserRole.USER,
+        habit_task_id=fake_habit_task_model.id,
+        habit_task_updates=fake_habit_task_update_dto
+    )
+
+    mock_update_owner.assert_not_called()
+
+
 def test_update_non_existing_habit_task(mocker: MockerFixture, fake_habit_task_model: HabitTask,
                                         fake_habit_task_update_dto: HabitTaskUpdateDTO):
     mocker.patch(DATABASE_SESSION, MagicMock())
@@ -432,3 +473,22 @@ def test_convert_model_to_dto(fake_habit_task_model: HabitTask):
     assert habit_task_dto.description == fake_habit_task_model.description
     assert habit_task_dto.created_at == fake_habit_task_model.created_at
     assert habit_task_dto.updated_at == fake_habit_task_model.updated_at
+
+
+def test_stream_habit_tasks_by_different_user_raises_before_iteration(mocker: MockerFixture):
+    mock_iter_habit_tasks = mocker.patch(ITER_HABIT_TASKS, return_value=iter([]))
+
+    with pytest.raises(PermissionError):
+        stream_habit_tasks(1, UserRole.USER, "2", None, None)
+
+    mock_iter_habit_tasks.assert_not_called()
+
+
+def test_stream_habit_tasks_by_admin(mocker: MockerFixture, fake_habit_task_model: HabitTask):
+    mock_iter_habit_tasks = mocker.patch(ITER_HABIT_TASKS, return_value=iter([fake_habit_task_model] * 3))
+
+    result: list[HabitTaskReadDTO] = list(stream_habit_tasks(1, UserRole.ADMIN, "2", "3", None))
+
+    mock_iter_habit_tasks.assert_called_once_with(2, 3, None)
+    assert len(result) == 3
+    assert all(isinstance(habit_task, HabitTaskReadDTO) for habit_task in result)
@@ -0,0 +1,127 @@
+from datetime import date, datetime, timezone
+
+import numpy as np
+import pytest
+from pytest_mock import MockerFixture
+
+from app.dtos import HabitTaskStatisticsReadDTO
+from app.exceptions.exceptions import EntityNotFoundException
+from app.models import HabitTask
+from app.models.User import UserRole
+from app.services.habit_task_statistics_service import compute_statistics, get_habit_task_statistics
+
+GET_HABIT_TASK_ENTITY = "app.services.habit_task_statistics_service.get_habit_task_entity"
+GET_EXECUTED_AT_VALUES = "app.repositories.execution_history_repository.get_executed_at_values"
+GET_UTC_TIME = "app.services.habit_task_statistics_service.get_utc_time"
+
+
+def to_array(values: list[str]) -> np.ndarray:
+    return np.array(values, dtype="datetime64[us]")
+
+
+def test_compute_statistics():
+    executed_at: np.ndarray = to_array([
+        "2024-01-03 20:00:00",
+        "2024-01-01 08:00:00",
+        "2024-01-01 20:00:00",
+        "2024-01-02 08:30:00",
+    ])
+
+    result: HabitTaskStatisticsReadDTO = compute_statistics(1, executed_at, date(2024, 1, 1), date(2024, 1, 4))
+
+    assert result.total_executions == 4
+    assert result.completion_rate == 0.75
+    assert result.max_gap_hours == 35.5
+    assert result.mean_gap_hours == pytest.approx(60 / 3)
+    assert result.hour_histogram[8] == 2
+    assert result.hour_histogram[20] == 2
+    assert sum(result.hour_histogram) == 4
+    # 2024-01-01 was a Monday
+    assert result.weekday_histogram == [2, 1, 1, 0, 0, 0, 0]
+    assert result.rolling_7_day_frequency == pytest.approx([2 / 7, 3 / 7, 4 / 7, 4 / 7])
+    assert result.rolling_30_day_frequency == pytest.approx([2 / 30, 3 / 30, 4 / 30, 4 / 30])
+
+
+def test_compute_statistics_counts_lead_in_only_for_rolling_frequency():
+    executed_at: np.ndarray = to_array([
+        "2023-12-26 10:00:00",
+        "2023-12-31 10:00:00",
+        "2024-01-02 10:00:00",
+    ])
+
+    result: HabitTaskStatisticsReadDTO = compute_statistics(1, executed_at, date(2024, 1, 1), date(2024, 1, 2))
+
+    assert result.total_executions == 1
+    assert result.completion_rate == 0.5
+    assert result.mean_gap_hours is None
+    assert result.rolling_7_day_frequency == pytest.approx([2 / 7, 2 / 7])
+    assert result.rolling_30_day_frequency == pytest.approx([2 / 30, 3 / 30])
+
+
+def test_compute_statistics_without_executions():
+    result: HabitTaskStatisticsReadDTO = compute_statistics(1, to_array([]), date(2024, 1, 1), date(2024, 1, 10))
+
+    assert result.total_executions == 0
+    assert result.completion_rate == 0
+    assert result.mean_gap_hours is None
+    assert result.max_gap_hours is None
+    assert result.hour_histogram == [0] * 24
+    assert result.weekday_histogram == [0] * 7
+    assert result.rolling_7_day_frequency == [0] * 10
+
+
+def test_get_habit_task_statistics_by_self(mocker: MockerFixture, fake_habit_task_model: HabitTask):
+    mock_get_habit_task_entity = mocker.patch(GET_HABIT_TASK_ENTITY, return_value=fake_habit_task_model)
+    mock_get_values = mocker.patch(GET_EXECUTED_AT_VALUES, return_value=["2024-01-01 08:00:00.000000"])
+
+    result: HabitTaskStatisticsReadDTO = get_habit_task_statistics(1, UserRole.USER, 1, "2024-01-01", "2024-01-31")
+
+    mock_get_habit_task_entity.assert_called_once_with(1, 1)
+    mock_get_values.assert_called_once_with(1, datetime(2023, 12, 3), datetime(2024, 2, 1))
+    assert result.total_executions == 1
+    assert len(result.rolling_7_day_frequency) == 31
+
+
+def test_get_habit_task_statistics_default_window(mocker: MockerFixture, fake_habit_task_model: HabitTask):
+    mocker.patch(GET_UTC_TIME, return_value=datetime(2024, 3, 31, 12, tzinfo=timezone.utc))
+    mocker.patch(GET_HABIT_TASK_ENTITY, return_value=fake_habit_task_model)
+    mocker.patch(GET_EXECUTED_AT_VALUES, return_value=[])
+
+    result: HabitTaskStatisticsReadDTO = get_habit_task_statistics(999, UserRole.ADMIN, 1, None, None)
+
+    assert result.end_date == date(2024, 3, 31)
+    assert result.start_date == date(2024, 1, 2)
+
+
+@pytest.mark.parametrize(
+    "start_date, end_date",
+    [
+        ("2024-02-01", "2024-01-01"),
+        ("2000-01-01", "2024-01-01"),
+        ("2024-01-01", "2024-02-30"),
+    ]
+)
+def test_get_habit_task_statistics_invalid_window(mocker: MockerFixture, start_date: str, end_date: str):
+    mock_get_habit_task_entity = mocker.patch(GET_HABIT_TASK_ENTITY)
+
+    with pytest.raises(ValueError):
+        get_habit_task_statistics(1, UserRole.USER, 1, start_date, end_date)
+
+    mock_get_habit_task_entity.assert_not_called()
+
+
+def test_get_habit_task_statistics_by_different_user(mocker: MockerFixture):
+    mocker.patch(GET_HABIT_TASK_ENTITY, side_effect=EntityNotFoundException("Habit Task"))
+    mock_get_values = mocker.patch(GET_EXECUTED_AT_VALUES)
+
+    with pytest.raises(PermissionError):
+        get_habit_task_statistics(999, UserRole.USER, 1, None, None)
+
+    mock_get_values.assert_not_called()
+
+
+def test_get_habit_task_statistics_not_found(mocker: MockerFixture):
+    mocker.patch(GET_HABIT_TASK_ENTITY, side_effect=EntityNotFoundException("Habit Task"))
+
+    with pytest.raises(EntityNotFoundException):
+        get_habit_task_statistics(999, UserRole.ADMIN, 1, None, None)
@@ -0,0 +1,203 @@
+from datetime import date, datetime
+from unittest.mock import MagicMock
+
+import pytest
+from pytest_mock import MockerFixture
+
+from app.dtos import HabitTaskStreakReadDTO
+from app.exceptions.exceptions import EntityNotFoundException
+from app.models import HabitTask, HabitTaskStreak
+from app.models.User import UserRole
+from app.services.habit_task_streak_service import advance_streak, apply_days, convert_model_to_dto, \
+    record_execution, record_executions, record_deletion, get_habit_task_streak
+
+DATABASE_SESSION = "app.services.habit_task_streak_service.database.session"
+GET_HABIT_TASK_ENTITY = "app.services.habit_task_streak_service.get_habit_task_entity"
+GET_STREAK = "app.repositories.habit_task_streak_repository.get_streak"
+GET_EXECUTION_DAYS = "app.repositories.habit_task_streak_repository.get_execution_days"
+HAS_EXECUTION_ON_DAY = "app.repositories.habit_task_streak_repository.has_execution_on_day"
+STREAK_REPO_CREATE = "app.repositories.habit_task_streak_repository.create_streak"
+
+
+def create_streak(current_streak: int, longest_streak: int, last_execution_day: date) -> HabitTaskStreak:
+    return HabitTaskStreak(
+        habit_task_id=1,
+        current_streak=current_streak,
+        longest_streak=longest_streak,
+        last_execution_day=last_execution_day
+    )
+
+
+@pytest.mark.parametrize(
+    "day, expected_current, expected_longest",
+    [
+        (date(2020, 1, 10), 3, 5),
+        (date(2020, 1, 11), 4, 5),
+        (date(2020, 1, 12), 1, 5),
+    ]
+)
+def test_advance_streak(day: date, expected_current: int, expected_longest: int):
+    streak: HabitTaskStreak = create_streak(3, 5, date(2020, 1, 10))
+
+    assert advance_streak(streak, day)
+    assert streak.current_streak == expected_current
+    assert streak.longest_streak == expected_longest
+    assert streak.last_execution_day == day
+
+
+def test_advance_streak_updates_longest_streak():
+    streak: HabitTaskStreak = create_streak(5, 5, date(2020, 1, 10))
+
+    advance_streak(streak, date(2020, 1, 11))
+
+    assert streak.longest_streak == 6
+
+
+def test_advance_streak_rejects_out_of_order_day():
+    streak: HabitTaskStreak = create_streak(3, 5, date(2020, 1, 10))
+
+    assert not advance_streak(streak, date(2020, 1, 9))
+    assert streak.current_streak == 3
+    assert streak.last_execution_day == date(2020, 1, 10)
+
+
+def test_apply_days():
+    streak: HabitTaskStreak = create_streak(100, 100, date(2030, 1, 1))
+
+    apply_days(streak, [date(2020, 1, 1), date(2020, 1, 2), date(2020, 1, 3), date(2020, 1, 5), date(2020, 1, 6)])
+
+    assert streak.current_streak == 2
+    assert streak.longest_streak == 3
+    assert streak.last_execution_day == date(2020, 1, 6)
+
+
+def test_apply_days_without_executions():
+    streak: HabitTaskStreak = create_streak(3, 5, date(2020, 1, 10))
+
+    apply_days(streak, [])
+
+    assert streak.current_streak == 0
+    assert streak.longest_streak == 0
+    assert streak.last_execution_day is None
+
+
+@pytest.mark.parametrize(
+    "today, expected_current",
+    [
+        (date(2020, 1, 10), 3),
+        (date(2020, 1, 11), 3),
+        (date(2020, 1, 12), 0),
+    ]
+)
+def test_convert_model_to_dto(today: date, expected_current: int):
+    result: HabitTaskStreakReadDTO = convert_model_to_dto(create_streak(3, 5, date(2020, 1, 10)), today)
+
+    assert result.current_streak == expected_current
+    assert result.longest_streak == 5
+    assert result.last_execution_day == date(2020, 1, 10)
+
+
+def test_record_execution_does_not_recompute_in_order(mocker: MockerFixture):
+    streak: HabitTaskStreak = create_streak(3, 5, date(2020, 1, 10))
+    mocker.patch(GET_STREAK, return_value=streak)
+    mock_get_execution_days = mocker.patch(GET_EXECUTION_DAYS)
+
+    record_execution(1, datetime(2020, 1, 11, 8, 30))
+
+    mock_get_execution_days.assert_not_called()
+    assert streak.current_streak == 4
+
+
+def test_record_execution_recomputes_out_of_order(mocker: MockerFixture):
+    streak: HabitTaskStreak = create_streak(1, 1, date(2020, 1, 10))
+    mocker.patch(GET_STREAK, return_value=streak)
+    mocker.patch(GET_EXECUTION_DAYS, return_value=[date(2020, 1, 8), date(2020, 1, 9), date(2020, 1, 10)])
+
+    record_execution(1, datetime(2020, 1, 9, 8, 30))
+
+    assert streak.current_streak == 3
+    assert streak.longest_streak == 3
+
+
+def test_record_execution_creates_missing_streak(mocker: MockerFixture):
+    session_mock = mocker.patch(DATABASE_SESSION, MagicMock())
+    mocker.patch(GET_STREAK, return_value=None)
+    mocker.patch(GET_EXECUTION_DAYS, return_value=[date(2020, 1, 9), date(2020, 1, 10)])
+    mock_create_streak = mocker.patch(STREAK_REPO_CREATE, side_effect=lambda session, streak: streak)
+
+    record_execution(1, datetime(2020, 1, 10))
+
+    mock_create_streak.assert_called_once()
+    created_streak: HabitTaskStreak = mock_create_streak.call_args.args[1]
+    assert mock_create_streak.call_args.args[0] == session_mock
+    assert created_streak.current_streak == 2
+
+
+def test_record_executions_applies_days_in_order(mocker: MockerFixture):
+    streak: HabitTaskStreak = create_streak(1, 1, date(2020, 1, 10))
+    mocker.patch(GET_STREAK, return_value=streak)
+    mock_get_execution_days = mocker.patch(GET_EXECUTION_DAYS)
+
+    record_executions([(1, datetime(2020, 1, 12)), (1, datetime(2020, 1, 11)), (1, datetime(2020, 1, 12, 20))])
+
+    mock_get_execution_days.assert_not_called()
+    assert streak.current_streak == 3
+
+
+def test_record_deletion_keeps_streak_if_day_has_other_executions(mocker: MockerFixture):
+    streak: HabitTaskStreak = create_streak(3, 5, date(2020, 1, 10))
+    mocker.patch(GET_STREAK, return_value=streak)
+    mocker.patch(HAS_EXECUTION_ON_DAY, return_value=True)
+    mock_get_execution_days = mocker.patch(GET_EXECUTION_DAYS)
+
+    record_deletion(1, datetime(2020, 1, 10))
+
+    mock_get_execution_days.assert_not_called()
+    assert streak.current_streak == 3
+
+
+def test_record_deletion_recomputes_if_day_is_gone(mocker: MockerFixture):
+    streak: HabitTaskStreak = create_streak(3, 5, date(2020, 1, 10))
+    mocker.patch(GET_STREAK, return_value=streak)
+    mocker.patch(HAS_EXECUTION_ON_DAY, return_value=False)
+    mocker.patch(GET_EXECUTION_DAYS, return_value=[date(2020, 1, 8), date(2020, 1, 10)])
+
+    record_deletion(1, datetime(2020, 1, 9))
+
+    assert streak.current_streak == 1
+    assert streak.longest_streak == 1
+
+
+def test_get_habit_task_streak_by_self(mocker: MockerFixture, fake_habit_task_model: HabitTask):
+    mock_get_habit_task_entity = mocker.patch(GET_HABIT_TASK_ENTITY, return_value=fake_habit_task_model)
+    mocker.patch(GET_STREAK, return_value=create_streak(3, 5, date(2020, 1, 10)))
+
+    result: HabitTaskStreakReadDTO = get_habit_task_streak(1, UserRole.USER, 1)
+
+    mock_get_habit_task_entity.assert_called_once_with(1, 1)
+    assert result.longest_streak == 5
+
+
+def test_get_habit_task_streak_computes_missing_streak(mocker: MockerFixture, fake_habit_task_model: HabitTask):
+    mocker.patch(GET_HABIT_TASK_ENTITY, return_value=fake_habit_task_model)
+    mocker.patch(GET_STREAK, return_value=None)
+    mocker.patch(GET_EXECUTION_DAYS, return_value=[date(2020, 1, 9), date(2020, 1, 10)])
+
+    result: HabitTaskStreakReadDTO = get_habit_task_streak(999, UserRole.ADMIN, 1)
+
+    assert result.longest_streak == 2
+    assert result.last_execution_day == date(2020, 1, 10)
+
+
+def test_get_habit_task_streak_by_different_user(mocker: MockerFixture):
+    mocker.patch(GET_HABIT_TASK_ENTITY, side_effect=EntityNotFoundException("Habit Task"))
+
+    with pytest.raises(PermissionError):
+        get_habit_task_streak(999, UserRole.USER, 1)
+
+
+def test_get_habit_task_streak_not_found(mocker: MockerFixture):
+    mocker.patch(GET_HABIT_TASK_ENTITY, side_effect=EntityNotFoundException("Habit Task"))
+
+    with pytest.raises(EntityNotFoundException):
+        get_habit_task_streak(999, UserRole.ADMIN, 1)
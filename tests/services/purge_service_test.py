@@ -0,0 +1,59 @@
+from unittest.mock import MagicMock
+
+from pytest_mock import MockerFixture
+
+from app.services.purge_service import purge_user, purge_category, purge_deleted
+
+DATABASE_SESSION = "app.services.purge_service.database.session"
+CURRENT_APP = "app.services.purge_service.current_app"
+DELETE_USER_DATA_BATCH = "app.repositories.purge_repository.delete_user_data_batch"
+DELETE_CATEGORY_DATA_BATCH = "app.repositories.purge_repository.delete_category_data_batch"
+DELETE_USER_ROW = "app.repositories.purge_repository.delete_user_row"
+DELETE_CATEGORY_ROW = "app.repositories.purge_repository.delete_category_row"
+GET_PENDING_USER_IDS = "app.repositories.purge_repository.get_pending_user_ids"
+GET_PENDING_CATEGORY_IDS = "app.repositories.purge_repository.get_pending_category_ids"
+PURGE_USER = "app.services.purge_service.purge_user"
+PURGE_CATEGORY = "app.services.purge_service.purge_category"
+
+
+def test_purge_user_deletes_in_batches_until_done(mocker: MockerFixture):
+    session_mock = mocker.patch(DATABASE_SESSION, MagicMock())
+    mocker.patch(CURRENT_APP, MagicMock(config={"PURGE_BATCH_SIZE": 2}))
+    mock_batch = mocker.patch(DELETE_USER_DATA_BATCH, side_effect=[2, 2, 1, 0])
+    mock_row = mocker.patch(DELETE_USER_ROW, return_value=1)
+
+    result: int = purge_user(5)
+
+    assert result == 6
+    assert mock_batch.call_count == 4
+    mock_batch.assert_called_with(session_mock, 5, 2)
+    mock_row.assert_called_once_with(session_mock, 5)
+    # One transaction per batch and one for the user row
+    assert session_mock.begin.call_count == 5
+
+
+def test_purge_category_without_children_only_deletes_row(mocker: MockerFixture):
+    session_mock = mocker.patch(DATABASE_SESSION, MagicMock())
+    mocker.patch(CURRENT_APP, MagicMock(config={"PURGE_BATCH_SIZE": 500}))
+    mock_batch = mocker.patch(DELETE_CATEGORY_DATA_BATCH, return_value=0)
+    mock_row = mocker.patch(DELETE_CATEGORY_ROW, return_value=1)
+
+    result: int = purge_category(3)
+
+    assert result == 1
+    mock_batch.assert_called_once_with(session_mock, 3, 500)
+    mock_row.assert_called_once_with(session_mock, 3)
+
+
+def test_purge_deleted_resumes_pending_purges(mocker: MockerFixture):
+    mocker.patch(DATABASE_SESSION, MagicMock())
+    mocker.patch(GET_PENDING_USER_IDS, return_value=[1, 2])
+    mocker.patch(GET_PENDING_CATEGORY_IDS, return_value=[7])
+    mock_purge_user = mocker.patch(PURGE_USER, return_value=10)
+    mock_purge_category = mocker.patch(PURGE_CATEGORY, return_value=3)
+
+    result: int = purge_deleted()
+
+    assert result == 23
+    assert [call.args for call in mock_purge_user.call_args_list] == [(1,), (2,)]
+    mock_purge_category.assert_called_once_with(7)
@@ -5,20 +5,28 @@ from pytest_mock import MockerFixture
 from sqlalchemy.exc import IntegrityError
 
 from app.dtos import UserReadDTO, UserCreateDTO, UserUpdateDTO
-from app.exceptions.exceptions import EntityNotFoundException, EntityPersistenceException
+from app.exceptions.exceptions import EntityNotFoundException, EntityPersistenceException, \
+    ServiceUnavailableException
 from app.models import User, Category
 from app.models.User import UserRole
+from app.services.purge_service import purge_user
 from app.services.user_service import get_users, get_user_by_id, convert_dto_to_model, get_user_by_email, create_user, \
-    update_user, delete_user
+    update_user, delete_user, stream_users, rehash_password
 
 DATABASE_SESSION = "app.services.user_service.database.session"
 DATABASE_SESSION_BEGIN = "app.services.user_service.database.session.begin"
 GET_USERS = "app.repositories.user_repository.get_users"
+ITER_USERS = "app.repositories.user_repository.iter_users"
 GET_USER_ENTITY_BY_ID = "app.services.user_service.get_user_entity_by_id"
 GET_USER_ENTITY_BY_EMAIL = "app.services.user_service.get_user_entity_by_email"
 USER_REPO_CREATE = "app.repositories.user_repository.create_user"
 CATEGORY_REPO_CREATE_DEFAULT_CATEGORY = "app.repositories.category_repository.create_default_category_for_user"
 USER_REPO_DELETE = "app.repositories.user_repository.delete_user"
+USER_REPO_MARK_DELETED = "app.repositories.user_repository.mark_user_deleted"
+RUN_IN_BACKGROUND = "app.services.user_service.run_in_background"
+USER_REPO_GET_BY_ID = "app.repositories.user_repository.get_user_by_id"
+HASH_PASSWORD = "app.services.user_service.hash_password"
+OLD_HASH = "$2b$10$" + "a" * 53
 
 
 def test_get_users_forbidden_for_non_admin(mocker: MockerFixture):
@@ -383,6 +391,42 @@ def test_delete_user_does_not_call_repository_if_wrong(mocker: MockerFixture, fa
     mock_repo.assert_not_called()
 
 
+def test_delete_user_asynchronously_marks_and_schedules_purge(mocker: MockerFixture, fake_user_model: User):
+    session_mock = mocker.patch(DATABASE_SESSION, MagicMock())
+    mocker.patch(GET_USER_ENTITY_BY_ID, return_value=fake_user_model)
+    mock_delete = mocker.patch(USER_REPO_DELETE)
+    mock_mark_deleted = mocker.patch(USER_REPO_MARK_DELETED, return_value=fake_user_model)
+    mock_run_in_background = mocker.patch(RUN_IN_BACKGROUND)
+
+    result: UserReadDTO = delete_user(
+        requester_id=fake_user_model.id,
+        requester_role=UserRole.USER,
+        user_id=fake_user_model.id,
+        asynchronous="true"
+    )
+
+    assert isinstance(result, UserReadDTO)
+    mock_mark_deleted.assert_called_once_with(session_mock, fake_user_model)
+    mock_delete.assert_not_called()
+    mock_run_in_background.assert_called_once_with(purge_user, fake_user_model.id)
+
+
+def test_delete_user_synchronously_does_not_schedule_purge(mocker: MockerFixture, fake_user_model: User):
+    mocker.patch(DATABASE_SESSION, MagicMock())
+    mocker.patch(GET_USER_ENTITY_BY_ID, return_value=fake_user_model)
+    mocker.patch(USER_REPO_DELETE, return_value=fake_user_model)
+    mock_run_in_background = mocker.patch(RUN_IN_BACKGROUND)
+
+    delete_user(
+        requester_id=fake_user_model.id,
+        requester_role=UserRole.USER,
+        user_id=fake_user_model.id,
+        asynchronous="false"
+    )
+
+    mock_run_in_background.assert_not_called()
+
+
 def test_convert_dto_to_model(fake_user_dto: UserCreateDTO):
     user_model: User = convert_dto_to_model(fake_user_dto)
 
@@ -403,3 +447,49 @@ def test_convert_model_to_dto(fake_user_model: User):
     assert user_dto.is_active == fake_user_model.is_active
     assert user_dto.created_at == fake_user_model.created_at
     assert user_dto.updated_at == fake_user_model.updated_at
+
+
+def test_stream_users_by_user_raises_before_iteration(mocker: MockerFixture):
+    mock_iter_users = mocker.patch(ITER_USERS, return_value=iter([]))
+
+    with pytest.raises(PermissionError):
+        stream_users(1, UserRole.USER, None, None, None)
+
+    mock_iter_users.assert_not_called()
+
+
+def test_stream_users_by_admin(mocker: MockerFixture, fake_user_model: User):
+    mocker.patch(ITER_USERS, return_value=iter([fake_user_model] * 3))
+
+    result: list[UserReadDTO] = list(stream_users(1, UserRole.ADMIN, None, None, "true"))
+
+    assert len(result) == 3
+    assert all(isinstance(user, UserReadDTO) for user in result)
+
+
+def test_rehash_password(mocker: MockerFixture, fake_user_model: User):
+    mocker.patch(DATABASE_SESSION, MagicMock())
+    mocker.patch(HASH_PASSWORD, return_value="new hash")
+    fake_user_model.hashed_password = OLD_HASH
+    mocker.patch(USER_REPO_GET_BY_ID, return_value=fake_user_model)
+
+    assert rehash_password(fake_user_model.id, "password123", OLD_HASH)
+    assert fake_user_model.hashed_password == "new hash"
+
+
+def test_rehash_password_skips_changed_password(mocker: MockerFixture, fake_user_model: User):
+    mocker.patch(DATABASE_SESSION, MagicMock())
+    mocker.patch(HASH_PASSWORD, return_value="new hash")
+    fake_user_model.hashed_password = "$2b$10$" + "b" * 53
+    mocker.patch(USER_REPO_GET_BY_ID, return_value=fake_user_model)
+
+    assert not rehash_password(fake_user_model.id, "password123", OLD_HASH)
+    assert fake_user_model.hashed_password == "$2b$10$" + "b" * 53
+
+
+def test_rehash_password_skips_when_hashing_is_saturated(mocker: MockerFixture):
+    mocker.patch(HASH_PASSWORD, side_effect=ServiceUnavailableException())
+    mock_get_user = mocker.patch(USER_REPO_GET_BY_ID)
+
+    assert not rehash_password(1, "password123", OLD_HASH)
+    mock_get_user.assert_not_called()
@@ -0,0 +1,97 @@
+import sys
+from typing import Callable
+
+import pytest
+from flask import Flask
+from sqlalchemy import text
+
+from app import database, slow_queries
+from app.slow_queries import SlowQuery, find_caller, init_slow_query_log, redact_parameters
+
+
+@pytest.fixture
+def app() -> Flask:
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+    app.config["SLOW_QUERY_LOG_ENABLED"] = True
+    # Every statement counts as slow
+    app.config["SLOW_QUERY_THRESHOLD_MS"] = 0
+    app.config["SLOW_QUERY_LOG_SIZE"] = 3
+    database.init_app(app)
+    init_slow_query_log(app)
+
+    with app.app_context():
+        database.session.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+        slow_queries.clear_slow_queries()
+
+    return app
+
+
+def test_slow_query_is_recorded_with_query_plan(app: Flask):
+    with app.app_context():
+        database.session.execute(text("SELECT * FROM items WHERE name = :name"), {"name": "secret"})
+
+    slow_query: SlowQuery = slow_queries.get_slow_queries()[0]
+
+    assert slow_query.statement == "SELECT * FROM items WHERE name = ?"
+    assert slow_query.parameters == ["<str>"]
+    assert slow_query.query_plan == ["SCAN items"]
+    assert "secret" not in repr(slow_query)
+
+
+def test_statements_without_query_plan(app: Flask):
+    with app.app_context():
+        database.session.execute(text("PRAGMA table_info(items)"))
+
+    assert slow_queries.get_slow_queries()[0].query_plan == []
+
+
+def test_only_latest_slow_queries_are_kept(app: Flask):
+    with app.app_context():
+        for value in range(5):
+            database.session.execute(text(f"SELECT {value}"))
+
+    assert [slow_query.statement for slow_query in slow_queries.get_slow_queries()] == [
+        "SELECT 4", "SELECT 3", "SELECT 2"
+    ]
+
+
+def test_fast_statements_are_not_recorded(app: Flask, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(slow_queries, "_threshold_seconds", 60)
+
+    with app.app_context():
+        database.session.execute(text("SELECT 1"))
+
+    assert slow_queries.get_slow_queries() == []
+
+
+def test_redact_parameters():
+    assert redact_parameters((1, "a", None)) == ["<int>", "<str>", "<NoneType>"]
+    assert redact_parameters({"user_id": 1}) == ["user_id=<int>"]
+    assert redact_parameters(None) == []
+
+
+def _define(module: str, source: str, **names: object) -> Callable:
+    namespace: dict = {"__name__": module, **names}
+    exec(source, namespace)
+
+    return namespace[source.split()[1].split("(")[0]]
+
+
+def test_find_caller_prefers_repository_frames():
+    get_items: Callable = _define("app.repositories.item_repository",
+                                  "def get_items(): return find_caller(sys._getframe())", find_caller=find_caller,
+                                  sys=sys)
+    list_items: Callable = _define("app.services.item_service", "def list_items(): return get_items()",
+                                   get_items=get_items)
+
+    assert list_items() == "app.repositories.item_repository.get_items"
+
+
+def test_find_caller_falls_back_to_service_frames():
+    list_items: Callable = _define("app.services.item_service",
+                                   "def list_items(): return find_caller(sys._getframe())", find_caller=find_caller,
+                                   sys=sys)
+
+    assert list_items() == "app.services.item_service.list_items"
+    assert find_caller(sys._getframe()) is None
@@ -0,0 +1,67 @@
+import logging
+from pathlib import Path
+
+import pytest
+from flask import Flask
+from sqlalchemy import Engine, create_engine, event
+
+from app import database
+from app.sqlite_pragmas import DEFAULT_PRAGMAS, PragmaReport, create_pragma_listener, get_pragma_report, \
+    verify_pragmas
+
+
+def _create_engine(url: str, pragmas: dict) -> Engine:
+    engine: Engine = create_engine(url)
+    event.listen(engine, "connect", create_pragma_listener(pragmas))
+
+    return engine
+
+
+def test_default_pragmas_are_applied(tmp_path: Path):
+    engine: Engine = _create_engine(f"sqlite:///{tmp_path / 'test.db'}", DEFAULT_PRAGMAS)
+
+    with engine.connect() as connection:
+        report: PragmaReport = get_pragma_report(connection, DEFAULT_PRAGMAS)
+
+    assert report.mismatches == []
+    assert report.applied["journal_mode"] == "wal"
+    assert report.applied["synchronous"] == 1
+    assert report.applied["busy_timeout"] == 5000
+    assert report.applied["temp_store"] == 2
+
+
+def test_file_only_pragmas_are_not_checked_in_memory():
+    engine: Engine = _create_engine("sqlite:///:memory:", DEFAULT_PRAGMAS)
+
+    with engine.connect() as connection:
+        report: PragmaReport = get_pragma_report(connection, DEFAULT_PRAGMAS)
+
+    assert report.applied["journal_mode"] == "memory"
+    assert report.mismatches == []
+
+
+def test_mismatches_are_reported(tmp_path: Path):
+    engine: Engine = _create_engine(f"sqlite:///{tmp_path / 'test.db'}", {"cache_size": -1024})
+
+    with engine.connect() as connection:
+        report: PragmaReport = get_pragma_report(connection, {"cache_size": -2048, "synchronous": "off"})
+
+    assert report.mismatches == ["cache_size=-1024 (configured -2048)", "synchronous=2 (configured off)"]
+
+
+def test_invalid_pragma_name():
+    with pytest.raises(ValueError):
+        create_pragma_listener({"cache_size = 0; DROP TABLE users": 1})
+
+
+def test_verify_pragmas_logs_mismatches(caplog: pytest.LogCaptureFixture):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+    # Configured but never applied
+    app.config["SQLITE_PRAGMAS"] = {"busy_timeout": 1234}
+    database.init_app(app)
+
+    with caplog.at_level(logging.WARNING, logger=app.logger.name):
+        verify_pragmas(app)
+
+    assert any("busy_timeout" in record.getMessage() for record in caplog.records)
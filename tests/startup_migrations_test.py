@@ -0,0 +1,70 @@
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+from flask import Flask
+from sqlalchemy import inspect, text
+
+from app import create_app, database
+from app.models import Category, ExecutionHistory, HabitTask, User
+from app.models.User import UserRole
+from app.password_hashing import shutdown_password_hashing
+from app.read_only_database import get_engines
+
+CONFIG: dict = {"INDEX_CHECK_ON_STARTUP": False, "METRICS_ENABLED": False, "SLOW_QUERY_LOG_ENABLED": False,
+                "PASSWORD_HASHING_POOL_SIZE": 0}
+
+
+def _create_app(path: Path) -> Flask:
+    return create_app({**CONFIG, "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}"})
+
+
+def _dispose(app: Flask) -> None:
+    shutdown_password_hashing()
+
+    with app.app_context():
+        database.session.remove()
+
+        for engine in get_engines():
+            engine.dispose()
+
+
+def test_startup_adds_and_backfills_execution_history_owners(tmp_path: Path):
+    path: Path = tmp_path / "test.db"
+    app: Flask = _create_app(path)
+
+    with app.app_context():
+        user: User = User(first_name="John", last_name="Doe", email="john@example.com", hashed_password="hash",
+                          role=UserRole.USER)
+        habit_task: HabitTask = HabitTask(category=Category(user=user, name="Sport"), name="Swim")
+        database.session.add_all([user, habit_task])
+        database.session.flush()
+        database.session.add_all([ExecutionHistory(habit_task_id=habit_task.id, user_id=user.id,
+                                                   executed_at=datetime(2025, 1, day, 8)) for day in (1, 2)])
+        database.session.commit()
+
+    _dispose(app)
+
+    # Back to the execution_histories table as it was before it had a user_id column
+    with sqlite3.connect(path) as connection:
+        connection.executescript("""
+            CREATE TABLE previous_execution_histories (
+                id INTEGER PRIMARY KEY,
+                habit_task_id INTEGER NOT NULL REFERENCES habit_tasks (id) ON DELETE CASCADE,
+                executed_at DATETIME NOT NULL
+            );
+            INSERT INTO previous_execution_histories SELECT id, habit_task_id, executed_at FROM execution_histories;
+            DROP TABLE execution_histories;
+            ALTER TABLE previous_execution_histories RENAME TO execution_histories;
+        """)
+
+    app = _create_app(path)
+
+    with app.app_context():
+        index_names: set[str] = {index["name"] for index in inspect(database.engine).get_indexes("execution_histories")}
+        owners: list[int] = list(database.session.scalars(text("SELECT user_id FROM execution_histories")))
+
+    _dispose(app)
+
+    assert owners == [1, 1]
+    assert "ix_execution_histories_user_id_executed_at" in index_names
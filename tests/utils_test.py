@@ -1,10 +1,12 @@
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from typing import Optional
 
 import pytest
-from flask import Flask
+from flask import Flask, Response
+from pydantic import BaseModel
 
 from app import utils
+from app.models.User import UserRole
 from app.exceptions.exceptions import MissingPayloadException
 
 
@@ -125,6 +127,32 @@ def test_str_to_datetime_or_none_raises_exception_on_invalid_data(input_string:
         utils.str_to_datetime_or_none(input_string)
 
 
+def test_str_to_date_or_none_accepts_none():
+    result: Optional[date] = utils.str_to_date_or_none(None)
+
+    assert result is None
+
+
+def test_str_to_date_or_none_accepts_valid_date():
+    result: Optional[date] = utils.str_to_date_or_none("2020-02-29")
+
+    assert result == date(2020, 2, 29)
+
+
+@pytest.mark.parametrize(
+    "input_string",
+    [
+        "2021-02-29",
+        "2020-13-01",
+        "2020-01-01 00:00:00",
+        "today",
+    ]
+)
+def test_str_to_date_or_none_raises_exception_on_invalid_data(input_string: str):
+    with pytest.raises(ValueError):
+        utils.str_to_date_or_none(input_string)
+
+
 def test_get_payload_with_json():
     app = Flask(__name__)
 
@@ -142,3 +170,95 @@ def test_get_payload_without_json():
     with app.test_request_context("/", json=None):
         with pytest.raises(MissingPayloadException):
             utils.get_payload()
+
+
+class FakeItem(BaseModel):
+    value: int
+
+
+@pytest.mark.parametrize(
+    "headers, query_string, expected",
+    [
+        ({}, {}, None),
+        ({"Accept": "*/*"}, {}, None),
+        ({"Accept": "application/json"}, {}, None),
+        ({"Accept": "application/x-ndjson"}, {}, utils.NDJSON_MIMETYPE),
+        ({}, {"stream": "true"}, utils.JSON_MIMETYPE),
+        ({"Accept": "application/x-ndjson"}, {"stream": "true"}, utils.NDJSON_MIMETYPE),
+    ]
+)
+def test_get_stream_mimetype(headers: dict, query_string: dict, expected: Optional[str]):
+    app = Flask(__name__)
+
+    with app.test_request_context("/", headers=headers, query_string=query_string):
+        assert utils.get_stream_mimetype() == expected
+
+
+def test_create_stream_response_ndjson():
+    app = Flask(__name__)
+
+    with app.test_request_context("/"):
+        response: Response = utils.create_stream_response(iter([FakeItem(value=1), FakeItem(value=2)]),
+                                                          utils.NDJSON_MIMETYPE)
+
+        assert response.mimetype == utils.NDJSON_MIMETYPE
+        assert response.get_data(as_text=True) == '{"value":1}\n{"value":2}\n'
+
+
+@pytest.mark.parametrize(
+    "items, expected",
+    [
+        ([], "[]"),
+        ([FakeItem(value=1)], '[{"value":1}]'),
+        ([FakeItem(value=1), FakeItem(value=2)], '[{"value":1},{"value":2}]'),
+    ]
+)
+def test_create_stream_response_json_array(items: list[FakeItem], expected: str):
+    app = Flask(__name__)
+
+    with app.test_request_context("/"):
+        response: Response = utils.create_stream_response(iter(items), utils.JSON_MIMETYPE)
+
+        assert response.mimetype == utils.JSON_MIMETYPE
+        assert response.get_data(as_text=True) == expected
+
+
+class FakeDatedItem(BaseModel):
+    value: int
+    created_at: datetime
+    role: UserRole
+
+
+@pytest.mark.parametrize("use_orjson", [False, True])
+@pytest.mark.parametrize(
+    "data, expected",
+    [
+        ([], "[]"),
+        (FakeItem(value=1), '{"value":1}'),
+        ([FakeItem(value=1), FakeItem(value=2)], '[{"value":1},{"value":2}]'),
+        ((FakeItem(value=1), FakeItem(value=2)), '[{"value":1},{"value":2}]'),
+        ([FakeDatedItem(value=1, created_at=datetime(2020, 1, 2, 3, 4, 5), role=UserRole.ADMIN)],
+         '[{"value":1,"created_at":"2020-01-02T03:04:05","role":"ADMIN"}]'),
+    ]
+)
+def test_create_json_response(data: object, expected: str, use_orjson: bool):
+    if use_orjson:
+        pytest.importorskip("orjson")
+
+    app = Flask(__name__)
+    app.config["JSON_USE_ORJSON"] = use_orjson
+
+    with app.test_request_context("/"):
+        response: Response = utils.create_json_response(data)
+
+        assert response.mimetype == utils.JSON_MIMETYPE
+        assert response.get_data(as_text=True) == expected
+
+
+def test_create_json_response_rejects_mixed_sequences():
+    app = Flask(__name__)
+
+    with app.test_request_context("/"):
+        with pytest.raises(TypeError):
+            utils.create_json_response([FakeItem(value=1), FakeDatedItem(value=2, created_at=datetime(2020, 1, 2),
+                                                                         role=UserRole.ADMIN)])
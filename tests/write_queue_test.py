@@ -0,0 +1,152 @@
+import threading
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from flask import Flask
+from sqlalchemy import event, text
+
+from app import database, write_queue
+from app.exceptions.exceptions import ServiceUnavailableException
+from app.write_queue import WriteQueue, defer_until_commit, init_write_queue, serialized_write, \
+    shutdown_write_queue, transaction
+
+
+@pytest.fixture
+def app(tmp_path: Path) -> Iterator[Flask]:
+    app = Flask(__name__)
+    # Every thread sees the same database only with a file
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'test.db'}"
+    app.config["WRITE_QUEUE_ENABLED"] = True
+    app.config["WRITE_QUEUE_MAX_BATCH_SIZE"] = 64
+    app.config["WRITE_QUEUE_LIMIT"] = 256
+    database.init_app(app)
+
+    with app.app_context():
+        database.session.execute(text("CREATE TABLE items (name TEXT UNIQUE NOT NULL)"))
+        database.session.commit()
+
+    init_write_queue(app)
+
+    yield app
+
+    shutdown_write_queue()
+
+
+@serialized_write
+def add_item(name: str) -> str:
+    with transaction():
+        database.session.execute(text("INSERT INTO items (name) VALUES (:name)"), {"name": name})
+
+    return threading.current_thread().name
+
+
+@serialized_write
+def wait_for(started: threading.Event, release: threading.Event) -> None:
+    started.set()
+    release.wait(5)
+
+
+def get_item_names(app: Flask) -> list[str]:
+    with app.app_context():
+        return database.session.scalars(text("SELECT name FROM items ORDER BY name")).all()
+
+
+def _submit_during_batch(app: Flask, names: list[str]) -> list[object]:
+    started: threading.Event = threading.Event()
+    release: threading.Event = threading.Event()
+    results: list[object] = [None] * len(names)
+
+    def add(index: int) -> None:
+        try:
+            results[index] = add_item(names[index])
+        except Exception as e:
+            results[index] = e
+
+    blocker = threading.Thread(target=wait_for, args=(started, release))
+    blocker.start()
+    started.wait(5)
+
+    threads: list[threading.Thread] = [threading.Thread(target=add, args=(index,)) for index in range(len(names))]
+
+    for thread in threads:
+        thread.start()
+
+    # Everything queued behind the blocked batch ends up in the next one
+    while write_queue._write_queue._jobs.qsize() < len(names):
+        threading.Event().wait(0.001)
+
+    release.set()
+
+    for thread in [blocker, *threads]:
+        thread.join()
+
+    return results
+
+
+def test_writes_run_on_the_writer_thread(app: Flask):
+    assert add_item("a") == "write-queue"
+    assert get_item_names(app) == ["a"]
+
+
+def test_pending_writes_are_committed_together(app: Flask):
+    commits: list[int] = []
+
+    with app.app_context():
+        event.listen(database.engine, "commit", lambda _connection: commits.append(1))
+
+    results: list[object] = _submit_during_batch(app, [f"item{index}" for index in range(10)])
+
+    assert results == ["write-queue"] * 10
+    assert len(get_item_names(app)) == 10
+    # The blocked batch and one batch with all ten writes
+    assert len(commits) == 2
+
+
+def test_failing_write_only_rolls_back_itself(app: Flask):
+    results: list[object] = _submit_during_batch(app, ["a", "b", "a", "c"])
+
+    assert sum(isinstance(result, Exception) for result in results) == 1
+    assert get_item_names(app) == ["a", "b", "c"]
+
+
+def test_callbacks_run_after_commit(app: Flask):
+    seen: list[list[str]] = []
+
+    @serialized_write
+    def add_and_defer() -> None:
+        with transaction():
+            database.session.execute(text("INSERT INTO items (name) VALUES ('a')"))
+
+        assert defer_until_commit(lambda: seen.append(get_item_names(app)))
+
+    add_and_defer()
+    shutdown_write_queue()
+
+    assert seen == [["a"]]
+    assert not defer_until_commit(lambda: None)
+
+
+def test_full_queue_rejects_writes(app: Flask):
+    queue: WriteQueue = WriteQueue(app, max_batch_size=1, limit=1)
+    started: threading.Event = threading.Event()
+    release: threading.Event = threading.Event()
+
+    queue.submit(lambda: (started.set(), release.wait(5)))
+    started.wait(5)
+    queue.submit(lambda: None)
+
+    with pytest.raises(ServiceUnavailableException):
+        queue.submit(lambda: None)
+
+    release.set()
+    queue.shutdown()
+
+
+def test_writes_run_inline_when_disabled(app: Flask):
+    shutdown_write_queue()
+
+    with app.app_context():
+        assert add_item("a") == threading.current_thread().name
+
+    assert get_item_names(app) == ["a"]